@@ -5,10 +5,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiosqlite
 from datetime import datetime, timezone
 from discord.ui import Button, View
-from illegal_team_act_cog import IllegalTeamActCog
 
 
 class AchievementRefreshView(View):
@@ -18,14 +16,15 @@ class AchievementRefreshView(View):
         self.user_id = user_id
         self.message = None  # This will hold the reference to the message
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+        self.config = self.bot.services.get('config')
+
+        self.db = self.bot.services.get('db')
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         return interaction.user.id == self.user_id
 
     async def format_page(self):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute("SELECT * FROM achievements WHERE user_id = ?", (self.user_id,))
             user_record = await cursor.fetchone()
@@ -41,22 +40,17 @@ class AchievementRefreshView(View):
 
             await db.commit()
 
-        # Load the achievements from the config.json file
-        achievements = self.bot.get_cog('AchievementCog').achievements
-
-        # Add the count for each achievement
-        for achievement in achievements:
-            if achievement['type'] == 'reaction':
-                achievement['count'] = reaction_count
-            elif achievement['type'] == 'message':
-                achievement['count'] = message_count
-            elif achievement['type'] == 'time_spent':
-                achievement['count'] = time_spent / 60  # Convert seconds to minutes
-            elif achievement['type'] == 'giveaway':
-                achievement['count'] = giveaway_count
+        # The achievements from the config.json file are shared and read only, keep the counts apart
+        achievements = self.config.achievements
+        counts = {
+            'reaction': reaction_count,
+            'message': message_count,
+            'time_spent': time_spent / 60,  # Convert seconds to minutes
+            'giveaway': giveaway_count,
+        }
 
         # Count the number of completed achievements
-        completed_achievements = sum(1 for a in achievements if a["count"] >= a["threshold"])
+        completed_achievements = sum(1 for a in achievements if counts[a["type"]] >= a["threshold"])
 
         # Get the user's mention and name
         user = await self.bot.fetch_user(self.user_id)
@@ -64,21 +58,21 @@ class AchievementRefreshView(View):
         user_name = user.name
 
         # Create an embed with the user's achievements
-        config = self.bot.get_cog('ConfigCog').config
-        title = config['achievements_page_title'].format(user_name=user_name)
-        description = config['achievements_page_description'].format(user_mention=user_mention,
-                                                                     completed_achievements=completed_achievements,
-                                                                     total_achievements=len(achievements))
-        achievements_finish_emoji = config['achievements_finish_emoji']
-        achievements_incomplete_emoji = config['achievements_incomplete_emoji']
+        config = self.config
+        title = config.achievements_page_title.format(user_name=user_name)
+        description = config.achievements_page_description.format(user_mention=user_mention,
+                                                                  completed_achievements=completed_achievements,
+                                                                  total_achievements=len(achievements))
+        achievements_finish_emoji = config.achievements_finish_emoji
+        achievements_incomplete_emoji = config.achievements_incomplete_emoji
 
         embed = discord.Embed(title=title, description=description, color=discord.Color.blue())
 
         for achievement in achievements:
-            emoji = achievements_finish_emoji if achievement["count"] >= achievement[
-                "threshold"] else achievements_incomplete_emoji
-            progress = min(1, achievement["count"] / achievement["threshold"])
-            progress_bar = f"{emoji} **{achievement['description']}** → `{int(achievement['count'])}/{int(achievement['threshold'])}`\n`{'█' * int(progress * 20)}{' ' * (20 - int(progress * 20))}` `{progress * 100:.2f}%`"
+            count = counts[achievement["type"]]
+            emoji = achievements_finish_emoji if count >= achievement["threshold"] else achievements_incomplete_emoji
+            progress = min(1, count / achievement["threshold"])
+            progress_bar = f"{emoji} **{achievement['description']}** → `{int(count)}/{int(achievement['threshold'])}`\n`{'█' * int(progress * 20)}{' ' * (20 - int(progress * 20))}` `{progress * 100:.2f}%`"
             embed.add_field(name=achievement["name"], value=progress_bar, inline=False)
 
         return embed
@@ -95,8 +89,7 @@ class ConfirmationView(View):
         self.giveaways = giveaways
         self.operation = operation  # 'increase' or 'decrease'
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+        self.db = self.bot.services.get('db')
 
     async def on_timeout(self):
         for item in self.children:
@@ -109,7 +102,7 @@ class ConfirmationView(View):
         # Immediate feedback
         await interaction.response.edit_message(content="**Processing your request...**", view=None)
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute("SELECT * FROM achievements WHERE user_id = ?", (self.member_id,))
             user_record = await cursor.fetchone()
@@ -156,11 +149,10 @@ class AchievementRankingView(View):
         self.bot = bot
         self.message = None  # This will hold the reference to the message
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+        self.db = self.bot.services.get('db')
 
     async def format_page(self):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
 
             # Fetch the top 10 users for each category
@@ -184,14 +176,14 @@ class AchievementRankingView(View):
         }
 
         # Define the emojis for the ranks
-        config = self.bot.get_cog('ConfigCog').config
-        rank_emojis = config['achievements_ranking_emoji']
+        config = self.config
+        rank_emojis = config.achievements_ranking_emoji
 
         # Load the achievement_ranking
-        achievements_ranking = config['achievements_ranking']
+        achievements_ranking = config.achievements_ranking
 
         # Create an embed with the rankings
-        title = config['achievements_ranking_title']
+        title = config.achievements_ranking_title
         embed = discord.Embed(title=title, color=discord.Color.blue())
 
         for achievement in achievements_ranking:
@@ -215,8 +207,7 @@ class AchievementOperationView(discord.ui.View):
         self.page = page
         self.message = None  # This will hold the reference to the message
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+        self.config = self.bot.services.get('config')
 
         # Define the buttons
         self.previous_button = Button(label="Previous", style=discord.ButtonStyle.primary, disabled=True)
@@ -285,18 +276,16 @@ class AchievementCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.voice_state = {}  # To track the time users join a voice channel
-        self.illegal_act_cog = IllegalTeamActCog(bot)
+        self.illegal_act_cog = self.bot.services.get('permissions')
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
-        self.achievements = config['achievements']
+        self.db = self.bot.services.get('db')
 
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot:
             return
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute("SELECT * FROM achievements WHERE user_id = ?", (message.author.id,))
             user = await cursor.fetchone()
@@ -318,7 +307,7 @@ class AchievementCog(commands.Cog):
         if user.bot:
             return
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute("SELECT * FROM achievements WHERE user_id = ?", (user.id,))
             user_record = await cursor.fetchone()
@@ -344,7 +333,7 @@ class AchievementCog(commands.Cog):
 
         # When the member leaves a channel
         if before.channel is not None:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db.connect() as db:
                 cursor = await db.cursor()
                 # Retrieve the start time and channel ID from the database for the user
                 await cursor.execute("SELECT start_time, channel_id FROM voice_channel_entries WHERE user_id = ?",
@@ -375,7 +364,7 @@ class AchievementCog(commands.Cog):
 
         # Handle joining a new channel
         if after.channel is not None:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db.connect() as db:
                 cursor = await db.cursor()
                 # Record the new channel entry
                 await cursor.execute(
@@ -421,7 +410,7 @@ class AchievementCog(commands.Cog):
 
         await interaction.response.defer()  # Properly defer to handle possibly lengthy DB operations
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute("SELECT * FROM achievements WHERE user_id = ?", (member.id,))
             user_record = await cursor.fetchone()
@@ -466,7 +455,7 @@ class AchievementCog(commands.Cog):
 
         await interaction.response.defer()  # Defer interaction for database operations
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute("SELECT * FROM achievements WHERE user_id = ?", (member.id,))
             user_record = await cursor.fetchone()
@@ -514,7 +503,7 @@ class AchievementCog(commands.Cog):
         await interaction.response.defer()
 
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db.connect() as db:
                 cursor = await db.cursor()
                 await cursor.execute("SELECT * FROM achievement_operation ORDER BY timestamp DESC")
                 operations = await cursor.fetchall()
@@ -530,7 +519,7 @@ class AchievementCog(commands.Cog):
         view.message = message
 
     async def check_table_exists(self, table_name='achievements'):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
 
             # Check if the achievements table exists
@@ -542,7 +531,7 @@ class AchievementCog(commands.Cog):
         return table_exists
 
     async def add_giveaway_count_column(self, table_name):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
 
             # Fetch the information of all columns in the specified table
@@ -575,7 +564,7 @@ class AchievementCog(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self):
 
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute("""
                 CREATE TABLE IF NOT EXISTS achievements (
@@ -0,0 +1,244 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from discord.ext import commands
+
+# Lower number runs first
+PRIORITY_MOVE = 0  # Moving members into their rooms
+PRIORITY_CHANNEL = 1  # Creating, handing out and deleting rooms
+PRIORITY_ROLE = 2  # Role changes requested by a user
+PRIORITY_MESSAGE = 3  # New messages and DMs
+PRIORITY_EDIT = 4  # Cosmetic edits of existing messages
+PRIORITY_BACKGROUND = 5  # Maintenance nobody is waiting for
+
+# Requests allowed per route kind: (requests, per seconds)
+DEFAULT_ROUTE_LIMITS = {
+    'move': (10, 10.0),
+    'channel': (5, 5.0),
+    'role': (10, 10.0),
+    'send': (5, 5.0),
+    'edit': (5, 5.0),
+    'invite': (5, 5.0),
+    'fetch': (5, 5.0),
+}
+
+
+class RouteBucket:
+    """Token bucket for one Discord route, so we wait here instead of running into a 429."""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def delay(self, now):
+        # Refill the bucket, then return how long until a token is available
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class ScheduledAction:
+    __slots__ = ('priority', 'seq', 'route', 'key', 'factory', 'futures', 'submitted_at')
+
+    def __init__(self, priority, seq, route, key, factory):
+        self.priority = priority
+        self.seq = seq
+        self.route = route
+        self.key = key
+        self.factory = factory
+        self.futures = []
+        self.submitted_at = time.monotonic()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ActionScheduler:
+    """
+    Runs Discord API calls from all cogs by priority.
+
+    An action is a callable returning a coroutine. Actions sharing a key (e.g. edits of the same message)
+    are coalesced while they wait, so only the latest one is sent. Every action waits for the bucket of
+    its route, a tuple like ('edit', channel_id), before it is started.
+    """
+
+    def __init__(self, workers=4, route_limits=None):
+        self.workers = workers
+        self.route_limits = dict(DEFAULT_ROUTE_LIMITS)
+        if route_limits:
+            self.route_limits.update(route_limits)
+        self.queue = []  # heap of ScheduledAction
+        self.pending = {}  # coalescing key -> waiting ScheduledAction
+        self.buckets = {}  # route -> RouteBucket
+        self.seq = itertools.count()
+        self.slots = asyncio.Semaphore(workers)
+        self.wakeup = asyncio.Event()
+        self.dispatcher = None
+        self.running = set()
+        self.stats = {'submitted': 0, 'coalesced': 0, 'executed': 0, 'failed': 0, 'max_wait': 0.0}
+
+    def start(self):
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.create_task(self.dispatch())
+
+    async def close(self):
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+        for task in list(self.running):
+            task.cancel()
+
+    def submit(self, factory, priority, route, key=None):
+        """Queue an action and return a future with its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.stats['submitted'] += 1
+
+        action = self.pending.get(key) if key is not None else None
+        if action is not None:
+            # Only the latest version of a coalesced action is sent, all callers get its result
+            action.factory = factory
+            action.futures.append(future)
+            self.stats['coalesced'] += 1
+            if priority < action.priority:
+                action.priority = priority
+                heapq.heapify(self.queue)
+            return future
+
+        action = ScheduledAction(priority, next(self.seq), route, key, factory)
+        action.futures.append(future)
+        heapq.heappush(self.queue, action)
+        if key is not None:
+            self.pending[key] = action
+        self.wakeup.set()
+        self.start()
+        return future
+
+    async def run(self, factory, priority, route, key=None):
+        """Queue an action and wait for its result."""
+        return await self.submit(factory, priority, route, key)
+
+    def schedule(self, factory, priority, route, key=None):
+        """Queue an action nobody waits for, failures are only logged."""
+        future = self.submit(factory, priority, route, key)
+        future.add_done_callback(self.log_failure)
+
+    @staticmethod
+    def log_failure(future):
+        if not future.cancelled() and future.exception() is not None:
+            logging.error(f"Scheduled action failed: {future.exception()}")
+
+    def get_bucket(self, route):
+        bucket = self.buckets.get(route)
+        if bucket is None:
+            rate, per = self.route_limits.get(route[0], (5, 5.0))
+            bucket = self.buckets[route] = RouteBucket(rate, per)
+        return bucket
+
+    def pop_ready(self):
+        """Pop the most important action whose route is free, or return how long until one is."""
+        now = time.monotonic()
+        skipped = []
+        ready = None
+        delay = None
+        while self.queue:
+            action = heapq.heappop(self.queue)
+            wait = self.get_bucket(action.route).delay(now)
+            if wait == 0:
+                ready = action
+                break
+            skipped.append(action)
+            delay = wait if delay is None else min(delay, wait)
+        for action in skipped:
+            heapq.heappush(self.queue, action)
+
+        if ready is not None:
+            self.get_bucket(ready.route).take()
+            if ready.key is not None and self.pending.get(ready.key) is ready:
+                del self.pending[ready.key]
+        return ready, delay
+
+    async def dispatch(self):
+        while True:
+            await self.slots.acquire()
+            while True:
+                action, delay = self.pop_ready()
+                if action is not None:
+                    break
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            task = asyncio.create_task(self.execute(action))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def execute(self, action):
+        self.stats['max_wait'] = max(self.stats['max_wait'], time.monotonic() - action.submitted_at)
+        try:
+            result = await action.factory()
+        except asyncio.CancelledError:
+            for future in action.futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            self.stats['failed'] += 1
+            for future in action.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            self.stats['executed'] += 1
+            for future in action.futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self.slots.release()
+
+    def queue_depths(self):
+        depths = {}
+        for action in self.queue:
+            depths[action.priority] = depths.get(action.priority, 0) + 1
+        return depths
+
+
+class ActionSchedulerCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+        config = self.bot.services.get('config')
+        self.scheduler = ActionScheduler(workers=config.action_scheduler_workers,
+                                         route_limits=config.action_scheduler_route_limits)
+        self.bot.services.register('scheduler', self.scheduler)
+
+    async def cog_load(self):
+        self.scheduler.start()
+
+    async def cog_unload(self):
+        self.bot.services.unregister('scheduler')
+        await self.scheduler.close()
+
+    def apply_config(self, old, new, changed, prepared=None):
+        if 'action_scheduler_route_limits' not in changed:
+            return
+        limits = dict(DEFAULT_ROUTE_LIMITS)
+        limits.update(new.action_scheduler_route_limits or {})
+        kinds = {kind for kind in limits.keys() | self.scheduler.route_limits.keys()
+                 if limits.get(kind) != self.scheduler.route_limits.get(kind)}
+        self.scheduler.route_limits = limits
+        # Buckets are built when a route is first used, drop the ones whose limits changed
+        for route in [route for route in self.scheduler.buckets if route[0] in kinds]:
+            del self.scheduler.buckets[route]
@@ -0,0 +1,55 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import asyncio
+import datetime
+import logging
+
+
+def archive_cutoff(months, now=None):
+    """Start of the month `months` months before the current one, older rows belong in the archive."""
+    now = now or datetime.datetime.now()
+    month = now.year * 12 + now.month - 1 - months
+    return datetime.datetime(month // 12, month % 12 + 1, 1)
+
+
+async def archive_rows(database, table, archive, columns, time_column, cutoff, batch_size, before_delete=None):
+    """
+    Move the rows of `table` whose `time_column` is before `cutoff` into `archive`, `batch_size` rows per
+    transaction, and return how many were moved.
+
+    Every batch is a range of rowids read and moved under one write lock, so the Cogs can keep writing between
+    batches and nothing changes within one. `before_delete(db, condition, parameters)` can read the batch before
+    it is deleted, e.g. to keep a summary of the archive.
+    """
+    column_list = ', '.join(columns)
+    condition = f"rowid BETWEEN ? AND ? AND {time_column} < ?"
+    moved = 0
+    last_rowid = 0
+    while True:
+        async with database.connect() as db:
+            await db.execute('BEGIN IMMEDIATE')
+            cursor = await db.execute(f'''
+                SELECT MIN(rowid), MAX(rowid), COUNT(*) FROM (
+                    SELECT rowid FROM {table} WHERE rowid > ? AND {time_column} < ? ORDER BY rowid LIMIT ?
+                )
+            ''', (last_rowid, cutoff, batch_size))
+            first_rowid, batch_last_rowid, count = await cursor.fetchone()
+            if not count:
+                await db.commit()
+                break
+            parameters = (first_rowid, batch_last_rowid, cutoff)
+            await db.execute(f'INSERT INTO {archive} ({column_list}) '
+                             f'SELECT {column_list} FROM {table} WHERE {condition}', parameters)
+            if before_delete is not None:
+                await before_delete(db, condition, parameters)
+            await db.execute(f'DELETE FROM {table} WHERE {condition}', parameters)
+            await db.commit()
+        moved += count
+        last_rowid = batch_last_rowid
+        # Let the other Cogs use the database between batches
+        await asyncio.sleep(0.1)
+    if moved:
+        logging.info(f"Archived {moved} rows of {table} from before {cutoff} into {archive}")
+    return moved
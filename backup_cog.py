@@ -12,8 +12,6 @@ from discord import app_commands
 from datetime import datetime, timedelta
 import logging
 
-from illegal_team_act_cog import IllegalTeamActCog
-
 
 class BackupCog(commands.Cog):
     def __init__(self, bot):
@@ -22,10 +20,9 @@ class BackupCog(commands.Cog):
         self.backup_folder_manual = 'db_backup_manual'
         self.backup_database.start()
         self.file_limit = 20
-        self.illegal_act_cog = IllegalTeamActCog(bot)
+        self.illegal_act_cog = self.bot.services.get('permissions')
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+        self.config = self.bot.services.get('config')
 
     @tasks.loop(hours=6)
     async def backup_database(self, manual=False):
@@ -41,7 +38,7 @@ class BackupCog(commands.Cog):
         # Copy the database to the backup folder with the current time appended to the name
         backup_name = f"database_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
 
-        shutil.copy2(self.db_path, os.path.join(folder, backup_name))
+        shutil.copy2(self.config.db_path, os.path.join(folder, backup_name))
         logging.info(f"Database backup created: {backup_name}")
 
         # Get a list of all backup files sorted by modification time
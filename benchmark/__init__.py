@@ -0,0 +1,6 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+# Local load tests that run the real Cogs against fake Discord objects and a temporary SQLite database.
+# Run them from the repository root, e.g. `python -m benchmark.giveaway_join_load --users 2000`.
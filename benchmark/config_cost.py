@@ -0,0 +1,111 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+"""
+Measures what the configuration costs: parsing config.json at startup and building the views
+that read it (one TeamInvitationView per invitation, one GiveawayParticipationView per giveaway).
+
+Every case runs next to the dict-based baseline it replaced: config.json read with json.load three
+times at startup (bot.py, read_config and the ConfigCog added in setup), and every view looking up
+ConfigCog and copying its keys out of the dict. The baseline views are the current views with that
+copy added in front, so the difference between the columns is the cost of the copy.
+
+    python -m benchmark.config_cost --views 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from action_scheduler_cog import ActionSchedulerCog
+from config_cog import load_config
+from create_invitation_cog import TeamInvitationView
+from giveaway_cog import GiveawayParticipationView
+from benchmark.fakes import FakeBot, FakeUser, load_config as load_bench_config
+
+
+# The keys the views copied out of the config dict before Config existed
+INVITATION_KEYS = ('roomfull_button_label', 'invite_button_label', 'invite_embed_content', 'invite_embed_footer',
+                   'interaction_target_error_message', 'roomfull_title', 'invite_embed_content_edited',
+                   'roomfull_set_message', 'not_in_vc_message', 'extract_channel_id_error')
+GIVEAWAY_KEYS = ('db_path', 'giveaway_join_button_label', 'giveaway_exit_button_label',
+                 'giveaway_already_joined_message', 'giveaway_joined_message', 'giveaway_leave_message',
+                 'giveaway_not_access_message', 'giveaway_embed_participants_title', 'giveaway_end_message')
+
+
+class DictConfigCog:
+    """The old ConfigCog: the parsed config.json as a plain dict."""
+
+    def __init__(self, file_path):
+        self.config = read_json(file_path)
+
+
+def read_json(file_path):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def copy_keys(view, bot, keys):
+    config = bot.get_cog('DictConfigCog').config
+    for key in keys:
+        setattr(view, key, config[key])
+
+
+class BaselineTeamInvitationView(TeamInvitationView):
+    def __init__(self, bot, url, user):
+        copy_keys(self, bot, INVITATION_KEYS)
+        super().__init__(bot, url, user)
+
+
+class BaselineGiveawayParticipationView(GiveawayParticipationView):
+    def __init__(self, bot, giveaway_id, giveaway_channel_id):
+        copy_keys(self, bot, GIVEAWAY_KEYS)
+        super().__init__(bot, giveaway_id, giveaway_channel_id)
+
+
+def per_call(function, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - started) / count
+
+
+async def run(args):
+    baseline_startup = per_call(lambda: [read_json('config.json') for _ in range(3)], args.loads)
+    startup = per_call(lambda: load_config('config.json'), args.loads)
+    print(f"{'':32} {'dict baseline':>14} {'Config':>10}")
+    print(f"{'Startup parse (ms)':32} {baseline_startup * 1000:14.3f} {startup * 1000:10.3f}")
+
+    bot = FakeBot(load_bench_config(':memory:'))
+    bot.add_fake_cog(ActionSchedulerCog(bot))
+    bot.add_fake_cog(DictConfigCog('config.json'))
+    user = FakeUser()
+    cases = (
+        ('TeamInvitationView (us)',
+         lambda: BaselineTeamInvitationView(bot, 'https://discord.gg/bench', user),
+         lambda: TeamInvitationView(bot, 'https://discord.gg/bench', user)),
+        ('GiveawayParticipationView (us)',
+         lambda: BaselineGiveawayParticipationView(bot, '1234567890', 1),
+         lambda: GiveawayParticipationView(bot, '1234567890', 1)),
+    )
+    for name, baseline, current in cases:
+        # Interleave the two so drift in the machine hits both columns alike
+        baseline_times, current_times = [], []
+        for _ in range(args.rounds):
+            baseline_times.append(per_call(baseline, args.views // args.rounds))
+            current_times.append(per_call(current, args.views // args.rounds))
+        print(f"{name:32} {min(baseline_times) * 1e6:14.1f} {min(current_times) * 1e6:10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Config parse and view construction cost")
+    parser.add_argument('--loads', type=int, default=200)
+    parser.add_argument('--views', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+"""
+Drives synthetic event streams through the real Cogs, the way discord.py dispatches gateway events, and reports
+throughput, per-listener latency, database statements and REST calls per event.
+
+    python -m benchmark.event_load --messages-per-second 200 --hops-per-second 5 --duration 20
+
+Messages go to Achievement_Cog and Create_Invitation_Cog, reactions to Achievement_Cog, voice hops to
+Voice_Channel_Cog and Achievement_Cog, member joins to Welcome_Cog (needs PIL and the font from config.json).
+Giveaway clicks have their own benchmark in giveaway_join_load.
+"""
+import argparse
+import asyncio
+import bisect
+import importlib.util
+import logging
+import os
+import random
+import socket
+import tempfile
+import time
+
+from aiohttp import web
+
+from achievement_cog import AchievementCog
+from action_scheduler_cog import ActionSchedulerCog
+from create_invitation_cog import CreateInvitationCog
+from dm_delivery_cog import DMDeliveryCog
+from illegal_team_act_cog import IllegalTeamActCog
+from loop_monitor import LoopMonitor
+from metrics import BotMetrics
+from voice_channel_cog import VoiceStateCog
+from benchmark.fakes import (FakeAsset, FakeBot, FakeChannel, FakeGuild, FakeMessage, FakeReaction, FakeVoiceState,
+                             RestCounter, counting_sqlite, load_config, percentile, wait_for_scheduler)
+
+# Messages Create_Invitation_Cog answers with an invitation or a warning, and ones it ignores
+TEAM_MESSAGES = ('缺1', '=2', 'q3 rank', '等一', '缺n aram', 'Q2 flex')
+CHAT_MESSAGES = ('hello', 'gg', 'anyone up for a game later?', 'lol', 'nice one', 'brb 5 min')
+
+
+class Streams:
+    """Creates the synthetic events, one method per stream, each call dispatches one event."""
+
+    def __init__(self, bot, guild, text_channel, creators, avatar_url, args):
+        self.bot = bot
+        self.guild = guild
+        self.text_channel = text_channel
+        self.creators = creators
+        self.avatar_url = avatar_url
+        self.args = args
+        self.recent_messages = []
+        self.joins = []  # (member, perf_counter of the join) of every join of a creator channel
+
+    def message(self):
+        member = random.choice(self.guild.members)
+        content = random.choice(TEAM_MESSAGES if random.random() < self.args.team_ratio else CHAT_MESSAGES)
+        message = FakeMessage(self.text_channel, content, author=member)
+        self.recent_messages = (self.recent_messages + [message])[-50:]
+        self.bot.dispatch('message', message)
+
+    def reaction(self):
+        message = random.choice(self.recent_messages) if self.recent_messages else FakeMessage(self.text_channel)
+        self.bot.dispatch('reaction_add', FakeReaction(message), random.choice(self.guild.members))
+
+    def hop(self):
+        member = random.choice(self.guild.members)
+        if member.voice is not None and random.random() < 0.5:
+            self.guild.voice_update(member, None)
+            return
+        # Joining a creator channel from nowhere or from another room, Voice_Channel_Cog moves them on
+        self.joins.append((member, time.perf_counter()))
+        self.guild.voice_update(member, random.choice(self.creators))
+
+    def member_join(self):
+        member = self.guild.add_member()
+        member.display_avatar = FakeAsset(self.avatar_url)
+        self.bot.dispatch('member_join', member)
+
+
+def join_to_move(joins):
+    """Seconds from joining a creator channel to being moved into the room, and the joins never moved."""
+    latencies, not_moved = [], 0
+    for member, joined_at in joins:
+        index = bisect.bisect_left(member.moves, joined_at)
+        if index < len(member.moves):
+            latencies.append(member.moves[index] - joined_at)
+        else:
+            not_moved += 1
+    return latencies, not_moved
+
+
+async def drive(rate, duration, create_event):
+    """Open loop: events are dispatched on schedule whether or not the Cogs kept up with the previous ones."""
+    count = int(rate * duration)
+    started = time.perf_counter()
+    for index in range(count):
+        delay = started + index / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        create_event()
+    return count
+
+
+async def drain(bot, voice_cog, timeout):
+    """Wait until every listener, queued join and scheduled REST call is done, moves dispatch new events."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await bot.wait_for_listeners()
+        for queue in list(voice_cog.join_queues.values()):
+            await asyncio.wait_for(queue.join(), max(deadline - time.monotonic(), 0.01))
+        await wait_for_scheduler(voice_cog.scheduler, max(deadline - time.monotonic(), 0.01))
+        if not bot.listener_tasks:
+            return True
+    return False
+
+
+async def start_avatar_server(rest):
+    """Local stand-in for the Discord CDN, every download counts as a REST call."""
+    from PIL import Image
+    import io
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (128, 128), (88, 101, 242)).save(buffer, 'PNG')
+    avatar = buffer.getvalue()
+
+    async def serve(request):
+        await rest.call('avatar_download')
+        return web.Response(body=avatar, content_type='image/png')
+
+    app = web.Application()
+    app.router.add_get('/avatar.png', serve)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    await web.SockSite(runner, sock).start()
+    return runner, f"http://127.0.0.1:{sock.getsockname()[1]}/avatar.png"
+
+
+async def setup(directory, args):
+    rest = RestCounter(latency=args.rest_latency)
+    overrides = {}
+    if args.joins_per_second:
+        from PIL import Image
+        background = os.path.join(directory, 'background.png')
+        Image.new('RGBA', (1200, 700), (30, 30, 30, 255)).save(background)
+        overrides['background_image'] = background
+    bot = FakeBot(load_config(os.path.join(directory, 'bench.db'), **overrides), rest)
+    config = bot.services.get('config')
+    if args.joins_per_second and not os.path.exists(config.font_path):
+        raise SystemExit(f"--joins-per-second needs the font {config.font_path} from config.json")
+
+    # One guild with the creator channels of config.json, a lobby some members start in and a text channel
+    guild = FakeGuild(bot, config.guild_id)
+    rooms = guild.add_category('Rooms')
+    creators = [guild.add_voice_channel(f"Create {channel_id}", rooms, int(channel_id))
+                for channel_id in config.channel_configs]
+    lobby = guild.add_voice_channel('Lobby', guild.add_category('Lobby'))
+    text_channel = bot.add_channel(FakeChannel(rest, name='general'))
+    bot.add_channel(FakeChannel(rest, config.welcome_channel_id, 'welcome'))
+    for index in range(args.users):
+        member = guild.add_member()
+        if index < args.users * args.voice_ratio:
+            member.voice = FakeVoiceState(lobby)
+            lobby.members.append(member)
+
+    # Same order as bot.py
+    cogs = [ActionSchedulerCog(bot), DMDeliveryCog(bot), IllegalTeamActCog(bot), VoiceStateCog(bot)]
+    avatar_runner, avatar_url = None, None
+    if args.joins_per_second:
+        from welcome_cog import WelcomeCog
+        cogs.append(WelcomeCog(bot))
+        avatar_runner, avatar_url = await start_avatar_server(rest)
+    cogs += [CreateInvitationCog(bot), AchievementCog(bot)]
+    for cog in cogs:
+        bot.add_fake_cog(cog)
+        if hasattr(cog, 'cog_load'):
+            await cog.cog_load()
+
+    # on_ready creates the tables, the same as after a real login
+    bot.dispatch('ready')
+    await bot.wait_for_listeners()
+    bot.ready.set()
+    bot.listener_latencies.clear()
+
+    streams = Streams(bot, guild, text_channel, creators, avatar_url, args)
+    return bot, cogs, streams, avatar_runner
+
+
+async def measure(bot, feed, args):
+    """
+    Await feed(), which dispatches the events and returns how many, then wait until the Cogs are done.
+    The event loop lag, database statements and REST calls of the whole run are measured along the way.
+    """
+    metrics = BotMetrics()
+    monitor = LoopMonitor(metrics.loop_lag, metrics.loop_blocked, 0.01, args.stall_ms / 1000)
+    rest_before = dict(bot.rest.calls)
+    monitor.start()
+    with counting_sqlite() as counter:
+        counter.reset()
+        started = time.perf_counter()
+        events = await feed()
+        dispatched = time.perf_counter() - started
+        drained = await drain(bot, bot.get_cog('VoiceStateCog'), args.drain_timeout)
+        elapsed = time.perf_counter() - started
+        statements, connections = counter.statements, counter.connections
+    monitor.stop()
+    return {
+        'events': events,
+        'dispatched': dispatched,
+        'elapsed': elapsed,
+        'drained': drained,
+        'statements': statements,
+        'connections': connections,
+        'rest_calls': {kind: count - rest_before.get(kind, 0) for kind, count in bot.rest.calls.items()
+                       if count != rest_before.get(kind, 0)},
+        'lag': monitor.recent_summary() or {'p50': 0.0, 'p99': 0.0, 'max': 0.0},
+        'stalls': sum(metrics.loop_blocked.values.values()),
+    }
+
+
+async def teardown(cogs, avatar_runner):
+    for cog in reversed(cogs):
+        result = cog.cog_unload()
+        if asyncio.iscoroutine(result):
+            await result
+    if avatar_runner is not None:
+        await avatar_runner.cleanup()
+
+
+def report(bot, result, joins, stall_ms):
+    events, elapsed, lag = result['events'], result['elapsed'], result['lag']
+    print(f"Events:               {events} in {result['dispatched']:.2f}s dispatched, all handled after "
+          f"{elapsed:.2f}s ({events / elapsed:.0f} events/s){'' if result['drained'] else ', DRAIN TIMED OUT'}")
+    print(f"DB statements/event:  {result['statements'] / max(events, 1):.2f} "
+          f"({result['connections'] / max(events, 1):.2f} connections/event)")
+    print(f"REST calls/event:     {sum(result['rest_calls'].values()) / max(events, 1):.2f} {result['rest_calls']}")
+    print(f"Event loop lag:       p50 {lag['p50']:.1f} ms, p99 {lag['p99']:.1f} ms, max {lag['max']:.1f} ms, "
+          f"stalls over {stall_ms} ms: {result['stalls']}")
+    if joins:
+        latencies, not_moved = join_to_move(joins)
+        print(f"Join to move:         p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, "
+              f"max {max(latencies, default=0) * 1000:.0f} ms, {not_moved} of {len(joins)} joins "
+              f"never moved (left or hopped on before their turn)")
+    print(f"{'Listener':<44} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>7}")
+    for name, latencies in sorted(bot.listener_latencies.items()):
+        print(f"{name:<44} {len(latencies):>7} {percentile(latencies, 0.5) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+              f"{max(latencies) * 1000:>8.1f} {bot.listener_errors.get(name, 0):>7}")
+
+
+async def run(args):
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        bot, cogs, streams, avatar_runner = await setup(directory, args)
+        rates = [(args.messages_per_second, streams.message), (args.reactions_per_second, streams.reaction),
+                 (args.hops_per_second, streams.hop), (args.joins_per_second, streams.member_join)]
+
+        async def feed():
+            counts = await asyncio.gather(*(drive(rate, args.duration, create_event)
+                                            for rate, create_event in rates if rate))
+            return sum(counts)
+
+        result = await measure(bot, feed, args)
+        await teardown(cogs, avatar_runner)
+    report(bot, result, streams.joins, args.stall_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic event streams through the real Cogs")
+    parser.add_argument('--messages-per-second', type=float, default=50)
+    parser.add_argument('--reactions-per-second', type=float, default=10)
+    parser.add_argument('--hops-per-second', type=float, default=2, help="voice channel joins, hops and leaves")
+    parser.add_argument('--joins-per-second', type=float, default=0, help="new members, needs PIL")
+    parser.add_argument('--duration', type=float, default=10, help="seconds every stream runs")
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--voice-ratio', type=float, default=0.3, help="members that start in a voice channel")
+    parser.add_argument('--team-ratio', type=float, default=0.1, help="messages that look for teammates")
+    parser.add_argument('--rest-latency', type=float, default=0.05, help="simulated Discord round trip in seconds")
+    parser.add_argument('--stall-ms', type=int, default=100, help="log the stack when the loop blocks this long")
+    parser.add_argument('--drain-timeout', type=float, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    if args.joins_per_second and importlib.util.find_spec('PIL') is None:
+        parser.error("--joins-per-second needs Pillow for the welcome image")
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
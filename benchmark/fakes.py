@@ -0,0 +1,490 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import asyncio
+import contextlib
+import functools
+import itertools
+import json
+import logging
+import sqlite3
+import time
+
+import aiosqlite
+import discord
+
+from config_cog import Config
+from database import Database
+from services import ServiceRegistry
+from view_registry import ViewRegistry
+
+_ids = itertools.count(900000000000000000)
+
+
+def next_id():
+    return next(_ids)
+
+
+class RestCounter:
+    """Counts the calls that would have been Discord REST requests, by kind."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency  # Simulated round trip of every call
+        self.calls = {}
+
+    async def call(self, kind):
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    @property
+    def total(self):
+        return sum(self.calls.values())
+
+
+class CountingConnection(sqlite3.Connection):
+    """sqlite3 connection that counts every statement it runs, including BEGIN and COMMIT."""
+    statements = 0
+    connections = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingConnection.connections += 1
+        self.set_trace_callback(self.count)
+
+    @staticmethod
+    def count(statement):
+        CountingConnection.statements += 1
+
+    @classmethod
+    def reset(cls):
+        cls.statements = 0
+        cls.connections = 0
+
+
+@contextlib.contextmanager
+def counting_sqlite():
+    """Make every aiosqlite.connect of the Cogs use CountingConnection while the block runs."""
+    original = aiosqlite.connect
+    aiosqlite.connect = functools.partial(original, factory=CountingConnection)
+    try:
+        yield CountingConnection
+    finally:
+        aiosqlite.connect = original
+
+
+class FakeHTTPResponse:
+    """What discord.HTTPException expects as the response of a failed request."""
+
+    def __init__(self, status, reason=''):
+        self.status = status
+        self.reason = reason
+
+
+class FakeUser:
+    def __init__(self, user_id=None, name=None, rest=None):
+        self.id = user_id or next_id()
+        self.name = name or f"user{self.id}"
+        self.display_name = self.name
+        self.mention = f"<@{self.id}>"
+        self.bot = False
+        self.roles = []
+        self.voice = None
+        self.avatar = None
+        self.rest = rest
+        self.dms = []
+
+    async def send(self, content=None, **kwargs):
+        if self.rest is not None:
+            await self.rest.call('dm')
+        self.dms.append(content)
+
+
+class FakeMessage(discord.Message):
+    """A discord.Message subclass so isinstance checks in the Cogs pass, none of its gateway state is set up."""
+
+    def __init__(self, channel, content=None, embed=None, view=None, author=None):
+        self.id = next_id()
+        self.channel = channel
+        self.content = content
+        self.embeds = [embed] if embed is not None else []
+        self.view = view
+        self.author = author
+        self.guild = getattr(author, 'guild', None)
+
+    def __repr__(self):
+        return f"<FakeMessage id={self.id}>"
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def edit(self, **kwargs):
+        await self.channel.rest.call('edit')
+        if 'embed' in kwargs:
+            self.embeds = [kwargs['embed']]
+        if 'view' in kwargs:
+            self.view = kwargs['view']
+        if 'content' in kwargs:
+            self.content = kwargs['content']
+        return self
+
+
+class FakeChannel:
+    def __init__(self, rest, channel_id=None, name='channel'):
+        self.id = channel_id or next_id()
+        self.name = name
+        self.mention = f"<#{self.id}>"
+        self.rest = rest
+        self.messages = {}
+
+    async def send(self, content=None, embed=None, view=None, **kwargs):
+        await self.rest.call('send')
+        message = FakeMessage(self, content, embed, view)
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id):
+        await self.rest.call('fetch_message')
+        message = self.messages.get(int(message_id))
+        if message is None:
+            raise discord.NotFound(FakeHTTPResponse(404, 'Not Found'), 'Unknown Message')
+        return message
+
+
+class FakeReaction:
+    def __init__(self, message, emoji='\N{THUMBS UP SIGN}'):
+        self.message = message
+        self.emoji = emoji
+        self.count = 1
+
+
+class FakeAsset:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeRole:
+    def __init__(self, role_id=None, name='@everyone'):
+        self.id = role_id or next_id()
+        self.name = name
+
+
+class FakeInvite:
+    def __init__(self):
+        self.url = f"https://discord.gg/{next_id():x}"
+
+
+class FakeVoiceState:
+    def __init__(self, channel=None):
+        self.channel = channel
+
+
+class FakeCategory:
+    def __init__(self, guild, name, position=0, category_id=None):
+        self.id = category_id or next_id()
+        self.guild = guild
+        self.name = name
+        self.position = position
+        self.channels = []
+
+    async def delete(self, reason=None):
+        await self.guild.rest.call('delete_channel')
+        self.guild.remove_category(self)
+
+
+class FakeVoiceChannel:
+    def __init__(self, guild, name, category=None, channel_id=None):
+        self.id = channel_id or next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.mention = f"<#{self.id}>"
+        self.members = []
+        self.overwrites = {}
+
+    async def edit(self, name=None, overwrites=None, reason=None, **kwargs):
+        await self.guild.rest.call('edit_channel')
+        if name is not None:
+            self.name = name
+        if overwrites is not None:
+            self.overwrites = overwrites
+
+    async def delete(self, reason=None):
+        await self.guild.rest.call('delete_channel')
+        self.guild.remove_channel(self)
+
+    async def create_invite(self, max_age=0, **kwargs):
+        await self.guild.rest.call('create_invite')
+        return FakeInvite()
+
+
+class FakeMember(FakeUser):
+    def __init__(self, guild, user_id=None, name=None):
+        super().__init__(user_id, name, guild.rest)
+        self.guild = guild
+        self.display_avatar = FakeAsset(f"https://cdn.discordapp.com/avatars/{self.id}/avatar.png")
+        self.moves = []  # perf_counter of every move_to, the voice benchmark measures join to move
+
+    async def move_to(self, channel, reason=None):
+        await self.guild.rest.call('move_member')
+        self.moves.append(time.perf_counter())
+        self.guild.voice_update(self, channel)
+
+
+class FakeGuild:
+    """Categories, voice channels and members of one guild, voice changes are dispatched like the gateway does."""
+
+    def __init__(self, bot, guild_id=None, name='guild'):
+        self.bot = bot
+        self.rest = bot.rest
+        self.id = guild_id or next_id()
+        self.name = name
+        self.default_role = FakeRole(self.id)
+        self.categories = []
+        self.members = []
+        self.member_map = {}
+        bot.guilds.append(self)
+
+    @property
+    def member_count(self):
+        return len(self.members)
+
+    def get_member(self, user_id):
+        return self.member_map.get(user_id)
+
+    def add_member(self, member=None):
+        member = member or FakeMember(self)
+        self.members.append(member)
+        self.member_map[member.id] = member
+        self.bot.users[member.id] = member
+        return member
+
+    def add_category(self, name, category_id=None):
+        category = FakeCategory(self, name, len(self.categories), category_id)
+        self.categories.append(category)
+        self.bot.channels[category.id] = category
+        return category
+
+    def add_voice_channel(self, name, category=None, channel_id=None):
+        channel = FakeVoiceChannel(self, name, category, channel_id)
+        if category is not None:
+            category.channels.append(channel)
+        self.bot.channels[channel.id] = channel
+        return channel
+
+    def remove_channel(self, channel):
+        if channel.category is not None and channel in channel.category.channels:
+            channel.category.channels.remove(channel)
+        self.bot.channels.pop(channel.id, None)
+
+    def remove_category(self, category):
+        if category in self.categories:
+            self.categories.remove(category)
+        self.bot.channels.pop(category.id, None)
+
+    async def create_voice_channel(self, name, category=None, overwrites=None, **kwargs):
+        await self.rest.call('create_channel')
+        channel = self.add_voice_channel(name, category)
+        channel.overwrites = overwrites or {}
+        return channel
+
+    async def create_category(self, name, position=0, **kwargs):
+        await self.rest.call('create_channel')
+        return self.add_category(name)
+
+    def voice_update(self, member, channel):
+        """Move a member to a voice channel, or out of voice with None, and dispatch voice_state_update."""
+        before = FakeVoiceState(member.voice.channel if member.voice else None)
+        if before.channel is not None and member in before.channel.members:
+            before.channel.members.remove(member)
+        member.voice = FakeVoiceState(channel) if channel is not None else None
+        if channel is not None:
+            channel.members.append(member)
+        self.bot.dispatch('voice_state_update', member, before, FakeVoiceState(channel))
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self.done = False
+
+    def is_done(self):
+        return self.done
+
+    async def respond(self, kind):
+        if self.done:
+            raise RuntimeError("This interaction has already been responded to")
+        self.done = True
+        self.interaction.responded_at = time.perf_counter()
+        await self.interaction.rest.call(kind)
+
+    async def send_message(self, content=None, **kwargs):
+        self.interaction.sent.append(content)
+        await self.respond('interaction_response')
+
+    async def defer(self, **kwargs):
+        await self.respond('interaction_defer')
+
+    async def edit_message(self, **kwargs):
+        await self.respond('interaction_response')
+
+    async def send_modal(self, modal):
+        await self.respond('interaction_response')
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        self.interaction.sent.append(content)
+        await self.interaction.rest.call('followup')
+
+
+class FakeInteraction:
+    def __init__(self, rest, user, channel=None, guild=None, data=None):
+        self.rest = rest
+        self.user = user
+        self.channel = channel
+        self.channel_id = channel.id if channel is not None else None
+        self.guild = guild
+        self.data = data or {}
+        self.message = None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.created_at = time.perf_counter()
+        self.responded_at = None
+        self.sent = []
+
+    @property
+    def latency(self):
+        """Seconds from the click to the first response, Discord allows 3."""
+        return None if self.responded_at is None else self.responded_at - self.created_at
+
+
+class FakeBot:
+    """
+    Just enough of commands.Bot for the Cogs: services, cog lookup, listeners, channel / user cache and readiness.
+    Every listener call is timed, by the listener's qualified name, in listener_latencies.
+    """
+
+    def __init__(self, config, rest=None):
+        self.rest = rest or RestCounter()
+        self.services = ServiceRegistry()
+        self.services.register('config', config)
+        self.services.register('db', Database(config.db_path))
+        self.services.register('views', ViewRegistry(config.view_registry_max_views))
+        self.cogs = {}
+        self.channels = {}
+        self.users = {}
+        self.guilds = []
+        self.user = FakeUser(name='bot')
+        self.user.bot = True
+        self.ready = asyncio.Event()
+        self.views = []
+        self.dynamic_items = []
+        self.extra_events = {}  # event name -> listeners, like commands.Bot
+        self.listener_tasks = set()
+        self.listener_latencies = {}
+        self.listener_errors = {}
+
+    def add_fake_cog(self, cog):
+        self.cogs[type(cog).__name__] = cog
+        for name, listener in getattr(cog, 'get_listeners', list)():
+            self.add_listener(listener, name)
+        return cog
+
+    def add_listener(self, func, name):
+        self.extra_events.setdefault(name, []).append(func)
+
+    def remove_listener(self, func, name):
+        if func in self.extra_events.get(name, []):
+            self.extra_events[name].remove(func)
+
+    def dispatch(self, event, *args):
+        """Run every listener of the event in its own task, the way discord.py schedules them."""
+        for listener in self.extra_events.get('on_' + event, []):
+            self.run_in_task(listener, *args)
+
+    def run_in_task(self, listener, *args):
+        """Run and time a listener or view callback in its own task, wait_for_listeners waits for it."""
+        task = asyncio.create_task(self.run_listener(listener, args))
+        self.listener_tasks.add(task)
+        task.add_done_callback(self.listener_tasks.discard)
+
+    async def run_listener(self, listener, args):
+        name = listener.__qualname__
+        started = time.perf_counter()
+        try:
+            await listener(*args)
+        except Exception as e:
+            self.listener_errors[name] = self.listener_errors.get(name, 0) + 1
+            logging.error(f"Ignoring exception in {name}: {e!r}")
+        finally:
+            self.listener_latencies.setdefault(name, []).append(time.perf_counter() - started)
+
+    async def wait_for_listeners(self):
+        while self.listener_tasks:
+            await asyncio.gather(*self.listener_tasks)
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    def add_channel(self, channel):
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_channel(self, channel_id):
+        return self.channels.get(int(channel_id))
+
+    def get_user(self, user_id):
+        return self.users.get(int(user_id))
+
+    async def fetch_user(self, user_id):
+        await self.rest.call('fetch_user')
+        return self.users[int(user_id)]
+
+    def add_dynamic_items(self, *items):
+        self.dynamic_items.extend(items)
+
+    def remove_dynamic_items(self, *items):
+        for item in items:
+            if item in self.dynamic_items:
+                self.dynamic_items.remove(item)
+
+    def add_view(self, view, message_id=None):
+        self.views.append((view, message_id))
+
+    @property
+    def persistent_views(self):
+        return [view for view, _ in self.views]
+
+    def is_closed(self):
+        return False
+
+    async def wait_until_ready(self):
+        await self.ready.wait()
+
+
+def load_config(db_path, path='config.json', **overrides):
+    """The repository's config.json pointed at a scratch database."""
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    data['db_path'] = db_path
+    data.update(overrides)
+    return Config.from_dict(data, path)
+
+
+async def wait_for_scheduler(scheduler, timeout=30):
+    """Wait until the action scheduler has nothing queued or running."""
+    deadline = time.monotonic() + timeout
+    while (scheduler.queue or scheduler.running) and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
@@ -0,0 +1,162 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+"""
+Fires concurrent join / exit clicks at one giveaway through the real GiveawayParticipationView and GiveawayCog,
+then checks the participant table against what the clicks should have produced.
+
+    python -m benchmark.giveaway_join_load --users 2000 --leave-ratio 0.1 --repeat-ratio 0.1
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import random
+import tempfile
+import time
+
+import aiosqlite
+
+from action_scheduler_cog import ActionSchedulerCog
+from dm_delivery_cog import DMDeliveryCog
+from giveaway_cog import GiveawayCog, GiveawayConfirmationView, GiveawayParticipationView
+from illegal_team_act_cog import IllegalTeamActCog
+from benchmark.fakes import (FakeBot, FakeChannel, FakeInteraction, FakeUser, RestCounter, counting_sqlite,
+                             load_config, next_id, percentile, wait_for_scheduler)
+
+ACHIEVEMENTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS achievements (
+        user_id INTEGER PRIMARY KEY,
+        message_count INTEGER DEFAULT 0,
+        reaction_count INTEGER DEFAULT 0,
+        time_spent INTEGER DEFAULT 0,
+        giveaway_count INTEGER DEFAULT 0
+    )
+'''
+
+
+async def setup(db_path, args):
+    rest = RestCounter(latency=args.rest_latency)
+    bot = FakeBot(load_config(db_path), rest)
+    channel = bot.add_channel(FakeChannel(rest, bot.services.get('config').giveaway_channel_id, 'giveaway'))
+
+    bot.add_fake_cog(ActionSchedulerCog(bot)).scheduler.start()
+    bot.add_fake_cog(DMDeliveryCog(bot))
+    bot.add_fake_cog(IllegalTeamActCog(bot))
+    cog = bot.add_fake_cog(GiveawayCog(bot))
+    await cog.cog_load()
+
+    # Users, some of them below the message requirement
+    users = [FakeUser(rest=rest) for _ in range(args.users)]
+    ineligible = set(random.sample(range(len(users)), int(len(users) * args.ineligible_ratio)))
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(ACHIEVEMENTS_TABLE)
+        await db.executemany('INSERT INTO achievements (user_id, message_count) VALUES (?, ?)',
+                             [(user.id, 0 if index in ineligible else 10) for index, user in enumerate(users)])
+        await db.commit()
+
+    # A running giveaway with a message requirement of 5
+    giveaway_id = str(next_id() % 10 ** 10)
+    embed = GiveawayConfirmationView(bot).create_embed(giveaway_id, 'Prize', 'Load test', 1, 60, 'Bench', None)
+    view = GiveawayParticipationView(bot, giveaway_id, channel.id)
+    message = await channel.send(embed=embed, view=view)
+    view.message_id = message.id
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            'INSERT INTO giveaway (giveaway_id, message_id, starttime, duration, winner_number, prizes, description, '
+            'creator_id, reaction_req, message_req, timespent_req) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (giveaway_id, message.id, datetime.datetime.now().isoformat(), 60, 1, 'Prize', 'Load test', 0, 0, 5, 0))
+        await db.commit()
+
+    return bot, cog, view, channel, users, ineligible, giveaway_id
+
+
+async def user_session(view, channel, user, repeat, leave, ramp, latencies, unanswered):
+    async def click(callback):
+        interaction = FakeInteraction(view.bot.rest, user, channel)
+        await callback(interaction)
+        if interaction.latency is None:
+            unanswered.append(user.id)
+        else:
+            latencies.append(interaction.latency)
+
+    await asyncio.sleep(random.uniform(0, ramp))
+    await click(view.participate)
+    if repeat:
+        await click(view.participate)
+    if leave:
+        await click(view.exit)
+
+
+async def run(args):
+    random.seed(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'bench.db')
+        bot, cog, view, channel, users, ineligible, giveaway_id = await setup(db_path, args)
+
+        repeaters = set(random.sample(range(len(users)), int(len(users) * args.repeat_ratio)))
+        leavers = set(index for index in random.sample(range(len(users)), int(len(users) * args.leave_ratio))
+                      if index not in ineligible)
+        clicks = len(users) + len(repeaters) + len(leavers)
+
+        latencies, unanswered = [], []
+        rest_before = bot.rest.total
+        with counting_sqlite() as counter:
+            counter.reset()
+            started = time.perf_counter()
+            await asyncio.gather(*(user_session(view, channel, user, index in repeaters, index in leavers,
+                                                args.ramp, latencies, unanswered)
+                                   for index, user in enumerate(users)))
+            elapsed = time.perf_counter() - started
+            statements, connections = counter.statements, counter.connections
+
+            # Let the coalesced embed edits finish so their REST calls are counted too
+            await wait_for_scheduler(cog.scheduler)
+        rest_calls = dict(bot.rest.calls)
+
+        # Compare the stored participants with what the clicks should have left behind
+        expected = {user.id for index, user in enumerate(users) if index not in ineligible and index not in leavers}
+        async with aiosqlite.connect(db_path) as db:
+            cursor = await db.execute('SELECT user_id, slot FROM giveaway_participants WHERE giveaway_id = ?',
+                                      (giveaway_id,))
+            rows = await cursor.fetchall()
+        stored = [user_id for user_id, _ in rows]
+        slots = sorted(slot for _, slot in rows)
+
+        await cog.cog_unload()
+        await cog.scheduler.close()
+
+    print(f"Clicks:               {clicks} from {len(users)} users in {elapsed:.2f}s "
+          f"({len(ineligible)} ineligible, {len(repeaters)} double clicks, {len(leavers)} exits)")
+    print(f"Click latency:        p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+          f"max {max(latencies, default=0) * 1000:.1f} ms, over 3s: {sum(latency > 3 for latency in latencies)}")
+    print(f"Unanswered clicks:    {len(unanswered)}")
+    print(f"DB statements/click:  {statements / clicks:.2f} ({connections / clicks:.2f} connections/click)")
+    print(f"REST calls/click:     {(bot.rest.total - rest_before) / clicks:.2f} {rest_calls}")
+    print(f"Participants:         {len(stored)} stored, {len(expected)} expected")
+    print(f"Lost participants:    {len(expected - set(stored))}")
+    print(f"Unexpected entries:   {len(set(stored) - expected)}")
+    print(f"Duplicate entries:    {len(stored) - len(set(stored))}")
+    print(f"Slots dense:          {slots == list(range(len(slots)))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Giveaway join / exit load test")
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--ineligible-ratio', type=float, default=0.1)
+    parser.add_argument('--repeat-ratio', type=float, default=0.1, help="users who click join twice")
+    parser.add_argument('--leave-ratio', type=float, default=0.1, help="users who exit after joining")
+    parser.add_argument('--ramp', type=float, default=0.0, help="spread the first clicks over this many seconds")
+    parser.add_argument('--rest-latency', type=float, default=0.05, help="simulated Discord round trip in seconds")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
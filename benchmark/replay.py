@@ -0,0 +1,277 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+"""
+Replays gateway events recorded by Event_Recorder_Cog through the real Cogs of a fake guild, at the recorded pace
+or as fast as possible, and reports the same numbers as event_load.
+
+    python -m benchmark.replay events.jsonl --speed 1
+    python -m benchmark.replay events.jsonl --speed 0
+
+Rotated files next to the given one (events.jsonl.1, .2, ...) are replayed first, oldest first. The time between
+two recording sessions, e.g. while the bot was restarting, is left out.
+
+Voice rooms are created again by Voice_Channel_Cog during the replay, so a recorded room is found through its
+owner: the member the bot moved into it. Recorded moves out of a creator channel into a new room were the bot's
+own and are not replayed, Voice_Channel_Cog makes them itself.
+"""
+import argparse
+import asyncio
+import datetime
+import importlib.util
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+
+from giveaway_cog import GiveawayCog, GiveawayConfirmationView, GiveawayParticipationView
+from benchmark import event_load
+from benchmark.fakes import (FakeAsset, FakeChannel, FakeInteraction, FakeMessage, FakeReaction, FakeVoiceState,
+                             next_id)
+
+
+def recording_files(path):
+    """The given file and its rotated backups, oldest first."""
+    backups = []
+    directory = os.path.dirname(path) or '.'
+    pattern = re.compile(re.escape(os.path.basename(path)) + r'\.(\d+)$')
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            backups.append((int(match.group(1)), os.path.join(directory, name)))
+    return [backup for _, backup in sorted(backups, reverse=True)] + [path]
+
+
+def read_events(paths):
+    """
+    All events of the files in order, ids namespaced by session and times in ms from the start of the first one.
+    A file that starts in the middle of a session, because its beginning was rotated away, starts a session too.
+    """
+    events = []
+    session, offset, last = -1, 0, 0
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['e'] == 'session' or session < 0:
+                    session += 1
+                    # Sessions follow each other with a second in between
+                    offset = last + 1000 if events else 0
+                if record['e'] == 'session':
+                    continue
+                record['s'] = session
+                record['t'] += offset
+                last = record['t']
+                events.append(record)
+    return events
+
+
+class Replayer:
+    """Turns recorded events back into the fake guild's events, one method per event kind."""
+
+    def __init__(self, bot, streams, giveaways):
+        self.bot = bot
+        self.guild = streams.guild
+        self.streams = streams
+        self.creators = {channel.id: channel for channel in streams.creators}
+        self.giveaways = giveaways  # (session, pseudonym) -> GiveawayParticipationView
+        self.giveaway_channel = bot.get_channel(bot.services.get('config').giveaway_channel_id)
+        self.members = {}  # (session, pseudonym) -> FakeMember
+        self.text_channels = {}
+        self.rooms = {}  # (session, pseudonym) -> member the bot moved into the room
+        self.static_rooms = {}
+        self.seen_rooms = set()
+        self.room_category = self.guild.add_category('Replayed rooms')
+        self.last_message = None
+        self.skipped = 0
+
+    def member(self, record):
+        key = (record['s'], record['u'])
+        member = self.members.get(key)
+        if member is None:
+            member = self.members[key] = self.guild.add_member()
+        return member
+
+    def voice_channel(self, session, channel_id):
+        """The replay's channel for a recorded voice channel id, None stays None."""
+        if channel_id is None:
+            return None
+        if channel_id in self.creators:
+            return self.creators[channel_id]
+        key = (session, channel_id)
+        owner = self.rooms.get(key)
+        if owner is not None and owner.voice is not None and owner.voice.channel.id not in self.creators:
+            return owner.voice.channel
+        # A room of someone who left meanwhile, or one that existed before the recording started
+        channel = self.static_rooms.get(key)
+        if channel is None:
+            channel = self.static_rooms[key] = self.guild.add_voice_channel(f"Room {channel_id}", self.room_category)
+        return channel
+
+    def text_channel(self, session, channel_id):
+        channel = self.bot.get_channel(channel_id) if channel_id and channel_id > 0 else None
+        if channel is not None:
+            return channel
+        key = (session, channel_id)
+        if key not in self.text_channels:
+            self.text_channels[key] = self.bot.add_channel(FakeChannel(self.bot.rest, name=f"text {channel_id}"))
+        return self.text_channels[key]
+
+    def replay(self, record):
+        getattr(self, 'replay_' + record['e'])(record)
+
+    def replay_m(self, record):
+        member = self.member(record)
+        # Voice changes of the author may not be in the recording, the message says where they are
+        channel = self.voice_channel(record['s'], record.get('vc'))
+        current = member.voice.channel if member.voice else None
+        if channel is not current:
+            if current is not None and member in current.members:
+                current.members.remove(member)
+            member.voice = FakeVoiceState(channel) if channel is not None else None
+            if channel is not None:
+                channel.members.append(member)
+        message = FakeMessage(self.text_channel(record['s'], record['ch']), record['c'], author=member)
+        self.last_message = message
+        self.bot.dispatch('message', message)
+
+    def replay_r(self, record):
+        message = self.last_message or FakeMessage(self.streams.text_channel)
+        self.bot.dispatch('reaction_add', FakeReaction(message), self.member(record))
+
+    def replay_v(self, record):
+        member = self.member(record)
+        session, before, after = record['s'], record['b'], record['a']
+        if before in self.creators and after is not None and after not in self.creators \
+                and (session, after) not in self.seen_rooms:
+            # The bot moving the member into their new room, Voice_Channel_Cog does that itself
+            self.seen_rooms.add((session, after))
+            self.rooms[(session, after)] = member
+            return
+        if after is not None and after not in self.creators:
+            self.seen_rooms.add((session, after))
+        if before == after and member.voice is not None:
+            # Mute, deafen and the like
+            self.guild.voice_update(member, member.voice.channel)
+            return
+        channel = self.voice_channel(session, after)
+        if channel is None and member.voice is None:
+            return
+        if after in self.creators:
+            self.streams.joins.append((member, time.perf_counter()))
+        self.guild.voice_update(member, channel)
+
+    def replay_j(self, record):
+        if self.streams.avatar_url is None:
+            # Welcome_Cog needs PIL
+            self.skipped += 1
+            return
+        member = self.member(record)
+        member.display_avatar = FakeAsset(self.streams.avatar_url)
+        self.bot.dispatch('member_join', member)
+
+    def replay_g(self, record):
+        view = self.giveaways[(record['s'], record['g'])]
+        interaction = FakeInteraction(self.bot.rest, self.member(record), self.giveaway_channel)
+        self.bot.run_in_task(view.participate if record['k'] == 'participate' else view.exit, interaction)
+
+
+async def create_giveaways(bot, keys):
+    """A running giveaway without requirements for every recorded one, the way giveaway_join_load creates its own."""
+    cog = bot.add_fake_cog(GiveawayCog(bot))
+    await cog.cog_load()
+    config = bot.services.get('config')
+    channel = bot.get_channel(config.giveaway_channel_id) or \
+        bot.add_channel(FakeChannel(bot.rest, config.giveaway_channel_id, 'giveaway'))
+    views = {}
+    for key in keys:
+        giveaway_id = str(next_id() % 10 ** 10)
+        embed = GiveawayConfirmationView(bot).create_embed(giveaway_id, 'Prize', 'Replay', 1, 60, 'Replay', None)
+        view = GiveawayParticipationView(bot, giveaway_id, channel.id)
+        message = await channel.send(embed=embed, view=view)
+        view.message_id = message.id
+        cog.remember_giveaway_view(giveaway_id, view)
+        async with bot.services.get('db').connect() as db:
+            await db.execute(
+                'INSERT INTO giveaway (giveaway_id, message_id, starttime, duration, winner_number, prizes, '
+                'description, creator_id, reaction_req, message_req, timespent_req) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (giveaway_id, message.id, datetime.datetime.now().isoformat(), 60, 1, 'Prize', 'Replay', 0, 0, 0, 0))
+            await db.commit()
+        views[key] = view
+    return cog, views
+
+
+async def run(args, events):
+    random.seed(args.seed)
+    joined = {(record['s'], record['u']) for record in events if record['e'] == 'j'}
+    with_pil = importlib.util.find_spec('PIL') is not None
+    setup_args = argparse.Namespace(users=0, voice_ratio=0, joins_per_second=1 if joined and with_pil else 0,
+                                    rest_latency=args.rest_latency)
+    with tempfile.TemporaryDirectory() as directory:
+        bot, cogs, streams, avatar_runner = await event_load.setup(directory, setup_args)
+        giveaway_keys = sorted({(record['s'], record['g']) for record in events if record['e'] == 'g'})
+        views = {}
+        if giveaway_keys:
+            giveaway_cog, views = await create_giveaways(bot, giveaway_keys)
+            cogs.append(giveaway_cog)
+        replayer = Replayer(bot, streams, views)
+
+        # Everyone who didn't join during the recording was a member already, with a row in achievements
+        for record in events:
+            if 'u' in record and (record['s'], record['u']) not in joined:
+                replayer.member(record)
+        async with bot.services.get('db').connect() as db:
+            await db.executemany('INSERT OR IGNORE INTO achievements (user_id) VALUES (?)',
+                                 [(member.id,) for member in replayer.members.values()])
+            await db.commit()
+
+        async def feed():
+            started = time.perf_counter()
+            for record in events:
+                if args.speed:
+                    delay = started + record['t'] / 1000 / args.speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                replayer.replay(record)
+                if not args.speed:
+                    # Let the Cogs run between events, the gateway doesn't deliver everything at once either
+                    await asyncio.sleep(0)
+            return len(events) - replayer.skipped
+
+        result = await event_load.measure(bot, feed, args)
+        await event_load.teardown(cogs, avatar_runner)
+
+    print(f"Recording:            {len(events)} events over {events[-1]['t'] / 1000:.1f}s, "
+          f"{events[-1]['s'] + 1} session(s), {len(replayer.members)} members")
+    if replayer.skipped:
+        print(f"Skipped:              {replayer.skipped} member joins, Welcome_Cog needs PIL")
+    event_load.report(bot, result, streams.joins, args.stall_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded gateway events through the real Cogs")
+    parser.add_argument('recording', help="event_recorder_file of config.json, rotated backups are included")
+    parser.add_argument('--speed', type=float, default=1, help="1 is the recorded pace, 0 as fast as possible")
+    parser.add_argument('--rest-latency', type=float, default=0.05, help="simulated Discord round trip in seconds")
+    parser.add_argument('--stall-ms', type=int, default=100, help="log the stack when the loop blocks this long")
+    parser.add_argument('--drain-timeout', type=float, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    events = read_events(recording_files(args.recording))
+    if not events:
+        parser.error(f"{args.recording} has no recorded events")
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args, events))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,37 +4,68 @@
 # ========================================
 import discord
 from discord.ext import commands
+import argparse
+import hashlib
+import json
 import logging
+import os
+import sys
 
 from achievement_cog import AchievementCog
+from action_scheduler_cog import ActionSchedulerCog
 from backup_cog import BackupCog
-from config_cog import ConfigCog
+from config_cog import ConfigCog, ConfigError, load_config
+from database import Database
 from check_status_cog import CheckStatusCog
 from create_invitation_cog import CreateInvitationCog
+from dm_delivery_cog import DMDeliveryCog
+from event_recorder_cog import EventRecorderCog
 from game_dnd_cog import DnDCog
 from game_spymode_cog import SpyModeCog
 from giveaway_cog import GiveawayCog
 from illegal_team_act_cog import IllegalTeamActCog
+from metrics import BotMetrics
+from metrics_cog import MetricsCog, MetricsCommandTree
 from notebook_cog import NotebookCog
 from role_cog import RoleCog
+from services import ServiceRegistry
+from view_registry import ViewRegistry
 from voice_channel_cog import VoiceStateCog
 from welcome_cog import WelcomeCog
 
+parser = argparse.ArgumentParser()
+parser.add_argument('--force-sync', action='store_true', help="sync the slash commands even if they did not change")
+args, _ = parser.parse_known_args()
+
 intents = discord.Intents.all()
 intents.members = True
 intents.guilds = True
 intents.voice_states = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Created before the bot so its HTTP session traces every REST call
+metrics = BotMetrics()
+
+bot = commands.Bot(command_prefix="!", intents=intents, tree_cls=MetricsCommandTree, http_trace=metrics.rest_trace())
 
-# Call the function to get the configuration
-config_cog = ConfigCog(bot)
-config = config_cog.read_config('config.json')
+# Read and check the configuration once, every Cog and view shares this object
+try:
+    config = load_config('config.json')
+except ConfigError as e:
+    print(e)
+    sys.exit(1)
+
+# Shared objects the Cogs look up instead of building their own, the Cogs add the rest in setup()
+bot.services = ServiceRegistry()
+bot.services.register('config', config)
+bot.services.register('db', Database(config.db_path))
+bot.services.register('metrics', metrics)
+bot.services.register('views', ViewRegistry(config.view_registry_max_views))
 
 # Then replace the hardcoded values with the values from the configuration
-TOKEN = config['token']
-LOGGING_FILE = config['logging_file']
-GUILD_ID = config['guild_id']
+TOKEN = config.token
+LOGGING_FILE = config.logging_file
+GUILD_ID = config.guild_id
+COMMAND_HASH_FILE = config.command_hash_file
 
 # 配置日志系统
 logging.basicConfig(level=logging.INFO, filename=LOGGING_FILE, filemode='a',
@@ -49,18 +80,53 @@ async def on_ready():
             logging.info(f"\nThe robot is connected to the server {guild.name}\n")
             print(f"\nThe robot is connected to the server {guild.name}\n")
             await bot.change_presence(activity=discord.Game(name=f"Working on {guild.name}"))
-            await bot.tree.sync()
-            print("Commands Synced.")
+            await sync_commands_if_changed(force=args.force_sync)
 
         else:
             logging.info(f"Bot not allowed to connect to {guild.name}")
             print(f"Bot not allowed to connect to {guild.name}")
 
 
+def command_tree_hash():
+    # Hash of everything Discord receives on a sync, in a stable order
+    payload = [command.to_dict(bot.tree) for command in bot.tree.get_commands()]
+    payload.sort(key=lambda command: (command.get('type', 1), command['name']))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def read_synced_hash():
+    if not os.path.exists(COMMAND_HASH_FILE):
+        return None
+    with open(COMMAND_HASH_FILE, 'r', encoding='utf-8') as file:
+        return file.read().strip()
+
+
+def write_synced_hash(tree_hash):
+    with open(COMMAND_HASH_FILE, 'w', encoding='utf-8') as file:
+        file.write(tree_hash)
+
+
+async def sync_commands_if_changed(force=False):
+    # on_ready fires again on every reconnect, a sync is only needed when the commands changed
+    tree_hash = command_tree_hash()
+    if not force and tree_hash == read_synced_hash():
+        logging.info("Commands unchanged since the last sync, skipping sync.")
+        print("Commands unchanged, sync skipped.")
+        return
+
+    await bot.tree.sync()
+    write_synced_hash(tree_hash)
+    # Only force the first sync of this process, not the ones after a reconnect
+    args.force_sync = False
+    logging.info(f"Commands synced, tree hash {tree_hash}")
+    print("Commands Synced.")
+
+
 @bot.command()
 async def synccommands(ctx):
     try:
         await bot.tree.sync()
+        write_synced_hash(command_tree_hash())
         await ctx.send("Commands Synced!")
         logging.info("Commands successfully synced.")
         print("Commands Synced!")
@@ -71,12 +137,15 @@ async def synccommands(ctx):
 
 
 # add cogs
+# The first Cogs provide the scheduler, dm and permissions services the others need, keep them in front
 async def setup():
     await bot.add_cog(ConfigCog(bot))
+    await bot.add_cog(ActionSchedulerCog(bot))
+    await bot.add_cog(DMDeliveryCog(bot))
+    await bot.add_cog(IllegalTeamActCog(bot))
     await bot.add_cog(VoiceStateCog(bot))
     await bot.add_cog(WelcomeCog(bot))
-    await bot.add_cog(IllegalTeamActCog(bot))
-    await bot.add_cog(CreateInvitationCog(bot, bot.get_cog("IllegalTeamActCog")))
+    await bot.add_cog(CreateInvitationCog(bot))
     await bot.add_cog(DnDCog(bot))
     await bot.add_cog(CheckStatusCog(bot))
     await bot.add_cog(AchievementCog(bot))
@@ -85,6 +154,9 @@ async def setup():
     await bot.add_cog(GiveawayCog(bot))
     await bot.add_cog(RoleCog(bot))
     await bot.add_cog(BackupCog(bot))
+    await bot.add_cog(EventRecorderCog(bot))
+    # Times the listeners of all the Cogs above, keep it last
+    await bot.add_cog(MetricsCog(bot))
 
 
 @bot.event
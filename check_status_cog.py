@@ -5,7 +5,6 @@
 
 import discord
 from discord.ext import commands
-from illegal_team_act_cog import IllegalTeamActCog
 import os
 import tempfile
 import logging
@@ -34,25 +33,18 @@ class MemberPositionView(discord.ui.View):
         super().__init__()
         self.bot = bot
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.logging_file = config['logging_file']
-        self.where_is_join_button_label = config['where_is_join_button_label']
+        self.config = self.bot.services.get('config')
 
         # Create a link button that directs to the user's channel
-        self.add_item(discord.ui.Button(label=self.where_is_join_button_label, url=url))
+        self.add_item(discord.ui.Button(label=self.config.where_is_join_button_label, url=url))
 
 
 class CheckStatusCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.illegal_act_cog = IllegalTeamActCog(bot)
+        self.illegal_act_cog = self.bot.services.get('permissions')
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.logging_file = config['logging_file']
-        self.where_is_not_found_message = config['where_is_not_found_message']
-        self.where_is_title_message = config['where_is_title_message']
-        self.current_channel_name_message = config['current_channel_name_message']
-        self.current_channel_members_message = config['current_channel_members_message']
+        self.config = self.bot.services.get('config')
 
     @discord.app_commands.command(name="check_log")
     @discord.app_commands.describe(x="Number of lines from the end of the log file to return.")
@@ -61,7 +53,7 @@ class CheckStatusCog(commands.Cog):
         if not await self.illegal_act_cog.check_channel_validity(interaction):
             return
         try:
-            with open(self.logging_file, 'r') as f:
+            with open(self.config.logging_file, 'r') as f:
                 lines = f.readlines()
         except FileNotFoundError:
             await interaction.response.send_message("The log file does not exist.")
@@ -125,7 +117,8 @@ class CheckStatusCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         try:
             if member.voice is None or member.voice.channel is None:
-                await interaction.followup.send(self.where_is_not_found_message.format(name=member.display_name), ephemeral=True)
+                await interaction.followup.send(self.config.where_is_not_found_message.format(name=member.display_name),
+                                                ephemeral=True)
                 return
 
             logging.info(f"Checking position for {member.display_name} by {interaction.user.display_name}")
@@ -137,9 +130,11 @@ class CheckStatusCog(commands.Cog):
             channel_id = member.voice.channel.id
             vc_url_direct = f"https://discord.com/channels/{guild_id}/{channel_id}"
 
-            embed = discord.Embed(title=self.where_is_title_message.format(name=member.display_name), color=discord.Color.blue())
-            embed.add_field(name=self.current_channel_name_message, value="".join(vc_url_direct), inline=False)
-            embed.add_field(name=self.current_channel_members_message, value="\n".join(members_in_channel), inline=False)
+            embed = discord.Embed(title=self.config.where_is_title_message.format(name=member.display_name),
+                                  color=discord.Color.blue())
+            embed.add_field(name=self.config.current_channel_name_message, value="".join(vc_url_direct), inline=False)
+            embed.add_field(name=self.config.current_channel_members_message, value="\n".join(members_in_channel),
+                            inline=False)
 
             view = MemberPositionView(self.bot, vc_url_direct)
             await interaction.followup.send(embed=embed, view=view, ephemeral=True)
@@ -3,31 +3,402 @@
 # Date: 2024-06-20
 # ========================================
 import json
+import dataclasses
+import logging
+import os
+from collections.abc import Mapping
+from types import MappingProxyType
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+
+# Python type of a Config field -> JSON type it is read from, and its name for error messages
+JSON_TYPES = {
+    str: (str, 'string'),
+    int: (int, 'integer'),
+    float: ((int, float), 'number'),
+    tuple: (list, 'array'),
+    Mapping: (dict, 'object'),
+}
+
+ACHIEVEMENT_TYPES = ('reaction', 'message', 'time_spent', 'giveaway')
+
+# Keys that are only read while the bot starts, a reload keeps their running value
+RESTART_KEYS = ('token', 'logging_file', 'db_path', 'guild_id', 'command_hash_file', 'action_scheduler_workers',
+                'config_reload_interval_seconds', 'metrics_host', 'metrics_port', 'view_registry_max_views')
+
+# List / object fields whose entries are objects, with the keys every entry needs
+ENTRY_KEYS = {
+    'channel_configs': {'name_prefix': str, 'type': str},
+    'achievements': {'name': str, 'description': str, 'threshold': (int, float), 'type': str, 'role_id': int},
+    'achievements_ranking': {'name': str, 'type': str},
+    'role_type_name': {'name': str, 'type': str, 'data': str},
+    'starsign_name': {'name': str, 'emoji': str, 'role_id': int},
+    'mbti_name': {'name': str, 'emoji': str, 'role_id': int},
+}
+
+
+class ConfigError(Exception):
+    """config.json could not be read, or is missing keys / has values of the wrong type."""
+
+    def __init__(self, file_path, problems):
+        self.file_path = file_path
+        self.problems = problems
+        super().__init__(f"Invalid configuration file {file_path}:\n" + "\n".join(f"- {p}" for p in problems))
+
+
+def freeze(value):
+    """JSON value -> read only value, lists become tuples and objects become read only mappings."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def is_json_type(value, expected):
+    # bool is a subclass of int, but true / false is never a valid id or count
+    return isinstance(value, expected) and not (isinstance(value, bool) and expected is not bool)
+
+
+@dataclasses.dataclass(frozen=True, slots=True, kw_only=True)
+class Config:
+    """
+    config.json parsed and checked once at startup.
+    Cogs and views keep a reference to this object and read the fields where they need them.
+    Fields with a default are optional in config.json.
+    """
+    # bot.py and all Cogs
+    token: str
+    logging_file: str
+    db_path: str
+    guild_id: int
+    command_hash_file: str = 'command_tree.hash'
+    action_scheduler_workers: int = 4
+    dm_delivery_concurrency: int = 5
+    dm_delivery_max_retries: int = 3
+    dm_delivery_retry_base_delay: float = 1.0
+    dm_delivery_forbidden_cooldown_hours: int = 24
+    view_validation_concurrency: int = 3
+    config_reload_interval_seconds: int = 5
+    action_scheduler_route_limits: Mapping = None
+    metrics_host: str = '127.0.0.1'
+    metrics_port: int = 0
+    loop_lag_interval_ms: int = 100
+    loop_lag_threshold_ms: int = 250
+    event_recorder_file: str = ''
+    event_recorder_max_bytes: int = 10485760
+    event_recorder_backup_count: int = 5
+    view_registry_max_views: int = 1000
+    archive_after_months: int = 6
+    archive_batch_size: int = 1000
+
+    # Create_Invitation_Cog
+    ignore_user_ids: tuple
+    illegal_team_response: str
+    failed_invite_responses: str
+    invite_button_label: str
+    roomfull_button_label: str
+    invite_embed_content: str
+    invite_embed_footer: str
+    interaction_target_error_message: str
+    roomfull_title: str
+    invite_embed_content_edited: str
+    roomfull_set_message: str
+    not_in_vc_message: str
+    extract_channel_id_error: str
+    default_invite_embed_title: str
+
+    # Welcome_Cog
+    welcome_channel_id: int
+    text_color: tuple
+    font_path: str
+    font_size: int
+    avatar_size: tuple
+    welcome_text_1_distance: int
+    welcome_text_2_distance: int
+    welcome_text_picture_1: str
+    welcome_text_picture_2: str
+    welcome_text: str
+    background_image: str
+
+    # Voice_Channel_Cog
+    channel_configs: Mapping
+    temp_channel_pool_min: int = 0
+    temp_channel_pool_max: int = 3
+    temp_channel_pool_history_days: int = 14
+    temp_channel_pool_refresh_minutes: int = 10
+
+    # Illegal_Team_Act_Cog
+    check_illegal_teaming_channel_id: int
+
+    # Achievements_Cog
+    achievements: tuple
+    achievements_page_title: str
+    achievements_page_description: str
+    achievements_finish_emoji: str
+    achievements_incomplete_emoji: str
+    achievements_ranking_emoji: tuple
+    achievements_ranking_title: str
+    achievements_ranking: tuple
+
+    # Game_Spymode_Cog
+    blue_team_button_label: str
+    red_team_button_label: str
+    random_button_label: str
+    result_button_label: str
+    spymode_embed_title: str
+    spymode_embed_start_title: str
+    spymode_embed_end_title: str
+    spymode_embed_saved_title: str
+    spymode_embed_footer: str
+    spymode_gameinfo: str
+    blue_team_name: str
+    red_team_name: str
+    blue_team_result: str
+    red_team_result: str
+    you_are_spy: str
+    you_are_not_spy: str
+    full_team_message: str
+    spymode_not_in_channel_message: str
+    spymode_wrong_channel_message: str
+    spymode_wrong_user_message: str
+    spymode_wrong_start_message: str
+    spymode_wrong_team_size_message: str
+    spymode_wrong_spy_size_message: str
+
+    # Check_Status_Cog
+    where_is_not_found_message: str
+    where_is_title_message: str
+    current_channel_name_message: str
+    current_channel_members_message: str
+    where_is_join_button_label: str
+
+    # Giveaway_Cog
+    giveaway_channel_id: int
+    giveaway_default_provider: str
+    giveaway_join_button_label: str
+    giveaway_exit_button_label: str
+    giveaway_embed_title_open: str
+    giveaway_embed_title_closed: str
+    giveaway_embed_title_closed_deleted: str
+    giveaway_embed_provider_title: str
+    giveaway_embed_timeend_title: str
+    giveaway_embed_winner_number_title: str
+    giveaway_embed_participants_title: str
+    giveaway_embed_participants_text: str
+    giveaway_embed_description_title: str
+    giveaway_embed_description_closed_deleted: str
+    giveaway_embed_end_label: str
+    giveaway_embed_cancel_label: str
+    giveaway_embed_earlyend_label: str
+    giveaway_embed_time_extend_label: str
+    giveaway_embed_winner_title: str
+    giveaway_embed_no_winner: str
+    giveaway_embed_footer: str
+    giveaway_embed_commitment_title: str = 'Draw Commitment'
+    giveaway_embed_seed_title: str = 'Draw Seed'
+    giveaway_already_joined_message: str
+    giveaway_joined_message: str
+    giveaway_leave_message: str
+    giveaway_not_access_message: str
+    giveaway_win_public_message: str
+    giveaway_reroll_public_message: str = 'Rerolled! Congrats {winner_mentions} won {prizes}!'
+    giveaway_win_private_message: str
+    giveaway_fail_message: str
+    giveaway_end_message: str
+
+    # Role_Cog
+    achievement_start_role_id: int
+    role_type_name: tuple
+    role_no_column_name_message: str
+    role_no_progress_message: str
+    role_no_achievement_message: str
+    role_success_message: str
+    role_pickup_title: str
+    role_pickup_footer: str
+    social_start_role_id: int
+    starsign_name: tuple
+    starsign_fire_title: str
+    starsign_fire_description: str
+    starsign_earth_title: str
+    starsign_earth_description: str
+    starsign_air_title: str
+    starsign_air_description: str
+    starsign_water_title: str
+    starsign_water_description: str
+    starsign_pickup_title: str
+    starsign_pickup_footer: str
+    starsign_success_message: str
+    mbti_name: tuple
+    mbti_pickup_title: str
+    mbti_pickup_footer: str
+    mbti_success_message: str
+    mbti_first_field_title: str
+    mbti_first_field_description: str
+    mbti_SP_title: str
+    mbti_SP_description: str
+    mbti_SJ_title: str
+    mbti_SJ_description: str
+    mbti_NF_title: str
+    mbti_NF_description: str
+    mbti_NT_title: str
+    mbti_NT_description: str
+
+    @classmethod
+    def from_dict(cls, data, file_path='config.json'):
+        problems = []
+        values = {}
+        for field in dataclasses.fields(cls):
+            if field.name not in data:
+                if field.default is dataclasses.MISSING:
+                    problems.append(f"Missing key {field.name}")
+                continue
+            value = data[field.name]
+            if value is None and field.default is None:
+                continue
+            json_type, type_name = JSON_TYPES[field.type]
+            if not is_json_type(value, json_type):
+                problems.append(f"{field.name} should be a JSON {type_name}, got {type(value).__name__}")
+                continue
+            problems.extend(check_entries(field.name, value))
+            values[field.name] = freeze(value)
+
+        if problems:
+            raise ConfigError(file_path, problems)
+
+        names = {field.name for field in dataclasses.fields(cls)}
+        for key in data:
+            if key not in names and not key.startswith('_'):
+                print(f"Unknown key {key} in configuration file {file_path}, it is ignored.")
+
+        return cls(**values)
+
+
+def check_entries(name, value):
+    entry_keys = ENTRY_KEYS.get(name)
+    if entry_keys is None:
+        return []
+    entries = value.items() if isinstance(value, dict) else enumerate(value)
+    problems = []
+    for index, entry in entries:
+        if not isinstance(entry, dict):
+            problems.append(f"{name}[{index}] should be a JSON object")
+            continue
+        for key, expected in entry_keys.items():
+            if key not in entry:
+                problems.append(f"{name}[{index}] is missing {key}")
+            elif not is_json_type(entry[key], expected):
+                problems.append(f"{name}[{index}].{key} has the wrong type {type(entry[key]).__name__}")
+        if name in ('achievements', 'achievements_ranking') and entry.get('type') not in ACHIEVEMENT_TYPES:
+            problems.append(f"{name}[{index}].type should be one of {', '.join(ACHIEVEMENT_TYPES)}")
+        if name == 'channel_configs':
+            if not str(index).isdigit():
+                problems.append(f"{name} key {index} should be a channel id")
+            if entry.get('type') not in ('public', 'private'):
+                problems.append(f"{name}[{index}].type should be public or private")
+    return problems
+
+
+def config_diff(old, new):
+    """Names of the fields that differ between two Config objects."""
+    return [field.name for field in dataclasses.fields(Config) if getattr(old, field.name) != getattr(new, field.name)]
+
+
+def load_config(file_path='config.json'):
+    """Read, check and freeze the configuration file, raises ConfigError if it can't be used."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        raise ConfigError(file_path, [f"Configuration file {file_path} not found. Please create it."])
+    except json.JSONDecodeError as e:
+        raise ConfigError(file_path, [f"Could not parse the JSON configuration file {file_path}: {e}"])
+    if not isinstance(data, dict):
+        raise ConfigError(file_path, ["The configuration file should contain a JSON object"])
+    return Config.from_dict(data, file_path)
 
 
 class ConfigCog(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, file_path='config.json'):
         self.bot = bot
-        self.config = self.read_config('config.json')
+        self.file_path = file_path
+        # bot.py parses the file once and registers the result as the 'config' service
+        self.config = self.bot.services.get('config')
+        self.file_stamp = self.stat_config_file()
+
+    async def cog_load(self):
+        # config.json is polled instead of watched, a stat every few seconds is cheaper than another dependency
+        if self.config.config_reload_interval_seconds > 0:
+            self.watch_config.change_interval(seconds=self.config.config_reload_interval_seconds)
+            self.watch_config.start()
+
+    async def cog_unload(self):
+        self.watch_config.cancel()
 
     def read_config(self, file_path):
+        return load_config(file_path)
+
+    def stat_config_file(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @tasks.loop(seconds=5)
+    async def watch_config(self):
+        stamp = self.stat_config_file()
+        if stamp is None or stamp == self.file_stamp:
+            return
+        self.file_stamp = stamp
+        self.reload_config()
+
+    def reload_config(self):
+        """
+        Read config.json again and apply the keys that changed to the running Cogs.
+        Returns the changed keys, or None if the new file was rejected and the old config is still in use.
+
+        Cogs can take part with two optional methods:
+        prepare_config(old, new, changed) builds whatever the new values need and may raise to reject the file,
+        apply_config(old, new, changed, prepared) swaps it in and must not fail or await.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                config = json.load(file)
-        except FileNotFoundError:
-            print(f"Configuration file {file_path} not found. Please create it.")
-            config = {}
-        except json.JSONDecodeError:
-            print(f"Could not parse the JSON configuration file {file_path}. Please check its syntax.")
-            config = {}
-
-        # Check for required keys
-        required_keys = ['token', 'logging_file', 'db_path', 'guild_id']
-        for key in required_keys:
-            if key not in config:
-                print(f"Missing key {key} in configuration file {file_path}. Please add it.")
-                config[key] = None  # You can set a default value here if you want
-
-        return config
+            new = load_config(self.file_path)
+        except ConfigError as e:
+            logging.error(f"Config reload rejected, keeping the running configuration. {e}")
+            return None
+
+        old = self.config
+        changed = config_diff(old, new)
+        restart_keys = [key for key in changed if key in RESTART_KEYS]
+        if restart_keys:
+            logging.warning(f"Config keys {', '.join(restart_keys)} only take effect after a restart")
+            new = dataclasses.replace(new, **{key: getattr(old, key) for key in restart_keys})
+            changed = [key for key in changed if key not in RESTART_KEYS]
+        if not changed:
+            return changed
+
+        # Everything that can fail happens before anything is swapped
+        prepared = {}
+        for name, cog in self.bot.cogs.items():
+            if hasattr(cog, 'prepare_config'):
+                try:
+                    prepared[name] = cog.prepare_config(old, new, changed)
+                except Exception as e:
+                    logging.error(f"Config reload rejected by {name}, keeping the running configuration: {e}")
+                    return None
+
+        # No await from here on, so no event handler or view callback sees half of the change
+        self.config = new
+        self.bot.services.replace('config', new)
+        for view in [*self.bot.persistent_views, *self.bot.services.get('views').views.values()]:
+            if getattr(view, 'config', None) is old:
+                view.config = new
+        for name, cog in self.bot.cogs.items():
+            if getattr(cog, 'config', None) is old:
+                cog.config = new
+            if hasattr(cog, 'apply_config'):
+                cog.apply_config(old, new, changed, prepared.get(name))
+
+        logging.info(f"Config reloaded, changed keys: {', '.join(changed)}")
+        return changed
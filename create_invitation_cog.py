@@ -10,6 +10,8 @@ import logging
 import datetime
 from discord.utils import format_dt
 
+from action_scheduler_cog import PRIORITY_MESSAGE
+
 
 class TeamInvitationView(discord.ui.View):
     def __init__(self, bot, url, user):
@@ -18,23 +20,15 @@ class TeamInvitationView(discord.ui.View):
         self.user = user
         self.url = url
 
-        self.config = self.bot.get_cog('ConfigCog').config
-        self.roomfull_button_label = self.config['roomfull_button_label']
-        self.invite_button_label = self.config['invite_button_label']
-        self.invite_embed_content = self.config['invite_embed_content']
-        self.invite_embed_footer = self.config['invite_embed_footer']
-        self.interaction_target_error_message = self.config['interaction_target_error_message']
-        self.roomfull_title = self.config['roomfull_title']
-        self.invite_embed_content_edited = self.config['invite_embed_content_edited']
-        self.roomfull_set_message = self.config['roomfull_set_message']
-        self.not_in_vc_message = self.config['not_in_vc_message']
-        self.extract_channel_id_error = self.config['extract_channel_id_error']
+        self.config = self.bot.services.get('config')
 
         # Adding the join room button
-        self.add_item(discord.ui.Button(style=discord.ButtonStyle.link, label=self.invite_button_label, url=self.url))
+        self.add_item(discord.ui.Button(style=discord.ButtonStyle.link, label=self.config.invite_button_label,
+                                        url=self.url))
 
         # Adding the room full button
-        self.room_full_button = discord.ui.Button(style=discord.ButtonStyle.danger, label=self.roomfull_button_label,
+        self.room_full_button = discord.ui.Button(style=discord.ButtonStyle.danger,
+                                                  label=self.config.roomfull_button_label,
                                                   custom_id="room_full_button")
         self.room_full_button.callback = self.room_full_button_callback
         self.add_item(self.room_full_button)
@@ -62,8 +56,8 @@ class TeamInvitationView(discord.ui.View):
 
         embed = discord.Embed(
             title=content,
-            description=self.invite_embed_content.format(vc_url=vc_url_direct, mention=author.mention,
-                                                         time=elapsed_time),
+            description=self.config.invite_embed_content.format(vc_url=vc_url_direct, mention=author.mention,
+                                                                time=elapsed_time),
             color=discord.Color.blue()
         )
 
@@ -77,7 +71,7 @@ class TeamInvitationView(discord.ui.View):
         embed.timestamp = current_time  # Set the timestamp to the message time
 
         # Add the original time to the footer
-        embed.set_footer(text=self.invite_embed_footer)
+        embed.set_footer(text=self.config.invite_embed_footer)
 
         return embed
 
@@ -86,7 +80,7 @@ class TeamInvitationView(discord.ui.View):
         await interaction.response.defer()
 
         if interaction.user != self.user:
-            await interaction.followup.send(self.interaction_target_error_message, ephemeral=True)
+            await interaction.followup.send(self.config.interaction_target_error_message, ephemeral=True)
             return
 
         # Extract the channel ID from the URL in the embed description
@@ -95,22 +89,22 @@ class TeamInvitationView(discord.ui.View):
         if match:
             original_channel_id = int(match.group(1))
         else:
-            await interaction.followup.send(self.extract_channel_id_error, ephemeral=True)
+            await interaction.followup.send(self.config.extract_channel_id_error, ephemeral=True)
             return
 
         # Check if the user is still in the original voice channel
         if not self.user.voice or self.user.voice.channel.id != original_channel_id:
-            await interaction.followup.send(self.not_in_vc_message, ephemeral=True)
+            await interaction.followup.send(self.config.not_in_vc_message, ephemeral=True)
             return
 
         # Update the embed title and description to reflect the room is full
         embed = interaction.message.embeds[0]
-        embed.title = f"{self.roomfull_title} ~~{embed.title}~~"
-        embed.description = self.invite_embed_content_edited.format(name=self.user.voice.channel.name,
-                                                                    url=self.url,
-                                                                    mention=self.user.mention,
-                                                                    time=embed.description.split('\n\n')[-1]
-                                                                    )
+        embed.title = f"{self.config.roomfull_title} ~~{embed.title}~~"
+        embed.description = self.config.invite_embed_content_edited.format(name=self.user.voice.channel.name,
+                                                                           url=self.url,
+                                                                           mention=self.user.mention,
+                                                                           time=embed.description.split('\n\n')[-1]
+                                                                           )
         embed.color = discord.Color.red()
 
         # Disable the "Join Room" button
@@ -122,25 +116,24 @@ class TeamInvitationView(discord.ui.View):
         await interaction.edit_original_response(embed=embed, view=self)
 
         # Send a follow-up message to confirm the room is now full
-        await interaction.followup.send(self.roomfull_set_message, ephemeral=True)
+        await interaction.followup.send(self.config.roomfull_set_message, ephemeral=True)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
         return interaction.user == self.user
 
 
 class CreateInvitationCog(commands.Cog):
-    def __init__(self, bot, illegal_act_cog):
+    def __init__(self, bot):
         self.bot = bot
-        self.illegal_act_cog = illegal_act_cog
-        self.config = self.bot.get_cog('ConfigCog').config
-        self.illegal_team_response = self.config['illegal_team_response']
-        self.default_invite_embed_title = self.config['default_invite_embed_title']
+        self.illegal_act_cog = self.bot.services.get('permissions')
+        self.scheduler = self.bot.services.get('scheduler')
+        self.config = self.bot.services.get('config')
 
     @commands.Cog.listener()
     async def on_message(self, message):
         # Use the config values
-        IGNORE_USER_IDS = self.config['ignore_user_ids']
-        FAILED_INVITE_RESPONSES = self.config['failed_invite_responses']
+        IGNORE_USER_IDS = self.config.ignore_user_ids
+        FAILED_INVITE_RESPONSES = self.config.failed_invite_responses
 
         # 避免机器人回复自己的消息
         if message.author == self.bot.user:
@@ -186,24 +179,28 @@ class CreateInvitationCog(commands.Cog):
             # 检查用户是否在语音频道
             if message.author.voice and message.author.voice.channel:
                 # 移除用户5分钟内的非法组队行为
-                await self.illegal_act_cog.remove_illegal_activity(str(message.author.id))
+                await self.illegal_act_cog.remove_illegal_activity(message.author.id)
                 try:
-                    invite = await message.author.voice.channel.create_invite(max_age=600)
+                    voice_channel = message.author.voice.channel
+                    invite = await self.scheduler.run(lambda: voice_channel.create_invite(max_age=600),
+                                                      PRIORITY_MESSAGE, ('invite', voice_channel.id))
                     vc_url = invite.url  # Get the URL from the Invite object
                     view = TeamInvitationView(self.bot, vc_url, message.author)
                     embed = view.create_embed(message)
-                    await message.reply(embed=embed, view=view)
+                    await self.scheduler.run(lambda: message.reply(embed=embed, view=view),
+                                             PRIORITY_MESSAGE, ('send', message.channel.id))
                 except Exception as e:
                     reply_message = FAILED_INVITE_RESPONSES + str(e)
 
             else:
                 # 记录用户的非法组队行为
-                await self.illegal_act_cog.log_illegal_activity(str(message.author.id), message.content)
-                reply_message = self.illegal_team_response.format(mention=message.author.mention)
+                await self.illegal_act_cog.log_illegal_activity(message.author.id, message.content)
+                reply_message = self.config.illegal_team_response.format(mention=message.author.mention)
 
             # Only reply if reply_message is not empty
             if reply_message:
-                await message.reply(reply_message)
+                await self.scheduler.run(lambda: message.reply(reply_message),
+                                         PRIORITY_MESSAGE, ('send', message.channel.id))
             # 在回复完第一个匹配项后结束，确保不会重复回复有多个匹配项的同一条消息
             return
 
@@ -216,14 +213,16 @@ class CreateInvitationCog(commands.Cog):
 
         if interaction.user.voice and interaction.user.voice.channel:
             try:
-                invite = await interaction.user.voice.channel.create_invite(max_age=600)
+                voice_channel = interaction.user.voice.channel
+                invite = await self.scheduler.run(lambda: voice_channel.create_invite(max_age=600),
+                                                  PRIORITY_MESSAGE, ('invite', voice_channel.id))
                 vc_url = invite.url  # Get the URL from the Invite object
                 view = TeamInvitationView(self.bot, vc_url, interaction.user)
                 embed = view.create_embed(interaction)
-                embed.title = title or self.default_invite_embed_title
+                embed.title = title or self.config.default_invite_embed_title
                 await interaction.followup.send(embed=embed, view=view)
             except Exception as e:
                 await interaction.followup.send(f"Failed to create an invitation: {str(e)}", ephemeral=True)
         else:
-            await interaction.followup.send(self.illegal_team_response.format(mention=interaction.user.mention),
+            await interaction.followup.send(self.config.illegal_team_response.format(mention=interaction.user.mention),
                                                     ephemeral=True)
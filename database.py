@@ -0,0 +1,151 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import time
+
+import aiosqlite
+
+
+class Database:
+    """The bot's SQLite database, shared through bot.services as 'db'."""
+
+    def __init__(self, path):
+        self.path = path
+        # Called as observer(statement, seconds, error) after every statement, e.g. by Metrics_Cog
+        self.observers = []
+        # Called as observer(statement, rows) with the number of rows fetched from its cursor
+        self.row_observers = []
+
+    def connect(self):
+        """Use as `async with self.db.connect() as db`, one connection per unit of work like before."""
+        if not self.observers and not self.row_observers:
+            return aiosqlite.connect(self.path)
+        return ObservedConnection(self, aiosqlite.connect(self.path))
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+    def add_row_observer(self, observer):
+        self.row_observers.append(observer)
+
+    def remove_row_observer(self, observer):
+        if observer in self.row_observers:
+            self.row_observers.remove(observer)
+
+    def notify(self, statement, started, error=None):
+        seconds = time.perf_counter() - started
+        for observer in self.observers:
+            observer(statement, seconds, error)
+
+    async def timed(self, statement, call):
+        started = time.perf_counter()
+        try:
+            result = await call
+        except Exception as e:
+            self.notify(statement, started, e)
+            raise
+        self.notify(statement, started)
+        return result
+
+    def notify_rows(self, statement, rows):
+        for observer in self.row_observers:
+            observer(statement, rows)
+
+
+class ObservedCursor:
+    """aiosqlite cursor that reports the time of every execute and the rows fetched to the database observers."""
+
+    def __init__(self, database, cursor, statement=None):
+        self.database = database
+        self.cursor = cursor
+        self.statement = statement
+
+    async def execute(self, sql, parameters=None):
+        self.statement = sql
+        await self.database.timed(sql, self.cursor.execute(sql, parameters))
+        return self
+
+    async def executemany(self, sql, parameters):
+        self.statement = sql
+        await self.database.timed(sql, self.cursor.executemany(sql, parameters))
+        return self
+
+    async def fetchone(self):
+        row = await self.cursor.fetchone()
+        if row is not None:
+            self.database.notify_rows(self.statement, 1)
+        return row
+
+    async def fetchmany(self, size=None):
+        rows = await (self.cursor.fetchmany() if size is None else self.cursor.fetchmany(size))
+        self.database.notify_rows(self.statement, len(rows))
+        return rows
+
+    async def fetchall(self):
+        rows = await self.cursor.fetchall()
+        self.database.notify_rows(self.statement, len(rows))
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    async def __aiter__(self):
+        async for row in self.cursor:
+            self.database.notify_rows(self.statement, 1)
+            yield row
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.cursor.close()
+
+
+class ObservedConnection:
+    """aiosqlite connection that reports the time of every statement and commit to the database observers."""
+
+    def __init__(self, database, connection):
+        self.database = database
+        self.connection = connection
+
+    def __await__(self):
+        return self.start().__await__()
+
+    async def start(self):
+        await self.connection
+        return self
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.connection.close()
+
+    async def cursor(self):
+        return ObservedCursor(self.database, await self.connection.cursor())
+
+    async def execute(self, sql, parameters=None):
+        cursor = await self.database.timed(sql, self.connection.execute(sql, parameters))
+        return ObservedCursor(self.database, cursor, sql)
+
+    async def executemany(self, sql, parameters):
+        cursor = await self.database.timed(sql, self.connection.executemany(sql, parameters))
+        return ObservedCursor(self.database, cursor, sql)
+
+    async def commit(self):
+        await self.database.timed('COMMIT', self.connection.commit())
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def __setattr__(self, name, value):
+        # row_factory and friends belong to the real connection
+        if name in ('database', 'connection'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.connection, name, value)
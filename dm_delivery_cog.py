@@ -0,0 +1,136 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import discord
+from discord.ext import commands
+import asyncio
+import logging
+import random
+import time
+
+
+class DeliveryReport:
+    """Outcome of one bulk DM delivery, user ids grouped by result."""
+    __slots__ = ('sent', 'forbidden', 'not_found', 'failed', 'retries', 'started_at', 'elapsed')
+
+    def __init__(self):
+        self.sent = []
+        self.forbidden = []  # DMs closed or the bot is blocked
+        self.not_found = []  # User no longer exists
+        self.failed = []  # Still failing after all retries
+        self.retries = 0
+        self.started_at = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def total(self):
+        return len(self.sent) + len(self.forbidden) + len(self.not_found) + len(self.failed)
+
+    def summary(self):
+        return (f"{len(self.sent)}/{self.total} delivered, {len(self.forbidden)} with DMs closed, "
+                f"{len(self.not_found)} not found, {len(self.failed)} failed "
+                f"({self.retries} retries, {self.elapsed:.1f}s)")
+
+
+class DMDeliveryCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+        config = self.bot.services.get('config')
+        self.concurrency = config.dm_delivery_concurrency
+        self.max_retries = config.dm_delivery_max_retries
+        self.retry_base_delay = config.dm_delivery_retry_base_delay
+        # Users who had DMs closed are skipped for a while instead of being tried on every delivery
+        self.forbidden_cooldown = config.dm_delivery_forbidden_cooldown_hours * 3600
+
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.forbidden_users = {}  # user_id -> time of the last Forbidden
+        self.bot.services.register('dm', self)
+
+    async def cog_unload(self):
+        self.bot.services.unregister('dm')
+
+    def apply_config(self, old, new, changed, prepared=None):
+        self.max_retries = new.dm_delivery_max_retries
+        self.retry_base_delay = new.dm_delivery_retry_base_delay
+        self.forbidden_cooldown = new.dm_delivery_forbidden_cooldown_hours * 3600
+        if 'dm_delivery_concurrency' in changed:
+            # Deliveries already waiting keep the old semaphore, new ones use the new limit
+            self.concurrency = new.dm_delivery_concurrency
+            self.slots = asyncio.Semaphore(self.concurrency)
+
+    async def deliver(self, recipients, content=None, embed=None):
+        """
+        Send the same message to all recipients and return a DeliveryReport.
+        Recipients can be user ids or user / member objects, the embed is built once and shared.
+        """
+        return await self.deliver_each([(recipient, content) for recipient in recipients], embed=embed)
+
+    async def deliver_each(self, messages, embed=None):
+        """Send (recipient, content) pairs, all sharing the same embed, and return a DeliveryReport."""
+        report = DeliveryReport()
+        await asyncio.gather(*(self.deliver_one(recipient, content, embed, report) for recipient, content in messages))
+        report.elapsed = time.monotonic() - report.started_at
+        logging.info(f"DM delivery: {report.summary()}")
+        return report
+
+    async def deliver_one(self, recipient, content, embed, report):
+        user_id = recipient if isinstance(recipient, int) else recipient.id
+
+        if self.is_forbidden(user_id):
+            report.forbidden.append(user_id)
+            return
+
+        async with self.slots:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    user = await self.resolve_user(recipient)
+                    # Every DM channel is a route of its own for Discord, discord.py keeps to its limits and the
+                    # semaphore bounds how many are sent at once
+                    await user.send(content, embed=embed)
+                    report.sent.append(user_id)
+                    self.forbidden_users.pop(user_id, None)
+                    return
+                except discord.Forbidden:
+                    self.forbidden_users[user_id] = time.monotonic()
+                    report.forbidden.append(user_id)
+                    return
+                except discord.NotFound:
+                    report.not_found.append(user_id)
+                    return
+                except discord.HTTPException as e:
+                    # Only rate limits and Discord side errors are worth another try
+                    if e.status != 429 and e.status < 500:
+                        logging.error(f"Failed to send a DM to {user_id}: {e}")
+                        report.failed.append(user_id)
+                        return
+                    error = e
+                except (OSError, asyncio.TimeoutError) as e:
+                    error = e
+
+                if attempt < self.max_retries:
+                    report.retries += 1
+                    delay = self.retry_base_delay * 2 ** attempt
+                    await asyncio.sleep(delay + random.uniform(0, delay))
+
+            logging.error(f"Failed to send a DM to {user_id} after {self.max_retries + 1} attempts: {error}")
+            report.failed.append(user_id)
+
+    async def resolve_user(self, recipient):
+        if not isinstance(recipient, int):
+            return recipient
+        # The cache covers everyone sharing a guild with the bot, only fall back to the API for the rest
+        user = self.bot.get_user(recipient)
+        if user is None:
+            user = await self.bot.fetch_user(recipient)
+        return user
+
+    def is_forbidden(self, user_id):
+        failed_at = self.forbidden_users.get(user_id)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at > self.forbidden_cooldown:
+            del self.forbidden_users[user_id]
+            return False
+        return True
@@ -0,0 +1,187 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import discord
+from discord.ext import commands
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import time
+
+# Words the Cogs' message patterns look at, kept as they are when a message is reduced to its shape
+KEPT_WORDS = re.compile(r'https?://|flex|rank|aram|world|min|全世界|分钟|分|个钟|小时', re.IGNORECASE)
+# Characters the team-up pattern of Create_Invitation_Cog matches on
+KEPT_CHARACTERS = set('缺等=＝qQnN一二三四五0123456789')
+
+# The giveaway join and exit buttons, see GiveawayParticipationView
+GIVEAWAY_BUTTON = re.compile(r'^(participate|exit)_(\d+)$')
+
+RECORDING_VERSION = 1
+
+RECORDER_KEYS = ('event_recorder_file', 'event_recorder_max_bytes', 'event_recorder_backup_count')
+
+
+def shape_content(content):
+    """
+    Replace everything in a message the Cogs don't look at: other letters become x, other Chinese characters 中,
+    other symbols a dot. The length, spaces, digits and the team-up words stay, so the message takes the same
+    path through Create_Invitation_Cog when it is replayed, without the text being stored.
+    """
+    shaped = []
+    position = 0
+    for match in KEPT_WORDS.finditer(content):
+        shaped.append(shape_characters(content[position:match.start()]))
+        shaped.append(match.group())
+        position = match.end()
+    shaped.append(shape_characters(content[position:]))
+    return ''.join(shaped)
+
+
+def shape_characters(text):
+    characters = []
+    for character in text:
+        if character in KEPT_CHARACTERS or character.isspace():
+            characters.append(character)
+        elif '一' <= character <= '鿿':
+            characters.append('中')
+        elif character.isalpha():
+            characters.append('x')
+        else:
+            characters.append('.')
+    return ''.join(characters)
+
+
+class EventRecorderCog(commands.Cog):
+    """
+    Writes the gateway events the other Cogs consume to a rotating file, for benchmark/replay.py.
+    Off unless event_recorder_file is set. User, channel and giveaway ids are replaced by numbers that only
+    mean something within one session, the creator and welcome channels from config.json keep their ids.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+        self.config = self.bot.services.get('config')
+        self.logger = logging.getLogger('event_recorder')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.queue_handler = None
+        self.listener = None
+        self.started = None
+        self.pseudonyms = {}  # kind -> {real id -> session number}
+
+    async def cog_load(self):
+        if self.config.event_recorder_file:
+            self.start(self.open_file(self.config))
+
+    async def cog_unload(self):
+        self.stop()
+
+    def prepare_config(self, old, new, changed):
+        # Opened here, so a file that can't be written rejects the reload instead of failing halfway through it
+        if new.event_recorder_file and any(key in changed for key in RECORDER_KEYS):
+            return self.open_file(new)
+        return None
+
+    def apply_config(self, old, new, changed, prepared=None):
+        if any(key in changed for key in RECORDER_KEYS):
+            self.stop()
+            if prepared is not None:
+                self.start(prepared)
+
+    @staticmethod
+    def open_file(config):
+        file_handler = logging.handlers.RotatingFileHandler(config.event_recorder_file,
+                                                            maxBytes=config.event_recorder_max_bytes,
+                                                            backupCount=config.event_recorder_backup_count,
+                                                            encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter('%(message)s'))
+        return file_handler
+
+    def start(self, file_handler):
+        # The file is written by a background thread, so a slow disk never holds up the event loop
+        records = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(records)
+        self.logger.addHandler(self.queue_handler)
+        self.listener = logging.handlers.QueueListener(records, file_handler)
+        self.listener.start()
+
+        # A new session starts new pseudonyms, the header tells the replayer
+        self.pseudonyms = {'u': {}, 'c': {}, 'g': {}}
+        self.started = time.monotonic()
+        kept = [int(channel_id) for channel_id in self.config.channel_configs]
+        self.write({'e': 'session', 'v': RECORDING_VERSION,
+                    'start': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                    'creators': kept})
+        logging.info(f"Recording gateway events to {self.config.event_recorder_file}")
+
+    def stop(self):
+        if self.listener is None:
+            return
+        self.logger.removeHandler(self.queue_handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+        self.listener = None
+        self.queue_handler = None
+
+    def write(self, record):
+        if self.listener is None:
+            return
+        record['t'] = round((time.monotonic() - self.started) * 1000)
+        self.logger.info(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+    def pseudonym(self, kind, real_id):
+        numbers = self.pseudonyms[kind]
+        number = numbers.get(real_id)
+        if number is None:
+            number = numbers[real_id] = len(numbers) + 1
+        return number
+
+    def channel(self, channel):
+        if channel is None:
+            return None
+        if str(channel.id) in self.config.channel_configs or channel.id == self.config.welcome_channel_id:
+            return channel.id
+        # Negative, so it can never be mistaken for a real channel id
+        return -self.pseudonym('c', channel.id)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if self.listener is None or message.author.bot:
+            return
+        voice = getattr(message.author, 'voice', None)
+        self.write({'e': 'm', 'u': self.pseudonym('u', message.author.id), 'ch': self.channel(message.channel),
+                    'vc': self.channel(voice.channel if voice else None), 'c': shape_content(message.content)})
+
+    @commands.Cog.listener()
+    async def on_reaction_add(self, reaction, user):
+        if self.listener is None or user.bot:
+            return
+        self.write({'e': 'r', 'u': self.pseudonym('u', user.id)})
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        if self.listener is None or member.bot:
+            return
+        self.write({'e': 'v', 'u': self.pseudonym('u', member.id),
+                    'b': self.channel(before.channel), 'a': self.channel(after.channel)})
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        if self.listener is None or member.bot:
+            return
+        self.write({'e': 'j', 'u': self.pseudonym('u', member.id)})
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction):
+        if self.listener is None or interaction.type is not discord.InteractionType.component:
+            return
+        match = GIVEAWAY_BUTTON.match((interaction.data or {}).get('custom_id', ''))
+        if match:
+            self.write({'e': 'g', 'u': self.pseudonym('u', interaction.user.id), 'k': match.group(1),
+                        'g': self.pseudonym('g', match.group(2))})
@@ -8,12 +8,14 @@ from discord import app_commands
 import random
 from discord.ui import View, Button
 
+from action_scheduler_cog import PRIORITY_EDIT
+
 
 class JoinBlueTeamButton(discord.ui.Button):
     view = None
 
     def __init__(self, view):
-        super().__init__(label=view.config['blue_team_button_label'], style=discord.ButtonStyle.primary)
+        super().__init__(label=view.config.blue_team_button_label, style=discord.ButtonStyle.primary)
         self.view = view
 
     async def callback(self, interaction: discord.Interaction):
@@ -24,7 +26,7 @@ class JoinRedTeamButton(discord.ui.Button):
     view = None
 
     def __init__(self, view):
-        super().__init__(label=view.config['red_team_button_label'], style=discord.ButtonStyle.danger)
+        super().__init__(label=view.config.red_team_button_label, style=discord.ButtonStyle.danger)
         self.view = view
 
     async def callback(self, interaction: discord.Interaction):
@@ -35,7 +37,7 @@ class RandomSpyButton(discord.ui.Button):
     view = None
 
     def __init__(self, view):
-        super().__init__(label=view.config['random_button_label'], style=discord.ButtonStyle.secondary)
+        super().__init__(label=view.config.random_button_label, style=discord.ButtonStyle.secondary)
         self.view = view
 
     async def callback(self, interaction: discord.Interaction):
@@ -47,6 +49,7 @@ class SpyModeView(discord.ui.View):
                  game_id: int):
         super().__init__(timeout=None)
         self.bot = bot
+        self.scheduler = self.bot.services.get('scheduler')
         self.blue_team = []
         self.red_team = []
         self.team_size = team_size
@@ -57,27 +60,7 @@ class SpyModeView(discord.ui.View):
         self.game_id = game_id
         self.interaction_count = 0
 
-        self.config = self.bot.get_cog('ConfigCog').config
-        self.blue_team_button_label = self.config['blue_team_button_label']
-        self.red_team_button_label = self.config['red_team_button_label']
-        self.random_button_label = self.config['random_button_label']
-        self.result_button_label = self.config['result_button_label']
-        self.spymode_embed_title = self.config['spymode_embed_title']
-        self.spymode_embed_start_title = self.config['spymode_embed_start_title']
-        self.spymode_embed_saved_title = self.config['spymode_embed_saved_title']
-        self.spymode_embed_end_title = self.config['spymode_embed_end_title']
-        self.spymode_gameinfo = self.config['spymode_gameinfo']
-        self.blue_team_name = self.config['blue_team_name']
-        self.red_team_name = self.config['red_team_name']
-        self.blue_team_result = self.config['blue_team_result']
-        self.red_team_result = self.config['red_team_result']
-        self.you_are_spy = self.config['you_are_spy']
-        self.you_are_not_spy = self.config['you_are_not_spy']
-        self.full_team_message = self.config['full_team_message']
-        self.spymode_wrong_channel_message = self.config['spymode_wrong_channel_message']
-        self.spymode_wrong_user_message = self.config['spymode_wrong_user_message']
-        self.spymode_wrong_start_message = self.config['spymode_wrong_start_message']
-        self.spymode_embed_footer = self.config['spymode_embed_footer']
+        self.config = self.bot.services.get('config')
 
         # Initialize buttons with proper labels from the configuration.
         self.add_item(JoinBlueTeamButton(self))
@@ -89,11 +72,11 @@ class SpyModeView(discord.ui.View):
 
         # Ensure user is in the same voice channel as the game creator
         if interaction.user.voice is None or interaction.user.voice.channel != self.voice_channel:
-            await interaction.followup.send(self.spymode_wrong_channel_message, ephemeral=True)
+            await interaction.followup.send(self.config.spymode_wrong_channel_message, ephemeral=True)
             return
 
         if len(self.blue_team) > self.team_size:
-            await interaction.followup.send(self.full_team_message, ephemeral=True)
+            await interaction.followup.send(self.config.full_team_message, ephemeral=True)
             return
 
         # If the user is already in the queue, they can exit the queue.
@@ -114,11 +97,11 @@ class SpyModeView(discord.ui.View):
 
         # Ensure user is in the same voice channel as the game creator
         if interaction.user.voice is None or interaction.user.voice.channel != self.voice_channel:
-            await interaction.followup.send(self.spymode_wrong_channel_message, ephemeral=True)
+            await interaction.followup.send(self.config.spymode_wrong_channel_message, ephemeral=True)
             return
 
         if len(self.red_team) > self.team_size:
-            await interaction.followup.send(self.full_team_message, ephemeral=True)
+            await interaction.followup.send(self.config.full_team_message, ephemeral=True)
             return
 
         # If the user is already in the queue, they can exit the queue.
@@ -139,17 +122,17 @@ class SpyModeView(discord.ui.View):
         if self.interaction_count == 0:
             # Ensure command user is initiating the spy randomization
             if interaction.user != self.command_user:
-                await interaction.followup.send(self.spymode_wrong_user_message, ephemeral=True)
+                await interaction.followup.send(self.config.spymode_wrong_user_message, ephemeral=True)
                 return
 
             # Check if both teams are full
             if (len(self.blue_team) != self.team_size) or (len(self.red_team) != self.team_size):
-                await interaction.followup.send(self.spymode_wrong_start_message, ephemeral=True)
+                await interaction.followup.send(self.config.spymode_wrong_start_message, ephemeral=True)
                 return
 
             # Update the interaction count to 1 and update the button label
             self.interaction_count += 1
-            button.label = self.result_button_label
+            button.label = self.config.result_button_label
             for child in self.children:
                 if child != button:
                     child.disabled = True
@@ -157,66 +140,72 @@ class SpyModeView(discord.ui.View):
             await self.randomize_spies()
 
             # Update the embed interface
-            embed = discord.Embed(title=self.spymode_embed_start_title.format(game_id=self.game_id),
+            embed = discord.Embed(title=self.config.spymode_embed_start_title.format(game_id=self.game_id),
                                   color=discord.Color.orange())
 
-            game_info = self.spymode_gameinfo.format(name=self.command_user.mention, team_size=self.team_size,
-                                                     spy=self.spy)
+            game_info = self.config.spymode_gameinfo.format(name=self.command_user.mention, team_size=self.team_size,
+                                                            spy=self.spy)
             embed.add_field(name="", value=game_info, inline=False)
 
-            embed.add_field(name=self.blue_team_name.format(team_size=self.team_size),
+            embed.add_field(name=self.config.blue_team_name.format(team_size=self.team_size),
                             value="\n".join([user.display_name for user in self.blue_team]), inline=True)
-            embed.add_field(name=self.red_team_name.format(team_size=self.team_size),
+            embed.add_field(name=self.config.red_team_name.format(team_size=self.team_size),
                             value="\n".join([user.display_name for user in self.red_team]), inline=True)
-            embed.set_footer(text=self.spymode_embed_footer)
-            await interaction.message.edit(embed=embed, view=self)
+            embed.set_footer(text=self.config.spymode_embed_footer)
+            await self.edit_game_message(interaction.message, embed)
 
         elif self.interaction_count == 1:
             if interaction.user != self.command_user:
-                await interaction.followup.send(self.spymode_wrong_user_message, ephemeral=True)
+                await interaction.followup.send(self.config.spymode_wrong_user_message, ephemeral=True)
                 return
 
             # Reveal the spies and disable the random_spy button
             button.disabled = True
 
             # Update the embed interface
-            embed = discord.Embed(title=self.spymode_embed_end_title.format(game_id=self.game_id),
+            embed = discord.Embed(title=self.config.spymode_embed_end_title.format(game_id=self.game_id),
                                   color=discord.Color.red())
 
-            game_info = self.spymode_gameinfo.format(name=self.command_user.mention, team_size=self.team_size,
-                                                     spy=self.spy)
+            game_info = self.config.spymode_gameinfo.format(name=self.command_user.mention, team_size=self.team_size,
+                                                            spy=self.spy)
             embed.add_field(name="", value=game_info, inline=False)
 
-            embed.add_field(name=self.blue_team_name.format(team_size=self.team_size),
+            embed.add_field(name=self.config.blue_team_name.format(team_size=self.team_size),
                             value="\n".join([user.display_name for user in self.blue_team]), inline=True)
-            embed.add_field(name=self.red_team_name.format(team_size=self.team_size),
+            embed.add_field(name=self.config.red_team_name.format(team_size=self.team_size),
                             value="\n".join([user.display_name for user in self.red_team]), inline=True)
 
             embed.add_field(name="", value="\u200b", inline=False)
 
-            embed.add_field(name=self.blue_team_result,
+            embed.add_field(name=self.config.blue_team_result,
                             value="\n".join([user.display_name for user in self.blue_team if user in self.spies]),
                             inline=True)
-            embed.add_field(name=self.red_team_result,
+            embed.add_field(name=self.config.red_team_result,
                             value="\n".join([user.display_name for user in self.red_team if user in self.spies]),
                             inline=True)
-            embed.set_footer(text=self.spymode_embed_footer)
+            embed.set_footer(text=self.config.spymode_embed_footer)
 
-            await interaction.message.edit(embed=embed, view=self)
+            await self.edit_game_message(interaction.message, embed)
 
     async def update_embed(self, interaction: discord.Interaction):
-        embed = discord.Embed(title=self.spymode_embed_title.format(game_id=self.game_id),
+        embed = discord.Embed(title=self.config.spymode_embed_title.format(game_id=self.game_id),
                               color=discord.Color.blue())
 
-        game_info = self.spymode_gameinfo.format(name=self.command_user.mention, team_size=self.team_size, spy=self.spy)
+        game_info = self.config.spymode_gameinfo.format(name=self.command_user.mention, team_size=self.team_size,
+                                                        spy=self.spy)
         embed.add_field(name="", value=game_info, inline=False)
 
-        embed.add_field(name=self.blue_team_name.format(team_size=self.team_size),
+        embed.add_field(name=self.config.blue_team_name.format(team_size=self.team_size),
                         value="\n".join([user.display_name for user in self.blue_team]), inline=True)
-        embed.add_field(name=self.red_team_name.format(team_size=self.team_size),
+        embed.add_field(name=self.config.red_team_name.format(team_size=self.team_size),
                         value="\n".join([user.display_name for user in self.red_team]), inline=True)
-        embed.set_footer(text=self.spymode_embed_footer)
-        await interaction.message.edit(embed=embed, view=self)
+        embed.set_footer(text=self.config.spymode_embed_footer)
+        await self.edit_game_message(interaction.message, embed)
+
+    async def edit_game_message(self, message, embed):
+        # Every edit carries the full game state, so a burst of clicks only needs the latest one sent
+        await self.scheduler.run(lambda: message.edit(embed=embed, view=self), PRIORITY_EDIT,
+                                 ('edit', message.channel.id), key=('spymode_embed', message.id))
 
     async def randomize_spies(self):
         spies_blue = random.sample(self.blue_team, min(len(self.blue_team), self.spy))
@@ -225,38 +214,28 @@ class SpyModeView(discord.ui.View):
         self.spies = spies_blue + spies_red
 
         # Create a new embed without the buttons
-        embed = discord.Embed(title=self.spymode_embed_saved_title.format(game_id=self.game_id),
+        embed = discord.Embed(title=self.config.spymode_embed_saved_title.format(game_id=self.game_id),
                               color=discord.Color.green())
 
-        game_info = self.spymode_gameinfo.format(name=self.command_user.display_name, team_size=self.team_size,
-                                                 spy=self.spy)
+        game_info = self.config.spymode_gameinfo.format(name=self.command_user.display_name, team_size=self.team_size,
+                                                        spy=self.spy)
         embed.add_field(name="", value=game_info, inline=False)
 
-        embed.add_field(name=self.blue_team_name.format(team_size=self.team_size),
+        embed.add_field(name=self.config.blue_team_name.format(team_size=self.team_size),
                         value="\n".join([user.display_name for user in self.blue_team]), inline=True)
-        embed.add_field(name=self.red_team_name.format(team_size=self.team_size),
+        embed.add_field(name=self.config.red_team_name.format(team_size=self.team_size),
                         value="\n".join([user.display_name for user in self.red_team]), inline=True)
 
         # Send the embed and a message to all players
-        for user in self.blue_team + self.red_team:
-            if user in spies_blue or user in spies_red:
-                await user.send(self.you_are_spy, embed=embed)
-            else:
-                await user.send(self.you_are_not_spy, embed=embed)
+        messages = [(user, self.config.you_are_spy if user in self.spies else self.config.you_are_not_spy)
+                    for user in self.blue_team + self.red_team]
+        await self.bot.services.get('dm').deliver_each(messages, embed=embed)
 
 
 class SpyModeCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.config = self.bot.get_cog('ConfigCog').config
-        self.spymode_gameinfo = self.config['spymode_gameinfo']
-        self.blue_team_name = self.config['blue_team_name']
-        self.red_team_name = self.config['red_team_name']
-        self.spymode_embed_title = self.config['spymode_embed_title']
-        self.spymode_not_in_channel_message = self.config['spymode_not_in_channel_message']
-        self.spymode_wrong_team_size_message = self.config['spymode_wrong_team_size_message']
-        self.spymode_wrong_spy_size_message = self.config['spymode_wrong_spy_size_message']
-        self.spymode_embed_footer = self.config['spymode_embed_footer']
+        self.config = self.bot.services.get('config')
 
     @app_commands.command(name="spymode")
     @app_commands.describe(team_size="Number of players per side",
@@ -270,30 +249,30 @@ class SpyModeCog(commands.Cog):
 
         # Ensure the command user is in a voice channel
         if interaction.user.voice is None or interaction.user.voice.channel is None:
-            await interaction.followup.send(self.spymode_not_in_channel_message, ephemeral=True)
+            await interaction.followup.send(self.config.spymode_not_in_channel_message, ephemeral=True)
             return
 
         voice_channel = interaction.user.voice.channel
 
         if team_size < 3:
-            await interaction.followup.send(self.spymode_wrong_team_size_message, ephemeral=True)
+            await interaction.followup.send(self.config.spymode_wrong_team_size_message, ephemeral=True)
             return
 
         if spy >= team_size or spy < 1:
-            await interaction.followup.send(self.spymode_wrong_spy_size_message, ephemeral=True)
+            await interaction.followup.send(self.config.spymode_wrong_spy_size_message, ephemeral=True)
             return
 
         game_id = random.randint(10000, 99999)
         view = SpyModeView(self.bot, team_size, spy, interaction.user, voice_channel, game_id)
 
-        embed = discord.Embed(title=self.spymode_embed_title.format(game_id=game_id), color=discord.Color.blue())
+        embed = discord.Embed(title=self.config.spymode_embed_title.format(game_id=game_id), color=discord.Color.blue())
 
-        game_info = self.spymode_gameinfo.format(name=interaction.user.mention, team_size=team_size, spy=spy)
+        game_info = self.config.spymode_gameinfo.format(name=interaction.user.mention, team_size=team_size, spy=spy)
         embed.add_field(name="", value=game_info, inline=False)
 
-        embed.add_field(name=self.blue_team_name.format(team_size=team_size), value="\n", inline=True)
-        embed.add_field(name=self.red_team_name.format(team_size=team_size), value="\n", inline=True)
+        embed.add_field(name=self.config.blue_team_name.format(team_size=team_size), value="\n", inline=True)
+        embed.add_field(name=self.config.red_team_name.format(team_size=team_size), value="\n", inline=True)
 
-        embed.set_footer(text=self.spymode_embed_footer)
+        embed.set_footer(text=self.config.spymode_embed_footer)
 
         await interaction.followup.send(embed=embed, view=view)
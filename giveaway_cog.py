@@ -9,13 +9,86 @@ from discord.utils import format_dt
 from discord.ui import Button, View
 import random
 import string
-import aiosqlite
+import asyncio
 import re
 import datetime
 import tempfile
 import logging
+import functools
+import hashlib
+import hmac
+import secrets
 
-from illegal_team_act_cog import IllegalTeamActCog
+from action_scheduler_cog import PRIORITY_MESSAGE, PRIORITY_EDIT, PRIORITY_BACKGROUND
+
+# Columns of the giveaway table in the order they are read, the draw seed is left out on purpose
+GIVEAWAY_COLUMNS = ('giveaway_id', 'message_id', 'starttime', 'duration', 'winner_number', 'prizes', 'description',
+                    'creator_id', 'reaction_req', 'message_req', 'timespent_req', 'winner_ids', 'is_end')
+
+
+class SeededDraw:
+    """
+    Reproducible winner drawing. The n-th random number is HMAC-SHA256(seed, n), so anyone who knows the
+    revealed seed and the participant list in slot order can repeat the draw, while nobody can predict it
+    before the seed is revealed. The SHA-256 of the seed is published when the giveaway is created.
+    """
+
+    def __init__(self, seed, counter=0):
+        self.seed = seed
+        self.counter = counter
+
+    @staticmethod
+    def new_seed():
+        return secrets.token_hex(32)
+
+    @staticmethod
+    def commitment(seed):
+        return hashlib.sha256(seed.encode()).hexdigest()
+
+    def next_below(self, n):
+        # Rejection sampling keeps every index equally likely
+        limit = (1 << 64) // n * n
+        while True:
+            digest = hmac.new(self.seed.encode(), self.counter.to_bytes(8, 'big'), hashlib.sha256).digest()
+            self.counter += 1
+            value = int.from_bytes(digest[:8], 'big')
+            if value < limit:
+                return value % n
+
+    def sample(self, n, k, exclude=()):
+        """Draw k distinct slots out of range(n), skipping the excluded ones."""
+        taken = set(exclude)
+        k = min(k, n - len(taken))
+        picked = []
+        while len(picked) < k:
+            slot = self.next_below(n)
+            if slot not in taken:
+                taken.add(slot)
+                picked.append(slot)
+        return picked
+
+
+class GiveawayButton(ui.DynamicItem[Button], template=r'(?P<action>participate|exit)_(?P<giveaway_id>\d+)'):
+    """
+    The join and exit buttons of a giveaway. discord.py routes every click whose custom_id matches the template
+    here, so no view has to stay in memory for a giveaway: GiveawayCog looks its view up or rebuilds it.
+    """
+
+    def __init__(self, action, giveaway_id, label, style):
+        super().__init__(Button(label=label, style=style, custom_id=f"{action}_{giveaway_id}"))
+        self.action = action
+        self.giveaway_id = str(giveaway_id)
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Item, match: re.Match, /):
+        return cls(match['action'], match['giveaway_id'], item.label, item.style)
+
+    async def callback(self, interaction: discord.Interaction):
+        view = await interaction.client.get_cog('GiveawayCog').get_giveaway_view(self.giveaway_id)
+        if self.action == 'participate':
+            await view.participate(interaction)
+        else:
+            await view.exit(interaction)
 
 
 class GiveawayParticipationView(ui.View):
@@ -26,34 +99,22 @@ class GiveawayParticipationView(ui.View):
         self.giveaway_channel_id = int(giveaway_channel_id)
         self.message_id = None
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
-        self.giveaway_join_button_label = config['giveaway_join_button_label']
-        self.giveaway_exit_button_label = config['giveaway_exit_button_label']
-        self.giveaway_already_joined_message = config['giveaway_already_joined_message']
-        self.giveaway_joined_message = config['giveaway_joined_message']
-        self.giveaway_leave_message = config['giveaway_leave_message']
-        self.giveaway_not_access_message = config['giveaway_not_access_message']
-        self.giveaway_embed_participants_title = config['giveaway_embed_participants_title']
-        self.giveaway_end_message = config['giveaway_end_message']
-
-        # buttons definition
-        self.participate_button = Button(label=self.giveaway_join_button_label,
-                                         style=components.ButtonStyle.primary,
-                                         custom_id=f"participate_{str(self.giveaway_id)}")
-        self.exit_button = Button(label=self.giveaway_exit_button_label,
-                                  style=components.ButtonStyle.danger,
-                                  custom_id=f"exit_{str(self.giveaway_id)}")
-
-        self.participate_button.callback = self.participate
-        self.exit_button.callback = self.exit
+        self.config = self.bot.services.get('config')
+
+        # buttons definition, their clicks arrive through GiveawayButton.callback
+        self.participate_button = GiveawayButton('participate', self.giveaway_id,
+                                                 self.config.giveaway_join_button_label,
+                                                 components.ButtonStyle.primary)
+        self.exit_button = GiveawayButton('exit', self.giveaway_id, self.config.giveaway_exit_button_label,
+                                          components.ButtonStyle.danger)
 
         self.add_item(self.participate_button)
 
     def disable_all_buttons(self):
         for item in self.children:
-            if isinstance(item, ui.Button):
-                item.disabled = True
+            button = item.item if isinstance(item, ui.DynamicItem) else item
+            if isinstance(button, ui.Button):
+                button.disabled = True
 
     def to_dict(self):
         return {
@@ -69,76 +130,82 @@ class GiveawayParticipationView(ui.View):
 
         giveaway_cog = self.bot.get_cog('GiveawayCog')
 
-        if await giveaway_cog.is_participant(self.giveaway_id, interaction.user.id):
-            # The user has already participated
-
-            # Create an exit button
-            exit_button = ui.Button(label=self.giveaway_exit_button_label, style=discord.ButtonStyle.danger)
-            exit_button.callback = self.exit
+        # Check the requirements and add the user in one go
+        try:
+            result = await giveaway_cog.join_giveaway(self.giveaway_id, interaction.user.id)
+        except Exception as e:
+            logging.error(f"Failed to add {interaction.user.id} to giveaway {self.giveaway_id}: {e}")
+            await interaction.response.send_message("Joining the giveaway failed, please try again.", ephemeral=True)
+            return
 
-            # Create a view for the exit button
-            exit_view = ui.View()
-            exit_view.add_item(exit_button)
+        if result in ('joined', 'already_joined'):
+            # The exit button works like the join button, so this view doesn't have to stay in memory
+            exit_view = ui.View(timeout=None)
+            exit_view.add_item(GiveawayButton('exit', self.giveaway_id, self.config.giveaway_exit_button_label,
+                                              discord.ButtonStyle.danger))
 
-            await interaction.response.send_message(self.giveaway_already_joined_message,
-                                                    view=exit_view,
-                                                    ephemeral=True)
-        else:
-            # The user is participating for the first time
-            # Check if the user meets the requirements to participate in the giveaway
-            if await giveaway_cog.check_participant_eligibility(self.giveaway_id, interaction.user.id, interaction):
-                # Add the user's ID to the participant_ids column in the database
-                await giveaway_cog.add_participant_to_giveaway(self.giveaway_id, interaction.user.id, interaction)
-
-                # Create an exit button
-                exit_button = ui.Button(label=self.giveaway_exit_button_label, style=discord.ButtonStyle.danger)
-                exit_button.callback = self.exit
-
-                # Create a view for the exit button
-                exit_view = ui.View()
-                exit_view.add_item(exit_button)
-
-                # Send a message with the exit button
-                await interaction.response.send_message(self.giveaway_joined_message,
-                                                        view=exit_view,
-                                                        ephemeral=True)
+            # Send a message with the exit button
+            if result == 'joined':
+                message = self.config.giveaway_joined_message
             else:
-                # The user does not meet the requirements to participate in the giveaway
-                await interaction.response.send_message(self.giveaway_not_access_message, ephemeral=True)
+                message = self.config.giveaway_already_joined_message
+            await interaction.response.send_message(message, view=exit_view, ephemeral=True)
+        elif result == 'ended':
+            await interaction.response.send_message(self.config.giveaway_end_message, ephemeral=True)
+        elif result == 'no_giveaway':
+            await interaction.response.send_message(
+                f"Giveaway {self.giveaway_id} does not exist in the giveaway table", ephemeral=True)
+        elif result == 'no_achievements':
+            await interaction.response.send_message(
+                f"User {interaction.user.id} does not exist in the achievements table", ephemeral=True)
+        else:
+            # The user does not meet the requirements to participate in the giveaway
+            await interaction.response.send_message(self.config.giveaway_not_access_message, ephemeral=True)
 
-        # Update the number of participants in the giveaway embed
-        await self.update_giveaway_embed()
+        if result == 'joined':
+            # Update the number of participants in the giveaway embed
+            await self.update_giveaway_embed()
 
     async def exit(self, interaction: discord.Interaction):
         giveaway_cog = self.bot.get_cog('GiveawayCog')
-        giveaway_details = await giveaway_cog.fetch_giveaway(self.giveaway_id)
+        requirements = await giveaway_cog.get_giveaway_requirements(self.giveaway_id)
 
-        if giveaway_details['is_end']:
+        if requirements is None or requirements[3]:
             # The giveaway has already ended
-            await interaction.response.send_message(self.giveaway_end_message, ephemeral=True)
+            await interaction.response.send_message(self.config.giveaway_end_message, ephemeral=True)
             return
-        if await giveaway_cog.is_participant(self.giveaway_id, interaction.user.id):
-            # The user is currently participating and wants to exit
-
-            # Remove the user's ID from the participant_ids column in the database
-            await giveaway_cog.remove_participant_from_giveaway(self.giveaway_id, interaction.user.id)
-
-            await interaction.response.send_message(self.giveaway_leave_message, ephemeral=True)
+        # Remove the user if they are currently participating
+        try:
+            removed = await giveaway_cog.remove_participant_from_giveaway(self.giveaway_id, interaction.user.id)
+        except Exception as e:
+            logging.error(f"Failed to remove {interaction.user.id} from giveaway {self.giveaway_id}: {e}")
+            await interaction.response.send_message("Leaving the giveaway failed, please try again.", ephemeral=True)
+            return
+        if removed:
+            await interaction.response.send_message(self.config.giveaway_leave_message, ephemeral=True)
 
             # Update the number of participants in the giveaway embed
             await self.update_giveaway_embed()
 
     async def update_giveaway_embed(self):
-        # Fetch the giveaway message
         channel = self.bot.get_channel(self.giveaway_channel_id)
         if channel is None:
             logging.error(f"Error: Channel {self.giveaway_channel_id} not found")
             return
+
+        # Joins and exits in quick succession only need the latest count, so the edits are coalesced
+        scheduler = self.bot.services.get('scheduler')
+        scheduler.schedule(self.edit_participant_count, PRIORITY_EDIT, ('edit', channel.id),
+                           key=('giveaway_embed', self.message_id))
+
+    async def edit_participant_count(self):
+        # Fetch the giveaway message
+        channel = self.bot.get_channel(self.giveaway_channel_id)
         message = await channel.fetch_message(self.message_id)
 
         # Find the index of the "Number of Participants" field
         index = next((i for i, field in enumerate(message.embeds[0].fields) if
-                      field.name == self.giveaway_embed_participants_title),
+                      field.name == self.config.giveaway_embed_participants_title),
                      None)
 
         # Update the "Number of Participants" field with the new number of participants
@@ -147,7 +214,7 @@ class GiveawayParticipationView(ui.View):
 
         if index is not None:
             # Update the "Number of Participants" field if it exists
-            message.embeds[0].set_field_at(index, name=self.giveaway_embed_participants_title,
+            message.embeds[0].set_field_at(index, name=self.config.giveaway_embed_participants_title,
                                            value=str(participant_count),
                                            inline=True)
 
@@ -159,21 +226,13 @@ class GiveawayConfirmationView(View):
         super().__init__()
         self.bot = bot
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
-        self.giveaway_embed_title_open = config['giveaway_embed_title_open']
-        self.giveaway_embed_provider_title = config['giveaway_embed_provider_title']
-        self.giveaway_embed_timeend_title = config['giveaway_embed_timeend_title']
-        self.giveaway_embed_winner_number_title = config['giveaway_embed_winner_number_title']
-        self.giveaway_embed_participants_title = config['giveaway_embed_participants_title']
-        self.giveaway_embed_participants_text = config['giveaway_embed_participants_text']
-        self.giveaway_embed_description_title = config['giveaway_embed_description_title']
-        self.giveaway_embed_footer = config['giveaway_embed_footer']
-
-    def create_embed(self, giveaway_id, prizes, description, winners, duration, providers, interaction):
+        self.config = self.bot.services.get('config')
+
+    def create_embed(self, giveaway_id, prizes, description, winners, duration, providers, interaction,
+                     commitment=None):
         # Create an embed to show all the giveaway information
         embed = discord.Embed(
-            title=self.giveaway_embed_title_open.format(prizes=prizes),
+            title=self.config.giveaway_embed_title_open.format(prizes=prizes),
             color=discord.Color.blue()
         )
 
@@ -185,14 +244,16 @@ class GiveawayConfirmationView(View):
         embed.timestamp = datetime.datetime.now()
 
         # Add the fields to the embed
-        embed.add_field(name=self.giveaway_embed_provider_title, value=providers, inline=False)
-        embed.add_field(name=self.giveaway_embed_timeend_title, value=elapsed_time, inline=True)
-        embed.add_field(name=self.giveaway_embed_winner_number_title, value=str(winners), inline=True)
-        embed.add_field(name=self.giveaway_embed_participants_title, value=self.giveaway_embed_participants_text,
-                        inline=True)
-        embed.add_field(name=self.giveaway_embed_description_title, value=description, inline=False)
+        embed.add_field(name=self.config.giveaway_embed_provider_title, value=providers, inline=False)
+        embed.add_field(name=self.config.giveaway_embed_timeend_title, value=elapsed_time, inline=True)
+        embed.add_field(name=self.config.giveaway_embed_winner_number_title, value=str(winners), inline=True)
+        embed.add_field(name=self.config.giveaway_embed_participants_title,
+                        value=self.config.giveaway_embed_participants_text, inline=True)
+        embed.add_field(name=self.config.giveaway_embed_description_title, value=description, inline=False)
+        if commitment is not None:
+            embed.add_field(name=self.config.giveaway_embed_commitment_title, value=f"`{commitment}`", inline=False)
 
-        embed.set_footer(text=self.giveaway_embed_footer.format(giveaway_id=giveaway_id))
+        embed.set_footer(text=self.config.giveaway_embed_footer.format(giveaway_id=giveaway_id))
 
         # Set the thumbnail to the bot's avatar
         if self.bot.user.avatar:
@@ -214,12 +275,10 @@ class GiveawayForm(ui.Modal, title='Create Giveaway'):
     def __init__(self, bot, reaction_limit=0, message_limit=0, timespent_limit=0):
         super().__init__()
         self.bot = bot
-        self.giveaways = {}
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
-        self.giveaway_channel_id = config['giveaway_channel_id']
-        self.giveaway_default_provider = config['giveaway_default_provider']
+        self.config = self.bot.services.get('config')
+
+        self.db = self.bot.services.get('db')
 
         self.reaction_limit = reaction_limit
         self.message_limit = message_limit
@@ -252,15 +311,9 @@ class GiveawayForm(ui.Modal, title='Create Giveaway'):
         # Generate a unique giveaway id
         giveaway_id = await self.generate_giveaway_id()
 
-        # Store the giveaway details
-        self.giveaways[giveaway_id] = {
-            'duration': duration_in_minutes,
-            'winners': int(self.winners.value),
-            'prizes': self.prizes.value,
-            'description': self.description.value,
-            'providers': self.providers.value if self.providers.value else self.giveaway_default_provider,
-            'initiator': interaction.user.id
-        }
+        # The seed stays secret until the end, only its hash is shown
+        draw_seed = SeededDraw.new_seed()
+        seed_commitment = SeededDraw.commitment(draw_seed)
 
         # Create an instance of GiveawayConfirmationView
         giveaway_confirmation_view = GiveawayConfirmationView(self.bot)
@@ -272,8 +325,9 @@ class GiveawayForm(ui.Modal, title='Create Giveaway'):
             description=self.description.value,
             winners=self.winners.value,
             duration=duration_in_minutes,
-            providers=self.providers.value if self.providers.value else self.giveaway_default_provider,
-            interaction=interaction
+            providers=self.providers.value if self.providers.value else self.config.giveaway_default_provider,
+            interaction=interaction,
+            commitment=seed_commitment
         )
 
         message = f"Limitations:\n" \
@@ -284,10 +338,10 @@ class GiveawayForm(ui.Modal, title='Create Giveaway'):
         await interaction.response.send_message(content=message, embed=embed, ephemeral=False)
 
         # Create an instance of GiveawayParticipationView
-        giveaway_view = GiveawayParticipationView(self.bot, giveaway_id, self.giveaway_channel_id)
+        giveaway_view = GiveawayParticipationView(self.bot, giveaway_id, self.config.giveaway_channel_id)
 
         # Send the embed in the giveaway channel
-        giveaway_channel = self.bot.get_channel(self.giveaway_channel_id)
+        giveaway_channel = self.bot.get_channel(self.config.giveaway_channel_id)
         message = await giveaway_channel.send(embed=embed, view=giveaway_view)
 
         # Insert the giveaway into the database
@@ -303,14 +357,16 @@ class GiveawayForm(ui.Modal, title='Create Giveaway'):
             None,  # winner_ids will be None initially
             self.reaction_limit,
             self.message_limit,
-            self.timespent_limit
+            self.timespent_limit,
+            draw_seed,
+            seed_commitment
         )
 
         # Store the message ID in the view
         giveaway_view.message_id = message.id
 
-        # Store the GiveawayParticipationView instance in the giveaways dictionary
-        self.bot.get_cog('GiveawayCog').giveaways[giveaway_id] = giveaway_view
+        # Keep the view at hand for the first clicks
+        self.bot.get_cog('GiveawayCog').remember_giveaway_view(giveaway_id, giveaway_view)
 
         # Save the state of the GiveawayParticipationView instance
         await self.bot.get_cog('GiveawayCog').save_giveaways(giveaway_id, giveaway_view)
@@ -340,21 +396,22 @@ class GiveawayForm(ui.Modal, title='Create Giveaway'):
         return True
 
     async def insert_giveaway(self, giveaway_id, message_id, starttime, duration, winner_number, prizes, description,
-                              creator_id, winner_ids, reaction_req, message_req, timespent_req):
-        async with aiosqlite.connect(self.db_path) as db:
+                              creator_id, winner_ids, reaction_req, message_req, timespent_req, draw_seed,
+                              seed_commitment):
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
-                'INSERT INTO giveaway (giveaway_id, message_id, starttime, duration, winner_number, prizes, description, creator_id, winner_ids, reaction_req, message_req, timespent_req) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                'INSERT INTO giveaway (giveaway_id, message_id, starttime, duration, winner_number, prizes, description, creator_id, winner_ids, reaction_req, message_req, timespent_req, draw_seed, seed_commitment) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
                 (giveaway_id, message_id, starttime, duration, winner_number, prizes, description, creator_id,
-                 winner_ids, reaction_req, message_req, timespent_req))
+                 winner_ids, reaction_req, message_req, timespent_req, draw_seed, seed_commitment))
             await db.commit()
             await cursor.close()
 
     async def fetch_giveaway(self, giveaway_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
-                'SELECT * FROM giveaway WHERE giveaway_id = ?',
+                'SELECT giveaway_id FROM giveaway WHERE giveaway_id = ?',
                 (giveaway_id,))
             record = await cursor.fetchone()
             await cursor.close()
@@ -434,44 +491,73 @@ class GiveawayCheckParticipantView(ui.View):
 class GiveawayCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.giveaways = {}
-        self.illegal_act_cog = IllegalTeamActCog(bot)
-
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
-        self.giveaway_channel_id = config['giveaway_channel_id']
-        self.giveaway_embed_title_open = config['giveaway_embed_title_open']
-        self.giveaway_embed_title_closed = config['giveaway_embed_title_closed']
-        self.giveaway_embed_title_closed_deleted = config['giveaway_embed_title_closed_deleted']
-        self.giveaway_embed_description_closed_deleted = config['giveaway_embed_description_closed_deleted']
-        self.giveaway_embed_description_title = config['giveaway_embed_description_title']
-        self.giveaway_embed_end_label = config['giveaway_embed_end_label']
-        self.giveaway_embed_winner_title = config['giveaway_embed_winner_title']
-        self.giveaway_embed_no_winner = config['giveaway_embed_no_winner']
-        self.giveaway_embed_cancel_label = config['giveaway_embed_cancel_label']
-        self.giveaway_embed_earlyend_label = config['giveaway_embed_earlyend_label']
-        self.giveaway_embed_time_extend_label = config['giveaway_embed_time_extend_label']
-        self.giveaway_embed_timeend_title = config['giveaway_embed_timeend_title']
-        self.giveaway_win_public_message = config['giveaway_win_public_message']
-        self.giveaway_win_private_message = config['giveaway_win_private_message']
-        self.giveaway_fail_message = config['giveaway_fail_message']
+        self.views = self.bot.services.get('views')
+        self.background_tasks = set()
+        self.giveaway_requirements = {}  # giveaway_id -> (reaction_req, message_req, timespent_req, is_end)
+        self.requirements_lock = asyncio.Lock()
+        self.pending_writes = []  # (write, giveaway_id, user_id, future) waiting for the participant writer
+        self.participant_writer = None
+        self.validation_task = None
+        self.illegal_act_cog = self.bot.services.get('permissions')
+        self.scheduler = self.bot.services.get('scheduler')
+
+        self.config = self.bot.services.get('config')
+
+        self.db = self.bot.services.get('db')
 
         # Start the background task
         self.check_giveaways.start()
 
-    async def draw_winners(self, giveaway_id, winner_number):
-        # Fetch the participant_ids from the database
-        participant_ids = await self.fetch_participant_ids(giveaway_id)
-
-        # Check if there are any participants
-        if not participant_ids:
-            return []
+    async def draw_winners(self, giveaway_id, winner_number, exclude_ids=()):
+        async with self.db.connect() as db:
+            cursor = await db.execute('SELECT draw_seed, draw_counter FROM giveaway WHERE giveaway_id = ?',
+                                      (giveaway_id,))
+            draw_seed, draw_counter = await cursor.fetchone()
+            if draw_seed is None:
+                # Giveaways created before seeded draws have no commitment, but the seed is still revealed
+                draw_seed = SeededDraw.new_seed()
+
+            # Slots are dense, so the participant count is the range to draw from
+            cursor = await db.execute('SELECT COUNT(*) FROM giveaway_participants WHERE giveaway_id = ?',
+                                      (giveaway_id,))
+            participant_count = (await cursor.fetchone())[0]
+
+            # Check if there are any participants
+            if participant_count == 0:
+                return []
 
-        # Draw the winners
-        winners = random.sample(participant_ids, min(winner_number, len(participant_ids)))
+            excluded_slots = []
+            if exclude_ids:
+                placeholders = ','.join('?' * len(exclude_ids))
+                cursor = await db.execute(
+                    f'SELECT slot FROM giveaway_participants WHERE giveaway_id = ? AND user_id IN ({placeholders})',
+                    (giveaway_id, *exclude_ids))
+                excluded_slots = [row[0] for row in await cursor.fetchall()]
+
+            # Draw the winners, continuing the random stream where the last draw of this giveaway stopped
+            draw = SeededDraw(draw_seed, draw_counter or 0)
+            slots = draw.sample(participant_count, winner_number, excluded_slots)
+
+            winners = []
+            for slot in slots:
+                cursor = await db.execute('SELECT user_id FROM giveaway_participants WHERE giveaway_id = ? AND slot = ?',
+                                          (giveaway_id, slot))
+                winners.append((await cursor.fetchone())[0])
+
+            await db.execute('UPDATE giveaway SET draw_seed = ?, draw_counter = ? WHERE giveaway_id = ?',
+                             (draw_seed, draw.counter, giveaway_id))
+            await db.commit()
 
         return winners
 
+    async def add_seed_field(self, embed, giveaway_id):
+        # Reveal the seed so the draw can be checked against the commitment shown since the start
+        async with self.db.connect() as db:
+            cursor = await db.execute('SELECT draw_seed FROM giveaway WHERE giveaway_id = ?', (giveaway_id,))
+            record = await cursor.fetchone()
+        if record is not None and record[0] is not None:
+            embed.add_field(name=self.config.giveaway_embed_seed_title, value=f"`{record[0]}`", inline=False)
+
     @tasks.loop(seconds=30)
     async def check_giveaways(self):
         if not self.bot.is_closed():
@@ -485,7 +571,11 @@ class GiveawayCog(commands.Cog):
                     (giveaway_id, message_id, starttime, duration,
                      winner_number, prizes, description, creator_id,
                      reaction_req, message_req, timespent_req,
-                     participant_ids, winner_ids, is_end) = giveaway
+                     winner_ids, is_end) = giveaway
+
+                    # Keep the requirements of running giveaways ready for join clicks
+                    self.giveaway_requirements.setdefault(int(giveaway_id),
+                                                          (reaction_req, message_req, timespent_req, is_end))
 
                     message_id = int(message_id)
                     # Check if the giveaway has ended
@@ -494,9 +584,9 @@ class GiveawayCog(commands.Cog):
                         # print(end_time)
                         # The giveaway has ended
                         # Fetch the giveaway message
-                        channel = self.bot.get_channel(self.giveaway_channel_id)
+                        channel = self.bot.get_channel(self.config.giveaway_channel_id)
                         if channel is None:
-                            logging.error(f"Couldn't find a channel with the ID {self.giveaway_channel_id}")
+                            logging.error(f"Couldn't find a channel with the ID {self.config.giveaway_channel_id}")
                         else:
                             try:
                                 # Try to fetch the giveaway message
@@ -508,48 +598,32 @@ class GiveawayCog(commands.Cog):
                                     # The giveaway has ended
                                     # Create a new end embed
                                     embed = discord.Embed(
-                                        title=self.giveaway_embed_title_closed_deleted.format(giveaway_id),
-                                        description=self.giveaway_embed_description_closed_deleted,
+                                        title=self.config.giveaway_embed_title_closed_deleted.format(giveaway_id),
+                                        description=self.config.giveaway_embed_description_closed_deleted,
                                         color=discord.Color.red()
                                     )
 
                                     # Send the end embed
-                                    await channel.send(embed=embed)
+                                    await self.scheduler.run(lambda: channel.send(embed=embed),
+                                                             PRIORITY_MESSAGE, ('send', channel.id))
 
                                     # Mark the giveaway as ended in the database
                                     await self.mark_giveaway_as_ended(giveaway_id)
                             else:
-                                # print(self.giveaways)
-                                # The message exists
-                                # Check if the giveaway_id exists in the giveaways dictionary
-                                if giveaway_id not in self.giveaways:
-                                    # The giveaway_id does not exist in the dictionary
-                                    # Create a new GiveawayParticipationView instance
+                                # The message exists, end it with its view, or the same view built again
+                                giveaway_view = self.views.get(('giveaway', int(giveaway_id)))
+                                if giveaway_view is None:
                                     giveaway_view = GiveawayParticipationView(self.bot, giveaway_id,
-                                                                              self.giveaway_channel_id)
+                                                                              self.config.giveaway_channel_id)
                                     giveaway_view.message_id = message_id
-                                    self.giveaways[giveaway_id] = giveaway_view
-
-                                    # Add the participants from the database
-                                    if participant_ids is not None:
-                                        participant_ids = str(participant_ids)
-                                        participant_id_list = participant_ids.split(',')
-                                        giveaway_view.participants = set(
-                                            int(participant_id) for participant_id in participant_id_list)
-                                    else:
-                                        giveaway_view.participants = set()
-
-                                # Fetch the GiveawayParticipationView instance associated with the giveaway
-                                giveaway_view = self.giveaways[giveaway_id]
 
                                 # Modify the embed
                                 embed = message.embeds[0]
-                                embed.title = self.giveaway_embed_end_label + embed.title
+                                embed.title = self.config.giveaway_embed_end_label + embed.title
                                 embed.color = discord.Color.red()
 
                                 # Make all buttons non-interactive
-                                for item in giveaway_view.children:
-                                    item.disabled = True
+                                giveaway_view.disable_all_buttons()
 
                                 # Draw the winners
                                 winners = await self.draw_winners(giveaway_id, winner_number)
@@ -560,12 +634,14 @@ class GiveawayCog(commands.Cog):
                                 winners = [f"<@{winner_id}>" if winner_id is not None and winner_id != 0 else None for
                                            winner_id in winners]
 
-                                embed.add_field(name=self.giveaway_embed_winner_title,
-                                                value=", ".join(winners) if winners else self.giveaway_embed_no_winner,
+                                embed.add_field(name=self.config.giveaway_embed_winner_title,
+                                                value=", ".join(winners) if winners
+                                                else self.config.giveaway_embed_no_winner,
                                                 inline=False)
+                                await self.add_seed_field(embed, giveaway_id)
 
                                 # Update the message
-                                await message.edit(embed=embed, view=giveaway_view)
+                                await self.edit_giveaway_message(message, embed=embed, view=giveaway_view)
 
                                 # Update the results to the database
                                 await self.update_giveaway(giveaway_id, winners)
@@ -583,41 +659,45 @@ class GiveawayCog(commands.Cog):
 
     async def fetch_all_giveaways(self, is_end=True):
         if not is_end:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db.connect() as db:
                 cursor = await db.cursor()
-                await cursor.execute('SELECT * FROM giveaway WHERE is_end = 0')
+                await cursor.execute(f'SELECT {", ".join(GIVEAWAY_COLUMNS)} FROM giveaway WHERE is_end = 0')
                 records = await cursor.fetchall()
                 await cursor.close()
                 return records
         else:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db.connect() as db:
                 cursor = await db.cursor()
-                await cursor.execute('SELECT * FROM giveaway')
+                await cursor.execute(f'SELECT {", ".join(GIVEAWAY_COLUMNS)} FROM giveaway')
                 records = await cursor.fetchall()
                 await cursor.close()
                 return records
 
     async def update_giveaway(self, giveaway_id, winners):
         logging.info(f"Updating giveaway {giveaway_id} with winners {winners}")
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
                 'UPDATE giveaway SET winner_ids = ?, is_end = 1 WHERE giveaway_id = ?',
                 (",".join(str(winner_id) for winner_id in winners), giveaway_id))
             await db.commit()
             await cursor.close()
+        self.giveaway_requirements.pop(int(giveaway_id), None)
+        self.forget_giveaway_view(giveaway_id)
 
         await self.cleanup_ended_giveaways()
 
     async def mark_giveaway_as_ended(self, giveaway_id):
         logging.info(f"Marking giveaway {giveaway_id} as ended")
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
                 'UPDATE giveaway SET is_end = 1 WHERE giveaway_id = ?',
                 (giveaway_id,))
             await db.commit()
             await cursor.close()
+        self.giveaway_requirements.pop(int(giveaway_id), None)
+        self.forget_giveaway_view(giveaway_id)
 
         await self.cleanup_ended_giveaways()
 
@@ -659,107 +739,150 @@ class GiveawayCog(commands.Cog):
 
         # File will be automatically deleted when exiting the with block
 
-    async def add_participant_to_giveaway(self, giveaway_id, participant_id, interaction):
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.cursor()
-
-            # Fetch the current participant_ids from the giveaway
-            await cursor.execute('SELECT participant_ids FROM giveaway WHERE giveaway_id = ?',
-                                 (giveaway_id,))
-            record = await cursor.fetchone()
-            current_participant_ids = record[0]
-
-            # Add the new participant_id to the current participant_ids
-            if current_participant_ids is None:
-                new_participant_ids = str(participant_id)
+    async def get_giveaway_requirements(self, giveaway_id):
+        # Requirements never change while a giveaway runs, so they are read once per giveaway
+        giveaway_id = int(giveaway_id)
+        requirements = self.giveaway_requirements.get(giveaway_id)
+        if requirements is None:
+            # The first clicks of a giveaway all miss the cache, only one of them reads the database
+            async with self.requirements_lock:
+                requirements = self.giveaway_requirements.get(giveaway_id)
+                if requirements is None:
+                    async with self.db.connect() as db:
+                        cursor = await db.execute('SELECT reaction_req, message_req, timespent_req, is_end '
+                                                  'FROM giveaway WHERE giveaway_id = ?', (giveaway_id,))
+                        record = await cursor.fetchone()
+                    if record is None:
+                        return None
+                    requirements = self.giveaway_requirements[giveaway_id] = record
+        return requirements
+
+    async def join_giveaway(self, giveaway_id, participant_id):
+        """
+        Add a participant if they meet the requirements and return the outcome:
+        'joined', 'already_joined', 'not_eligible', 'no_achievements', 'no_giveaway' or 'ended'.
+        """
+        requirements = await self.get_giveaway_requirements(giveaway_id)
+        if requirements is None:
+            return 'no_giveaway'
+        if requirements[3]:
+            return 'ended'
+
+        return await self.write_participant(functools.partial(self.insert_participant, requirements=requirements),
+                                            giveaway_id, participant_id)
+
+    async def write_participant(self, write, giveaway_id, participant_id):
+        future = asyncio.get_running_loop().create_future()
+        self.pending_writes.append((write, int(giveaway_id), participant_id, future))
+        if self.participant_writer is None or self.participant_writer.done():
+            self.participant_writer = asyncio.create_task(self.write_participants())
+        return await future
+
+    async def write_participants(self):
+        # Clicks arriving while a batch is being written are written together in the next batch with one commit,
+        # instead of every click waiting for the database lock on its own connection
+        while self.pending_writes:
+            batch, self.pending_writes = self.pending_writes, []
+            try:
+                async with self.db.connect() as db:
+                    try:
+                        results = await self.write_batch(db, batch, isolated=False)
+                    except Exception:
+                        # Written again with every change on its own, so only the failing ones fail
+                        await db.rollback()
+                        results = await self.write_batch(db, batch, isolated=True)
+            except Exception as e:
+                logging.error(f"Failed to write {len(batch)} giveaway participant changes: {e}")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
             else:
-                new_participant_ids = current_participant_ids + ',' + str(participant_id)
-
-            # Update the participant_ids in the giveaway
-            await cursor.execute('UPDATE giveaway SET participant_ids = ? WHERE giveaway_id = ?',
-                                 (new_participant_ids, giveaway_id))
-            await db.commit()
-            await cursor.close()
+                for (*_, future), (succeeded, result) in zip(batch, results):
+                    if future.done():
+                        continue
+                    if succeeded:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(result)
+
+    async def write_batch(self, db, batch, isolated):
+        """
+        Write a batch in one transaction and return (succeeded, result or exception) per change. Only `isolated`
+        batches put every change in a savepoint that is rolled back when it fails, the others stop at the first
+        failure, since two savepoint statements per change slow down the usual batch where nothing fails.
+        """
+        await db.execute('BEGIN')
+        results = []
+        for write, giveaway_id, participant_id, _ in batch:
+            if not isolated:
+                results.append((True, await write(db, giveaway_id, participant_id)))
+                continue
+            await db.execute('SAVEPOINT participant')
+            try:
+                results.append((True, await write(db, giveaway_id, participant_id)))
+            except Exception as e:
+                logging.error(f"Failed to write the giveaway {giveaway_id} change of {participant_id}: {e}")
+                await db.execute('ROLLBACK TO participant')
+                results.append((False, e))
+            await db.execute('RELEASE participant')
+        await db.commit()
+        return results
+
+    async def insert_participant(self, db, giveaway_id, participant_id, *, requirements):
+        reaction_req, message_req, timespent_req, _ = requirements
+
+        # The achievements row only yields a participant if it meets the requirements, and the participant
+        # takes the next free slot, so slots stay dense from 0 and winners can be drawn by index
+        cursor = await db.execute('''
+            INSERT OR IGNORE INTO giveaway_participants (giveaway_id, slot, user_id)
+            SELECT ?, (SELECT COALESCE(MAX(slot), -1) + 1 FROM giveaway_participants WHERE giveaway_id = ?), user_id
+            FROM achievements
+            WHERE user_id = ? AND message_count >= ? AND reaction_count >= ? AND time_spent >= ?
+        ''', (giveaway_id, giveaway_id, participant_id, message_req, reaction_req, timespent_req))
+        if cursor.rowcount == 1:
+            return 'joined'
+
+        # Nothing was added, find out why
+        cursor = await db.execute('''
+            SELECT EXISTS (SELECT 1 FROM giveaway_participants WHERE giveaway_id = ? AND user_id = ?),
+                   EXISTS (SELECT 1 FROM achievements WHERE user_id = ?)
+        ''', (giveaway_id, participant_id, participant_id))
+        already_joined, has_achievements = await cursor.fetchone()
+
+        if already_joined:
+            return 'already_joined'
+        return 'not_eligible' if has_achievements else 'no_achievements'
 
     async def remove_participant_from_giveaway(self, giveaway_id, participant_id):
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.cursor()
-
-            # Fetch the current participant_ids from the database
-            await cursor.execute('SELECT participant_ids FROM giveaway WHERE giveaway_id = ?', (giveaway_id,))
-            record = await cursor.fetchone()
-            if record[0] is not None:
-                current_participant_ids = record[0].split(',')
-
-                # Remove the participant_id from the current participant_ids
-                if str(participant_id) in current_participant_ids:
-                    current_participant_ids.remove(str(participant_id))
-
-                # Update the participant_ids in the database
-                await cursor.execute('UPDATE giveaway SET participant_ids = ? WHERE giveaway_id = ?',
-                                     (','.join(current_participant_ids), giveaway_id))
-            else:
-                logging.error(f"No participant_ids found for giveaway_id {giveaway_id}")
-            await db.commit()
-            await cursor.close()
-
-    async def check_participant_eligibility(self, giveaway_id, participant_id, interaction):
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.cursor()
-
-            # Fetch the giveaway's requirements from the giveaway table
-            await cursor.execute("SELECT reaction_req, message_req, timespent_req FROM giveaway WHERE giveaway_id = ?",
-                                 (giveaway_id,))
-            giveaway_record = await cursor.fetchone()
-
-            if giveaway_record is not None:
-                # The giveaway exists in the giveaway table
-                reaction_req, message_req, timespent_req = giveaway_record
-
-                # Fetch the participant's record from the achievements table
-                await cursor.execute("SELECT * FROM achievements WHERE user_id = ?", (participant_id,))
-                record = await cursor.fetchone()
-
-                if record is not None:
-                    # The participant exists in the achievements table
-                    _, message_count, reaction_count, time_spent, giveaway_count = record
+        return await self.write_participant(self.delete_participant, giveaway_id, participant_id)
+
+    async def delete_participant(self, db, giveaway_id, participant_id):
+        cursor = await db.execute('SELECT slot FROM giveaway_participants WHERE giveaway_id = ? AND user_id = ?',
+                                  (giveaway_id, participant_id))
+        record = await cursor.fetchone()
+        if record is None:
+            # The user is not a participant
+            return False
 
-                    # Check if the participant meets the requirements
-                    if message_count >= message_req and reaction_count >= reaction_req and time_spent >= timespent_req:
-                        # The participant meets the requirements
-                        return True
-                    else:
-                        # The participant does not meet the requirements
-                        return False
-                else:
-                    # The participant does not exist in the achievements table
-                    await interaction.response.send_message(
-                        f"User {participant_id} does not exist in the achievements table", ephemeral=True)
-                    return False
-            else:
-                # The giveaway does not exist in the giveaway table
-                await interaction.response.send_message(
-                    f"Giveaway {giveaway_id} does not exist in the giveaway table", ephemeral=True)
-                return False
+        # Move the last participant into the freed slot to keep the slots dense
+        slot = record[0]
+        await db.execute('DELETE FROM giveaway_participants WHERE giveaway_id = ? AND slot = ?', (giveaway_id, slot))
+        await db.execute('''
+            UPDATE giveaway_participants SET slot = ?
+            WHERE giveaway_id = ? AND slot = (SELECT MAX(slot) FROM giveaway_participants WHERE giveaway_id = ?)
+            AND slot > ?
+        ''', (slot, giveaway_id, giveaway_id, slot))
+        return True
 
     async def fetch_participant_ids(self, giveaway_id):
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.cursor()
-
-            # Fetch the current participant_ids from the giveaway
-            await cursor.execute('SELECT participant_ids FROM giveaway WHERE giveaway_id = ?',
-                                 (giveaway_id,))
-            record = await cursor.fetchone()
-            current_participant_ids = record[0]
-
-            if current_participant_ids is not None:
-                # Split the string into a list and filter out any empty strings
-                return [id for id in current_participant_ids.split(',') if id]
-            else:
-                return []
+        async with self.db.connect() as db:
+            # Slot order is the order the draw indexes into
+            cursor = await db.execute('SELECT user_id FROM giveaway_participants WHERE giveaway_id = ? ORDER BY slot',
+                                      (giveaway_id,))
+            return [record[0] for record in await cursor.fetchall()]
 
     async def fetch_winner_ids(self, giveaway_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
 
             # Fetch the winner_ids from the giveaway
@@ -776,54 +899,32 @@ class GiveawayCog(commands.Cog):
         return winner_ids
 
     async def is_participant(self, giveaway_id, participant_id):
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.cursor()
-
-            # Fetch the current participant_ids from the giveaway
-            await cursor.execute('SELECT participant_ids FROM giveaway WHERE giveaway_id = ?',
-                                 (giveaway_id,))
-            record = await cursor.fetchone()
-            current_participant_ids = record[0]
-
-            if current_participant_ids is not None:
-                current_participant_ids = current_participant_ids.split(',')
-                return str(participant_id) in current_participant_ids
-            else:
-                return False
+        async with self.db.connect() as db:
+            cursor = await db.execute('SELECT 1 FROM giveaway_participants WHERE giveaway_id = ? AND user_id = ?',
+                                      (giveaway_id, participant_id))
+            return await cursor.fetchone() is not None
 
     async def get_participant_count(self, giveaway_id):
-        participant_ids = await self.fetch_participant_ids(giveaway_id)
-        return len(participant_ids)
+        async with self.db.connect() as db:
+            cursor = await db.execute('SELECT COUNT(*) FROM giveaway_participants WHERE giveaway_id = ?',
+                                      (giveaway_id,))
+            return (await cursor.fetchone())[0]
 
     async def fetch_giveaway(self, giveaway_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
 
             # Fetch the giveaway details from the database
-            await cursor.execute('SELECT * FROM giveaway WHERE giveaway_id = ?',
+            await cursor.execute(f'SELECT {", ".join(GIVEAWAY_COLUMNS)} FROM giveaway WHERE giveaway_id = ?',
                                  (giveaway_id,))
             record = await cursor.fetchone()
             await cursor.close()
 
+            if record is None:
+                return None
+
             # Convert the record to a dictionary
-            giveaway_details = {
-                'giveaway_id': record[0],
-                'message_id': record[1],
-                'starttime': record[2],
-                'duration': record[3],
-                'winner_number': record[4],
-                'prizes': record[5],
-                'description': record[6],
-                'creator_id': record[7],
-                'reaction_req': record[8],
-                'message_req': record[9],
-                'timespent_req': record[10],
-                'participant_ids': record[11],
-                'winner_ids': record[12],
-                'is_end': record[13],
-            }
-
-            return giveaway_details
+            return dict(zip(GIVEAWAY_COLUMNS, record))
 
     @app_commands.command(name="ga_cancel",
                           description="Cancel a giveaway without selecting winners")
@@ -847,21 +948,21 @@ class GiveawayCog(commands.Cog):
             await self.mark_giveaway_as_ended(giveaway_id)
 
             # Fetch the giveaway message
-            channel = self.bot.get_channel(self.giveaway_channel_id)
+            channel = self.bot.get_channel(self.config.giveaway_channel_id)
             message = await channel.fetch_message(giveaway_details['message_id'])
 
             # Update the embed to indicate that the giveaway is cancelled
             embed = message.embeds[0]
-            embed.title = self.giveaway_embed_cancel_label + embed.title
+            embed.title = self.config.giveaway_embed_cancel_label + embed.title
             embed.color = discord.Color.orange()
 
             # Create a new instance of GiveawayParticipationView and set the message_id attribute
-            view = GiveawayParticipationView(self.bot, giveaway_id, self.giveaway_channel_id)
+            view = GiveawayParticipationView(self.bot, giveaway_id, self.config.giveaway_channel_id)
             view.message_id = message.id
             view.disable_all_buttons()
 
             # Edit the message with the disabled view
-            await message.edit(embed=embed, view=view)
+            await self.edit_giveaway_message(message, embed=embed, view=view)
 
             await interaction.response.send_message(f"Giveaway {giveaway_id} has been cancelled.", ephemeral=True)
 
@@ -892,26 +993,27 @@ class GiveawayCog(commands.Cog):
             await self.update_giveaway(giveaway_id, winners)
 
             # Fetch the giveaway message
-            channel = self.bot.get_channel(self.giveaway_channel_id)
+            channel = self.bot.get_channel(self.config.giveaway_channel_id)
             message = await channel.fetch_message(giveaway_details['message_id'])
 
             # Update the embed to indicate that the giveaway has ended early and display the winners
             embed = message.embeds[0]
-            embed.title = self.giveaway_embed_earlyend_label + embed.title
+            embed.title = self.config.giveaway_embed_earlyend_label + embed.title
             embed.color = discord.Color.red()
 
             winners = [f"<@{winner_id}>" if winner_id is not None and winner_id != 0 else None for
                        winner_id in winners]
-            embed.add_field(name=self.giveaway_embed_winner_title,
-                            value=", ".join(winners) if winners else self.giveaway_embed_no_winner, inline=False)
+            embed.add_field(name=self.config.giveaway_embed_winner_title,
+                            value=", ".join(winners) if winners else self.config.giveaway_embed_no_winner, inline=False)
+            await self.add_seed_field(embed, giveaway_id)
 
             # Create a new instance of GiveawayParticipationView and set the message_id attribute
-            view = GiveawayParticipationView(self.bot, giveaway_id, self.giveaway_channel_id)
+            view = GiveawayParticipationView(self.bot, giveaway_id, self.config.giveaway_channel_id)
             view.message_id = message.id
             view.disable_all_buttons()
 
             # Edit the message with the disabled view
-            await message.edit(embed=embed, view=view)
+            await self.edit_giveaway_message(message, embed=embed, view=view)
 
             await interaction.response.send_message(f"Giveaway {giveaway_id} has been ended early.", ephemeral=True)
 
@@ -940,18 +1042,18 @@ class GiveawayCog(commands.Cog):
             await self.update_giveaway_duration(giveaway_id, new_duration)
 
             # Fetch the giveaway message
-            channel = self.bot.get_channel(self.giveaway_channel_id)
+            channel = self.bot.get_channel(self.config.giveaway_channel_id)
             message = await channel.fetch_message(giveaway_details['message_id'])
 
             # Update the embed to indicate that the giveaway time has been extended
             embed = message.embeds[0]
-            embed.title = embed.title + self.giveaway_embed_time_extend_label
-            embed.set_field_at(1, name=self.giveaway_embed_timeend_title,
+            embed.title = embed.title + self.config.giveaway_embed_time_extend_label
+            embed.set_field_at(1, name=self.config.giveaway_embed_timeend_title,
                                value=format_dt(datetime.datetime.now() + datetime.timedelta(minutes=new_duration),
                                                style='R'), inline=True)
 
             # Update the message
-            await message.edit(embed=embed)
+            await self.edit_giveaway_message(message, embed=embed)
 
             await interaction.response.send_message(f"Giveaway {giveaway_id} time has been extended by {time} minutes.",
                                                     ephemeral=True)
@@ -982,7 +1084,7 @@ class GiveawayCog(commands.Cog):
                 return
 
             # Create an instance of GiveawayCheckParticipantView
-            participant_view = GiveawayCheckParticipantView(giveaway_id, participant_ids)
+            participant_view = self.views.add(GiveawayCheckParticipantView(giveaway_id, participant_ids))
 
             # Send a message with the GiveawayCheckParticipantView instance as the view
             message = await interaction.response.send_message(content=f"Participants for giveaway {giveaway_id}:",
@@ -1012,22 +1114,22 @@ class GiveawayCog(commands.Cog):
             await self.update_giveaway_description(giveaway_id, description)
 
             # Fetch the giveaway message
-            channel = self.bot.get_channel(self.giveaway_channel_id)
+            channel = self.bot.get_channel(self.config.giveaway_channel_id)
             message = await channel.fetch_message(giveaway_details['message_id'])
 
             # Update the embed to reflect the new description
             embed = message.embeds[0]
             # Find the index of the "Description" field
             index = next((i for i, field in enumerate(message.embeds[0].fields) if
-                          field.name == self.giveaway_embed_description_title), None)
+                          field.name == self.config.giveaway_embed_description_title), None)
 
             # Update the "Description" field if it exists
             if index is not None:
-                embed.set_field_at(index, name=self.giveaway_embed_description_title, value=description,
+                embed.set_field_at(index, name=self.config.giveaway_embed_description_title, value=description,
                                    inline=False)
 
             # Edit the message with the updated embed
-            await message.edit(embed=embed)
+            await self.edit_giveaway_message(message, embed=embed)
 
             await interaction.response.send_message(f"Giveaway {giveaway_id} description has been updated.",
                                                     ephemeral=True)
@@ -1045,24 +1147,72 @@ class GiveawayCog(commands.Cog):
             await interaction.response.send_message(f"No winners found for giveaway {giveaway_id}.", ephemeral=True)
             return
         else:
-            # Iterate over the winners
-            for winner_id in winner_ids:
-                # Fetch the winner's user object
-                winner = self.bot.get_user(winner_id)
+            # Delivering to many winners can take longer than an interaction response allows
+            await interaction.response.defer()
+
+            report = await self.bot.services.get('dm').deliver(winner_ids, content=message)
+
+            await interaction.followup.send(f"Message sent to the winners of giveaway {giveaway_id}: "
+                                            f"{report.summary()}")
+
+    @app_commands.command(name="ga_reroll",
+                          description="Draw replacement winners for an ended giveaway")
+    @app_commands.describe(giveaway_id="Enter the giveaway ID to reroll",
+                           count="Enter the number of replacement winners to draw")
+    async def ga_reroll(self, interaction: discord.Interaction, giveaway_id: str, count: int = 1):
+        if not await self.illegal_act_cog.check_channel_validity(interaction):
+            return
+
+        # Fetch the giveaway details from the database
+        giveaway_details = await self.fetch_giveaway(giveaway_id)
+
+        if giveaway_details is None:
+            # The giveaway does not exist
+            await interaction.response.send_message(f"Giveaway {giveaway_id} does not exist.", ephemeral=True)
+            return
+        elif not giveaway_details['is_end'] or giveaway_details['winner_ids'] is None:
+            # Only giveaways that have been drawn can be rerolled
+            await interaction.response.send_message(f"Giveaway {giveaway_id} has not been drawn yet.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
 
-                # Send the message to the winner
-                await winner.send(content=message)
+        # Previous winners are excluded, only the new slots are read from the database
+        previous_winners = await self.fetch_winner_ids(giveaway_id)
+        winners = await self.draw_winners(giveaway_id, count, exclude_ids=previous_winners)
 
-            await interaction.response.send_message(f"Message sent to all winners of giveaway {giveaway_id}.")
+        if not winners:
+            await interaction.followup.send(f"No participants of giveaway {giveaway_id} are left to draw.")
+            return
+
+        await self.update_giveaway(giveaway_id, [f"<@{winner_id}>" for winner_id in previous_winners + winners])
+
+        winner_mentions = ', '.join(f"<@{winner_id}>" for winner_id in winners)
+        giveaway_channel = self.bot.get_channel(self.config.giveaway_channel_id)
+        public_message = self.config.giveaway_reroll_public_message.format(winner_mentions=winner_mentions,
+                                                                    prizes=giveaway_details['prizes'])
+        await self.scheduler.run(lambda: giveaway_channel.send(public_message),
+                                 PRIORITY_MESSAGE, ('send', giveaway_channel.id))
+
+        await self.bot.services.get('dm').deliver(
+            winners, content=self.config.giveaway_win_private_message.format(prizes=giveaway_details['prizes']))
+
+        await interaction.followup.send(f"Drew {len(winners)} replacement winners for giveaway {giveaway_id}: "
+                                        f"{winner_mentions}")
+
+    async def edit_giveaway_message(self, message, **fields):
+        # Not coalesced with the participant count edits: those refetch the message when they run,
+        # so one that is still waiting keeps this embed and only refreshes the count
+        await self.scheduler.run(lambda: message.edit(**fields), PRIORITY_EDIT, ('edit', message.channel.id))
 
     async def update_giveaway_description(self, giveaway_id, new_description):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute('UPDATE giveaway SET description = ? WHERE giveaway_id = ?',
                                  (new_description, giveaway_id))
 
     async def update_giveaway_duration(self, giveaway_id, new_duration):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
                 'UPDATE giveaway SET duration = ? WHERE giveaway_id = ?',
@@ -1073,7 +1223,7 @@ class GiveawayCog(commands.Cog):
 
     async def cleanup_ended_giveaways(self):
         logging.info("Cleaning up ended giveaways...")
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute('''
                 DELETE FROM giveaway_views
@@ -1086,7 +1236,7 @@ class GiveawayCog(commands.Cog):
 
     async def save_giveaways(self, giveaway_id, view):
         # print("Saving giveaways...")
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
                 'REPLACE INTO giveaway_views (giveaway_id, giveaway_channel_id, message_id) VALUES (?, ?, ?)',
@@ -1094,49 +1244,88 @@ class GiveawayCog(commands.Cog):
             await db.commit()
             await cursor.close()
 
-    async def load_giveaways(self):
-        # print("Loading giveaways...")
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.cursor()
-            await cursor.execute('SELECT giveaway_id, giveaway_channel_id, message_id FROM giveaway_views')
+    def remember_giveaway_view(self, giveaway_id, view):
+        self.views.add(view, ('giveaway', int(giveaway_id)))
+
+    def forget_giveaway_view(self, giveaway_id):
+        self.views.evict(('giveaway', int(giveaway_id)))
+
+    async def get_giveaway_view(self, giveaway_id):
+        """
+        The view of a giveaway for a button click. Views of recent giveaways are kept by the view registry,
+        the others are built again from giveaway_views. Ended giveaways get a view that isn't kept, their clicks
+        are answered with the end message.
+        """
+        view = self.views.get(('giveaway', int(giveaway_id)))
+        if view is not None:
+            return view
+        async with self.db.connect() as db:
+            cursor = await db.execute(
+                'SELECT giveaway_channel_id, message_id FROM giveaway_views WHERE giveaway_id = ?', (giveaway_id,))
+            record = await cursor.fetchone()
+        if record is None:
+            return GiveawayParticipationView(self.bot, giveaway_id, self.config.giveaway_channel_id)
+        view = GiveawayParticipationView(self.bot, giveaway_id, record[0])
+        view.message_id = record[1]
+        self.remember_giveaway_view(giveaway_id, view)
+        return view
+
+    async def validate_giveaway_views(self):
+        # Checking that the messages still exist is not urgent, so it runs once after the first login
+        # with a few requests at a time instead of blocking the startup
+        await self.bot.wait_until_ready()
+        async with self.db.connect() as db:
+            cursor = await db.execute('SELECT giveaway_id, giveaway_channel_id, message_id FROM giveaway_views')
             records = await cursor.fetchall()
-            await cursor.close()
-            for giveaway_id, giveaway_channel_id, message_id in records:
-                view = GiveawayParticipationView(self.bot, giveaway_id, giveaway_channel_id)
-                view.message_id = message_id
-                self.giveaways[giveaway_id] = view
+        slots = asyncio.Semaphore(self.config.view_validation_concurrency)
 
-                # Fetch the giveaway message from Discord
-                channel = self.bot.get_channel(int(giveaway_channel_id))
-                if channel is None:
-                    logging.error(f"Error: Channel {giveaway_channel_id} not found")
-                    continue
+        async def validate(giveaway_id, giveaway_channel_id, message_id):
+            async with slots:
+                await self.validate_giveaway_view(giveaway_id, int(giveaway_channel_id), message_id)
 
-                message = await channel.fetch_message(message_id)
+        await asyncio.gather(*(validate(*record) for record in records))
+        logging.info(f"Validated {len(records)} persistent giveaway views")
+
+    async def validate_giveaway_view(self, giveaway_id, giveaway_channel_id, message_id):
+        channel = self.bot.get_channel(giveaway_channel_id)
+        if channel is None:
+            logging.error(f"Error: Channel {giveaway_channel_id} not found")
+            return
 
-                # Add the view to the message
-                await message.edit(view=view)
+        try:
+            await self.scheduler.run(lambda: channel.fetch_message(int(message_id)), PRIORITY_BACKGROUND,
+                                     ('fetch', channel.id))
+        except discord.NotFound:
+            # check_giveaways still ends the giveaway and posts the end embed, only the view is dropped here
+            logging.error(f"Error: Giveaway message {message_id} not found, removing its view")
+            self.forget_giveaway_view(giveaway_id)
+            async with self.db.connect() as db:
+                await db.execute('DELETE FROM giveaway_views WHERE giveaway_id = ?', (giveaway_id,))
+                await db.commit()
+        except discord.HTTPException as e:
+            logging.error(f"Error: Could not check giveaway message {message_id}: {e}")
 
     async def notify_winners(self, winners, prizes, giveaway_id):
-        giveaway_channel = self.bot.get_channel(self.giveaway_channel_id)
+        giveaway_channel = self.bot.get_channel(self.config.giveaway_channel_id)
 
         # Create a list of mentions for all winners
         winner_mentions = [f"<@{winner_id}>" if winner_id is not None and winner_id != 0 else None for
                            winner_id in winners]
 
         # Update the achievements for all participants
-        await self.update_participant_achievements(giveaway_id)
+        self.credit_participant_achievements(giveaway_id)
 
         if winners:
             # Send a message in the giveaway channel congratulating all winners
-            await giveaway_channel.send(
-                self.giveaway_win_public_message.format(winner_mentions=', '.join(winner_mentions),
-                                                        prizes=prizes))
+            public_message = self.config.giveaway_win_public_message.format(winner_mentions=', '.join(winner_mentions),
+                                                                            prizes=prizes)
+            await self.scheduler.run(lambda: giveaway_channel.send(public_message),
+                                     PRIORITY_MESSAGE, ('send', giveaway_channel.id))
 
             # Fetch the giveaway details from the database
             giveaway_details = await self.fetch_giveaway(giveaway_id)
             # Fetch the giveaway message
-            channel = self.bot.get_channel(self.giveaway_channel_id)
+            channel = self.bot.get_channel(self.config.giveaway_channel_id)
             message = await channel.fetch_message(giveaway_details['message_id'])
 
             # Get the final version of the embed from the message
@@ -1144,54 +1333,67 @@ class GiveawayCog(commands.Cog):
             embed.color = discord.Color.green()
 
             # Send a private message to each winner
-            for winner_id in winners:
-                winner = await self.bot.fetch_user(winner_id)
-                # print(winner_id, winner)
-                if winner is None:
-                    continue
-
-                try:
-                    await winner.send(self.giveaway_win_private_message.format(prizes=prizes), embed=embed)
-                except discord.Forbidden:
-                    print(
-                        f"Could not send a private message to {winner.name}. They might have private messages disabled.")
+            report = await self.bot.services.get('dm').deliver(
+                [winner_id for winner_id in winners if winner_id],
+                content=self.config.giveaway_win_private_message.format(prizes=prizes), embed=embed)
+            if report.forbidden:
+                logging.info(f"Could not send a private message to winners {report.forbidden} of giveaway "
+                             f"{giveaway_id}. They might have private messages disabled.")
         else:
             # No winners, send a message in the giveaway channel
-            await giveaway_channel.send(self.giveaway_fail_message.format(prizes=prizes))
+            fail_message = self.config.giveaway_fail_message.format(prizes=prizes)
+            await self.scheduler.run(lambda: giveaway_channel.send(fail_message),
+                                     PRIORITY_MESSAGE, ('send', giveaway_channel.id))
 
-    async def update_participant_achievements(self, giveaway_id):
-        # Fetch all participant IDs for the giveaway
-        participant_ids = await self.fetch_participant_ids(giveaway_id)
+    def credit_participant_achievements(self, giveaway_id):
+        # Winners should not wait for the crediting, so it runs in the background
+        task = asyncio.create_task(self.update_participant_achievements(giveaway_id))
+        self.background_tasks.add(task)
+        task.add_done_callback(self.on_credit_done)
 
-        # Connect to the database
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.cursor()
+    def on_credit_done(self, task):
+        self.background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Failed to update giveaway achievements: {task.exception()}")
 
-            # For each participant ID
-            for participant_id in participant_ids:
-                # Fetch the current giveaway_count for the user from the achievement table
-                await cursor.execute('SELECT giveaway_count FROM achievements WHERE user_id = ?', (participant_id,))
-                record = await cursor.fetchone()
-
-                if record is None:
-                    # If the user doesn't have an entry in the achievement table, create a new entry with a giveaway_count of 1
-                    await cursor.execute('INSERT INTO achievements (user_id, giveaway_count) VALUES (?, ?)',
-                                         (participant_id, 1))
-                else:
-                    # If the user has an entry in the achievement table, increase the giveaway_count by 1
-                    current_giveaway_count = record[0]
-                    new_giveaway_count = current_giveaway_count + 1
-                    await cursor.execute('UPDATE achievements SET giveaway_count = ? WHERE user_id = ?',
-                                         (new_giveaway_count, participant_id))
-
-            # Commit the changes and close the cursor
+    async def update_participant_achievements(self, giveaway_id):
+        # Increase the giveaway_count of every participant in one statement, creating missing users with 1
+        async with self.db.connect() as db:
+            cursor = await db.execute('''
+                INSERT INTO achievements (user_id, giveaway_count)
+                SELECT user_id, 1 FROM giveaway_participants WHERE giveaway_id = ?
+                ON CONFLICT(user_id) DO UPDATE SET giveaway_count = COALESCE(giveaway_count, 0) + 1
+            ''', (giveaway_id,))
             await db.commit()
-            await cursor.close()
 
-    @commands.Cog.listener()
-    async def on_ready(self):
+        logging.info(f"Updated the giveaway_count of {cursor.rowcount} participants of giveaway {giveaway_id}")
+
+    async def add_draw_columns(self, db):
+        cursor = await db.execute("PRAGMA table_info(giveaway)")
+        columns = [column[1] for column in await cursor.fetchall()]
+        if 'draw_seed' not in columns:
+            await db.execute("ALTER TABLE giveaway ADD COLUMN draw_seed TEXT")
+        if 'seed_commitment' not in columns:
+            await db.execute("ALTER TABLE giveaway ADD COLUMN seed_commitment TEXT")
+        if 'draw_counter' not in columns:
+            await db.execute("ALTER TABLE giveaway ADD COLUMN draw_counter INTEGER DEFAULT 0")
+
+    async def migrate_participant_ids(self, db):
+        # Move the comma separated participant_ids of older giveaways into giveaway_participants
+        cursor = await db.execute("SELECT giveaway_id, participant_ids FROM giveaway WHERE participant_ids IS NOT NULL")
+        records = await cursor.fetchall()
+        for giveaway_id, participant_ids in records:
+            user_ids = list(dict.fromkeys(int(user_id) for user_id in str(participant_ids).split(',') if user_id))
+            await db.executemany(
+                'INSERT OR IGNORE INTO giveaway_participants (giveaway_id, slot, user_id) VALUES (?, ?, ?)',
+                [(giveaway_id, slot, user_id) for slot, user_id in enumerate(user_ids)])
+            await db.execute('UPDATE giveaway SET participant_ids = NULL WHERE giveaway_id = ?', (giveaway_id,))
+        if records:
+            logging.info(f"Moved the participants of {len(records)} giveaways into giveaway_participants")
+
+    async def cog_load(self):
         # Ensure the table exists
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS giveaway (
                     giveaway_id INTEGER NOT NULL,
@@ -1207,7 +1409,10 @@ class GiveawayCog(commands.Cog):
                     timespent_req INTEGER DEFAULT 0,
                     participant_ids TEXT,
                     winner_ids TEXT,
-                    is_end BOOLEAN DEFAULT 0
+                    is_end BOOLEAN DEFAULT 0,
+                    draw_seed TEXT,
+                    seed_commitment TEXT,
+                    draw_counter INTEGER DEFAULT 0
                 )
             ''')
 
@@ -1218,6 +1423,27 @@ class GiveawayCog(commands.Cog):
                     message_id TEXT
                 )
             ''')
+
+            # One row per participant, slot is the index used by the draw
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS giveaway_participants (
+                    giveaway_id INTEGER NOT NULL,
+                    slot INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    PRIMARY KEY (giveaway_id, slot),
+                    UNIQUE (giveaway_id, user_id)
+                )
+            ''')
+            await self.add_draw_columns(db)
+            await self.migrate_participant_ids(db)
             await db.commit()
 
-            await self.load_giveaways()
+        # Clicks on the buttons of every giveaway message, old or new, arrive through GiveawayButton
+        self.bot.add_dynamic_items(GiveawayButton)
+        self.validation_task = asyncio.create_task(self.validate_giveaway_views())
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(GiveawayButton)
+        self.check_giveaways.cancel()
+        if self.validation_task is not None:
+            self.validation_task.cancel()
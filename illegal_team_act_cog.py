@@ -3,12 +3,38 @@
 # Date: 2024-06-26
 # ========================================
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from discord.ui import Button, View
+import asyncio
+import collections
+import logging
 import sqlite3
 from datetime import datetime, timedelta
-import aiosqlite
+
+from archive import archive_cutoff, archive_rows
+
+# Formats of the timestamps illegal_teaming stored as text before they became epoch milliseconds
+LEGACY_FORMATS = ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S')
+# Rows moved from illegal_teaming_legacy per transaction
+MIGRATION_BATCH = 1000
+# Records this recent are taken back when the user sends a valid teaming message from a voice channel
+RECENT_WINDOW = timedelta(minutes=5)
+# Records of both the hot table and the archive, illegal_teaming_counts counts them all
+ALL_RECORDS = 'SELECT user_id, ts FROM illegal_teaming UNION ALL SELECT user_id, ts FROM illegal_teaming_archive'
+
+
+def epoch_ms(moment):
+    return int(moment.timestamp() * 1000)
+
+
+def legacy_epoch_ms(text):
+    for fmt in LEGACY_FORMATS:
+        try:
+            return epoch_ms(datetime.strptime(text, fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"time data {text} does not match any format")
 
 
 class PaginationView(View):
@@ -23,9 +49,9 @@ class PaginationView(View):
         self.total_records = len(records)
         self.message = None  # This will hold the reference to the message
         self.format_type = format_type  # 'user_records' or 'illegal_teaming'
+        self.bot.services.get('views').add(self)
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+        self.config = self.bot.services.get('config')
 
         self.previous_button = Button(label="Previous", style=discord.ButtonStyle.blurple, disabled=True)
         self.next_button = Button(label="Next",
@@ -62,6 +88,8 @@ class PaginationView(View):
             await interaction.response.edit_message(embed=self.format_page(), view=self)
 
     def safe_strptime(self, date_str, formats):
+        if isinstance(date_str, int):
+            return datetime.fromtimestamp(date_str / 1000)  # Epoch milliseconds
         if not isinstance(date_str, str):
             date_str = str(date_str)  # Convert to string if not already
 
@@ -80,7 +108,7 @@ class PaginationView(View):
 
         embed = discord.Embed(color=discord.Color.blue())
 
-        formats = ['%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S']  # With and without milliseconds
+        formats = LEGACY_FORMATS  # Records are in epoch milliseconds, these are for older text timestamps
 
         records_str = ""
         for record in page_entries:
@@ -151,10 +179,10 @@ class ConfirmationView(View):
         return interaction.user.id == self.user_id
 
     async def confirm(self, interaction: discord.Interaction):
-        cog = self.bot.get_cog('IllegalTeamActCog')
+        cog = self.bot.services.get('permissions')
         content_with_member = f"{self.content} - Logged by {interaction.user.name}"
-        formatted_time = datetime.strptime(self.time, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S.%f')
-        await cog.add_illegal_record_to_db(self.member.id, content_with_member, formatted_time)
+        timestamp = epoch_ms(datetime.strptime(self.time, '%Y-%m-%d %H:%M:%S'))
+        await cog.add_illegal_record_to_db(self.member.id, content_with_member, timestamp)
         self.remove_item(self.confirm_button)
         self.remove_item(self.cancel_button)
         await interaction.message.edit(content="Illegal teaming record added.", view=self)
@@ -169,42 +197,138 @@ class IllegalTeamActCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
-        self.check_illegal_teaming_channel_id = config['check_illegal_teaming_channel_id']
+        self.config = self.bot.services.get('config')
+        self.db = self.bot.services.get('db')
+        # The channel checks are shared with every other Cog as the 'permissions' service
+        self.bot.services.register('permissions', self)
+        self.count_check_task = None
+        # True while rows of the old text schema are still being moved out of illegal_teaming_legacy
+        self.migrating = False
+        # user_id -> deque of (row id, ts) of the records within RECENT_WINDOW, so a valid teaming message only
+        # touches the database when there is something to take back. Used once loaded from the database.
+        self.recent = {}
+        self.recent_loaded = False
+        self.prune_recent.start()
+
+    async def cog_unload(self):
+        self.bot.services.unregister('permissions')
+        self.prune_recent.cancel()
+        self.archive_records.cancel()
+        if self.count_check_task is not None:
+            self.count_check_task.cancel()
+
+    def remember_recent(self, user_id, row_id, ts):
+        if ts > epoch_ms(datetime.now() - RECENT_WINDOW):
+            self.recent.setdefault(user_id, collections.deque()).append((row_id, ts))
+
+    def take_recent(self, user_id, threshold):
+        """Forget the recent records of a user and return the (row id, ts) of those newer than `threshold`."""
+        return [(row_id, ts) for row_id, ts in self.recent.pop(user_id, ()) if ts > threshold]
+
+    def restore_recent(self, user_id, taken):
+        """Put records taken with take_recent back, next to any logged since."""
+        recent = sorted([*taken, *self.recent.get(user_id, ())], key=lambda entry: entry[1])
+        self.recent[user_id] = collections.deque(recent)
+
+    @tasks.loop(minutes=5)
+    async def prune_recent(self):
+        # Users who don't send a valid teaming message again would keep their records here forever
+        threshold = epoch_ms(datetime.now() - RECENT_WINDOW)
+        for user_id in list(self.recent):
+            recent = collections.deque(entry for entry in self.recent[user_id] if entry[1] > threshold)
+            if recent:
+                self.recent[user_id] = recent
+            else:
+                del self.recent[user_id]
+
+    async def load_recent(self):
+        threshold = epoch_ms(datetime.now() - RECENT_WINDOW)
+        async with self.db.connect() as db:
+            cursor = await db.execute('SELECT id, user_id, ts FROM illegal_teaming WHERE ts > ? ORDER BY ts',
+                                      (threshold,))
+            records = await cursor.fetchall()
+        # Records logged while loading are remembered already
+        known = {row_id for recent in self.recent.values() for row_id, _ in recent}
+        for row_id, user_id, ts in records:
+            if row_id not in known:
+                self.remember_recent(user_id, row_id, ts)
+        self.recent_loaded = True
+
+    async def count_record(self, db, user_id, timestamp):
+        # illegal_teaming_counts is written in the same transaction as illegal_teaming
+        await db.execute('''
+            INSERT INTO illegal_teaming_counts (user_id, count, last_ts) VALUES (?, 1, ?)
+            ON CONFLICT(user_id) DO UPDATE SET count = count + 1, last_ts = MAX(last_ts, excluded.last_ts)
+        ''', (user_id, timestamp))
+
+    async def uncount_records(self, db, user_id, removed):
+        await db.execute('''
+            UPDATE illegal_teaming_counts
+            SET count = count - ?, last_ts = (SELECT MAX(ts) FROM (
+                SELECT MAX(ts) AS ts FROM illegal_teaming WHERE user_id = ?
+                UNION ALL
+                SELECT MAX(ts) FROM illegal_teaming_archive WHERE user_id = ?
+            ))
+            WHERE user_id = ?
+        ''', (removed, user_id, user_id, user_id))
+        await db.execute('DELETE FROM illegal_teaming_counts WHERE user_id = ? AND count <= 0', (user_id,))
 
     async def log_illegal_activity(self, user_id, message):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
-            now = datetime.now()
-            formatted_now = now.strftime('%Y-%m-%d %H:%M:%S.%f')  # Using microseconds
+            now = epoch_ms(datetime.now())
             try:
-                await cursor.execute('INSERT INTO illegal_teaming (user_id, timestamp, message) VALUES (?, ?, ?)',
-                                     (user_id, formatted_now, message))
+                await cursor.execute('INSERT INTO illegal_teaming (user_id, ts, message) VALUES (?, ?, ?)',
+                                     (user_id, now, message))
+                await self.count_record(db, user_id, now)
                 await db.commit()
+                self.remember_recent(user_id, cursor.lastrowid, now)
             except sqlite3.IntegrityError:
                 print("Duplicate entry. Skipping.")
             await cursor.close()
 
     async def remove_illegal_activity(self, user_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        threshold = datetime.now() - RECENT_WINDOW
+        taken = None
+        if self.recent_loaded:
+            taken = self.take_recent(user_id, epoch_ms(threshold))
+            if not taken:
+                # The usual case, nothing recent to take back
+                return
+        async with self.db.connect() as db:
             cursor = await db.cursor()
-            threshold = datetime.now() - timedelta(minutes=5)
-            formatted_threshold = threshold.strftime('%Y-%m-%d %H:%M:%S')
             try:
-                await cursor.execute('DELETE FROM illegal_teaming WHERE user_id = ? AND timestamp > ?',
-                                     (user_id, formatted_threshold))
+                if taken is not None:
+                    row_ids = [row_id for row_id, _ in taken]
+                    await cursor.execute(
+                        f"DELETE FROM illegal_teaming WHERE id IN ({', '.join('?' * len(row_ids))})", row_ids)
+                else:
+                    # Until the recent records are loaded, e.g. during the migration, they are searched by time
+                    await cursor.execute('DELETE FROM illegal_teaming WHERE user_id = ? AND ts > ?',
+                                         (user_id, epoch_ms(threshold)))
+                removed = cursor.rowcount
+                if self.migrating:
+                    await cursor.execute('DELETE FROM illegal_teaming_legacy WHERE user_id = ? AND timestamp > ?',
+                                         (str(user_id), threshold.strftime('%Y-%m-%d %H:%M:%S')))
+                    removed += cursor.rowcount
+                if removed > 0:
+                    await self.uncount_records(db, user_id, removed)
                 await db.commit()
+                if taken is None:
+                    # Records logged before the load are remembered already, their ids must not be deleted again
+                    self.recent.pop(user_id, None)
             except sqlite3.Error as e:
                 print(f"An error occurred: {e}")
+                if taken is not None:
+                    # Nothing was deleted, the records can be taken back the next time
+                    self.restore_recent(user_id, taken)
             await cursor.close()
 
     async def get_illegal_teaming_stats(self):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute('''
-                SELECT user_id, COUNT(*) as count FROM illegal_teaming
-                GROUP BY user_id
+                SELECT user_id, count FROM illegal_teaming_counts
                 ORDER BY count DESC
                 LIMIT 20
             ''')
@@ -213,24 +337,70 @@ class IllegalTeamActCog(commands.Cog):
             return results
 
     async def get_users_with_min_records(self, min_records):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute('''
-                SELECT user_id, COUNT(*) as count FROM illegal_teaming
-                GROUP BY user_id
-                HAVING COUNT(*) > ?
+                SELECT user_id, count FROM illegal_teaming_counts
+                WHERE count > ?
                 ORDER BY count DESC
             ''', (min_records,))
             results = await cursor.fetchall()
             await cursor.close()
             return results
 
+    async def backfill_counts(self, db):
+        # Databases from before illegal_teaming_counts existed get it filled once, in the same transaction that
+        # created it. An empty illegal_teaming_counts is only right when illegal_teaming is empty too.
+        cursor = await db.execute('SELECT 1 FROM illegal_teaming_counts LIMIT 1')
+        if await cursor.fetchone() is not None:
+            return
+        cursor = await db.execute(f'''
+            INSERT INTO illegal_teaming_counts (user_id, count, last_ts)
+            SELECT user_id, COUNT(*), MAX(ts) FROM ({ALL_RECORDS}) GROUP BY user_id
+        ''')
+        if cursor.rowcount > 0:
+            logging.info(f"Backfilled illegal_teaming_counts for {cursor.rowcount} users")
+
+    async def check_counts(self, repair=True):
+        """
+        Compare illegal_teaming_counts with the records it counts and return the user_ids that differ. With
+        `repair` their counts are rebuilt from illegal_teaming and its archive. Reads both tables whole, so it only
+        runs at startup, after the migration of the old rows.
+        """
+        async with self.db.connect() as db:
+            cursor = await db.execute(f'''
+                SELECT actual.user_id FROM (
+                    SELECT user_id, COUNT(*) AS count, MAX(ts) AS last_ts FROM ({ALL_RECORDS})
+                    GROUP BY user_id
+                ) AS actual
+                LEFT JOIN illegal_teaming_counts AS counts ON counts.user_id = actual.user_id
+                WHERE actual.count IS NOT counts.count OR actual.last_ts IS NOT counts.last_ts
+                UNION
+                SELECT user_id FROM illegal_teaming_counts AS counts
+                WHERE NOT EXISTS (SELECT 1 FROM illegal_teaming WHERE user_id = counts.user_id)
+                AND NOT EXISTS (SELECT 1 FROM illegal_teaming_archive WHERE user_id = counts.user_id)
+            ''')
+            user_ids = [user_id for (user_id,) in await cursor.fetchall()]
+            if user_ids and repair:
+                for user_id in user_ids:
+                    await db.execute('DELETE FROM illegal_teaming_counts WHERE user_id = ?', (user_id,))
+                    await db.execute(f'''
+                        INSERT INTO illegal_teaming_counts (user_id, count, last_ts)
+                        SELECT user_id, COUNT(*), MAX(ts) FROM ({ALL_RECORDS}) WHERE user_id = ?
+                        GROUP BY user_id
+                    ''', (user_id,))
+                await db.commit()
+        if user_ids:
+            logging.warning(f"illegal_teaming_counts differed from illegal_teaming for {len(user_ids)} users"
+                            f"{', repaired' if repair else ''}: {user_ids[:20]}")
+        return user_ids
+
     async def check_channel_validity(self, ctx_or_interaction, allowed_channel_id=None):
         """Helper function to check if the command is used in the correct channel."""
         channel_id = ctx_or_interaction.channel.id if isinstance(ctx_or_interaction,
                                                                  commands.Context) else ctx_or_interaction.channel_id
         if allowed_channel_id is None:
-            allowed_channel_id = self.check_illegal_teaming_channel_id
+            allowed_channel_id = self.config.check_illegal_teaming_channel_id
         else:
             allowed_channel_id = int(allowed_channel_id)
         if channel_id != allowed_channel_id:
@@ -319,8 +489,10 @@ class IllegalTeamActCog(commands.Cog):
             await ctx.send("An unexpected error occurred. Please try again.")
 
     @app_commands.command(name="check_member")
-    @app_commands.describe(member="The member to fetch illegal team records for")
-    async def check_member(self, interaction: discord.Interaction, member: discord.Member):
+    @app_commands.describe(member="The member to fetch illegal team records for",
+                           include_archive="Also list the archived records of previous months")
+    async def check_member(self, interaction: discord.Interaction, member: discord.Member,
+                           include_archive: bool = False):
         """Lists all illegal teaming records for the specified member."""
         await interaction.response.defer()
         try:
@@ -329,7 +501,7 @@ class IllegalTeamActCog(commands.Cog):
             if member is None:
                 await interaction.followup.send("You must mention a user.", ephemeral=True)
                 return
-            records = await self.fetch_records_for_user(member.id)
+            records = await self.fetch_records_for_user(member.id, include_archive)
             if not records:
                 await interaction.followup.send("No records found for this user.", ephemeral=True)
                 return
@@ -341,24 +513,45 @@ class IllegalTeamActCog(commands.Cog):
         except Exception as e:
             await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
-    async def fetch_records_for_user(self, user_id):
-        async with aiosqlite.connect(self.db_path) as db:
+    async def fetch_records_for_user(self, user_id, include_archive=False):
+        async with self.db.connect() as db:
             cursor = await db.cursor()
-            await cursor.execute('SELECT user_id, timestamp, message FROM illegal_teaming WHERE user_id = ?',
-                                 (user_id,))
+            if include_archive:
+                await cursor.execute('''
+                    SELECT user_id, ts, message FROM illegal_teaming_archive WHERE user_id = ?
+                    UNION ALL
+                    SELECT user_id, ts, message FROM illegal_teaming WHERE user_id = ?
+                    ORDER BY ts
+                ''', (user_id, user_id))
+            else:
+                await cursor.execute(
+                    'SELECT user_id, ts, message FROM illegal_teaming WHERE user_id = ? ORDER BY ts', (user_id,))
             records = await cursor.fetchall()
+            if self.migrating:
+                await cursor.execute('SELECT user_id, timestamp, message FROM illegal_teaming_legacy WHERE user_id = ?',
+                                     (str(user_id),))
+                records = sorted(records + await cursor.fetchall(), key=lambda record: self.record_time(record[1]))
             await cursor.close()
             return records
 
+    @staticmethod
+    def record_time(timestamp):
+        try:
+            return timestamp if isinstance(timestamp, int) else legacy_epoch_ms(timestamp)
+        except ValueError:
+            return 0
+
     @app_commands.command(name="check_member_by_id")
-    @app_commands.describe(user_id="The user ID to fetch illegal team records for")
-    async def check_member_by_id(self, interaction: discord.Interaction, user_id: str):
+    @app_commands.describe(user_id="The user ID to fetch illegal team records for",
+                           include_archive="Also list the archived records of previous months")
+    async def check_member_by_id(self, interaction: discord.Interaction, user_id: str,
+                                 include_archive: bool = False):
         """Lists all illegal teaming records for the specified user ID."""
         await interaction.response.defer()
         try:
             if not await self.check_channel_validity(interaction):
                 return
-            records = await self.fetch_records_for_user(user_id)
+            records = await self.fetch_records_for_user(int(user_id), include_archive)
             if not records:
                 await interaction.followup.send("No records found for this user.", ephemeral=True)
                 return
@@ -395,22 +588,129 @@ class IllegalTeamActCog(commands.Cog):
         await interaction.edit_original_response(embed=embed, view=view)
 
     async def add_illegal_record_to_db(self, user_id, content, time):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
-            await cursor.execute('INSERT INTO illegal_teaming (user_id, timestamp, message) VALUES (?, ?, ?)',
+            await cursor.execute('INSERT INTO illegal_teaming (user_id, ts, message) VALUES (?, ?, ?)',
                                  (user_id, time, content))
+            await self.count_record(db, user_id, time)
             await db.commit()
+            self.remember_recent(user_id, cursor.lastrowid, time)
             await cursor.close()
 
+    async def rename_legacy_table(self, db):
+        """
+        Move illegal_teaming with text user_ids and timestamps aside as illegal_teaming_legacy, so the new table
+        can take its name. Returns the counts of the old records, with the old illegal_teaming_counts dropped.
+        """
+        cursor = await db.execute('PRAGMA table_info(illegal_teaming)')
+        columns = [column[1] for column in await cursor.fetchall()]
+        if 'timestamp' not in columns:
+            return None
+        await db.execute('ALTER TABLE illegal_teaming RENAME TO illegal_teaming_legacy')
+        await db.execute('DROP TABLE IF EXISTS illegal_teaming_counts')
+        cursor = await db.execute(
+            'SELECT user_id, COUNT(*), MAX(timestamp) FROM illegal_teaming_legacy GROUP BY user_id')
+        counts = [(int(user_id), count, self.record_time(last_ts))
+                  for user_id, count, last_ts in await cursor.fetchall()]
+        logging.info(f"Renamed illegal_teaming to illegal_teaming_legacy, {sum(c for _, c, _ in counts)} records "
+                     f"of {len(counts)} users will be moved back in batches")
+        return counts
+
+    async def migrate_legacy_records(self):
+        # Each batch is read, converted and moved under one write lock, so a concurrent
+        # remove_illegal_activity can't delete a row that is being moved
+        moved = 0
+        while True:
+            async with self.db.connect() as db:
+                await db.execute('BEGIN IMMEDIATE')
+                cursor = await db.execute(
+                    'SELECT rowid, user_id, timestamp, message FROM illegal_teaming_legacy ORDER BY rowid LIMIT ?',
+                    (MIGRATION_BATCH,))
+                records = await cursor.fetchall()
+                if not records:
+                    await db.execute('DROP TABLE illegal_teaming_legacy')
+                    await db.commit()
+                    break
+                rows = []
+                for _, user_id, timestamp, message in records:
+                    ts = self.record_time(timestamp)
+                    if not ts:
+                        logging.warning(f"Illegal teaming record of {user_id} has an unreadable time {timestamp}")
+                    rows.append((int(user_id), ts, message))
+                await db.executemany('INSERT INTO illegal_teaming (user_id, ts, message) VALUES (?, ?, ?)', rows)
+                await db.execute('DELETE FROM illegal_teaming_legacy WHERE rowid <= ?', (records[-1][0],))
+                await db.commit()
+            moved += len(records)
+            # Let the other Cogs use the database between batches
+            await asyncio.sleep(0.1)
+        self.migrating = False
+        logging.info(f"Moved {moved} illegal teaming records out of illegal_teaming_legacy")
+
+    async def maintain_records(self):
+        if self.migrating:
+            await self.migrate_legacy_records()
+        await self.load_recent()
+        await self.check_counts()
+        self.archive_records.start()
+
+    @tasks.loop(hours=24)
+    async def archive_records(self):
+        # Records of earlier months move to illegal_teaming_archive, their counts stay in illegal_teaming_counts
+        if self.config.archive_after_months <= 0:
+            return
+        cutoff = archive_cutoff(self.config.archive_after_months)
+        try:
+            await archive_rows(self.db, 'illegal_teaming', 'illegal_teaming_archive',
+                               ('id', 'user_id', 'ts', 'message'), 'ts', epoch_ms(cutoff),
+                               self.config.archive_batch_size)
+        except sqlite3.Error as e:
+            logging.error(f"Archiving illegal teaming records failed: {e}")
+
     @commands.Cog.listener()
     async def on_ready(self):
         # Ensure the table exists
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
+            legacy_counts = await self.rename_legacy_table(db)
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS illegal_teaming (
-                    user_id TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    message TEXT NOT NULL
+                )
+            ''')
+            await db.execute('CREATE INDEX IF NOT EXISTS illegal_teaming_user_ts ON illegal_teaming (user_id, ts)')
+            # Records of earlier months, only read by the history commands with include_archive
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS illegal_teaming_archive (
+                    id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
                     message TEXT NOT NULL
                 )
             ''')
+            await db.execute('CREATE INDEX IF NOT EXISTS illegal_teaming_archive_user_ts '
+                             'ON illegal_teaming_archive (user_id, ts)')
+            # Records per user, so the rankings don't have to group the whole illegal_teaming table
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS illegal_teaming_counts (
+                    user_id INTEGER PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    last_ts INTEGER
+                )
+            ''')
+            await db.execute('CREATE INDEX IF NOT EXISTS illegal_teaming_counts_count '
+                             'ON illegal_teaming_counts (count)')
+            if legacy_counts is not None:
+                await db.executemany('INSERT INTO illegal_teaming_counts (user_id, count, last_ts) VALUES (?, ?, ?)',
+                                     legacy_counts)
+            else:
+                await self.backfill_counts(db)
             await db.commit()
+
+            cursor = await db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'illegal_teaming_legacy'")
+            self.migrating = await cursor.fetchone() is not None
+
+        if self.count_check_task is None:
+            self.count_check_task = asyncio.create_task(self.maintain_records())
@@ -0,0 +1,123 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import asyncio
+import bisect
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+# Frames from these files are the bot's own code, the first of them from the top of a blocked stack is reported
+REPOSITORY = os.path.dirname(os.path.abspath(__file__))
+
+# Upper bounds in milliseconds of the rows of the rolling histogram in /bot_stats
+RECENT_BUCKETS = (1, 5, 25, 100, 250, 1000)
+
+# How much lag history /bot_stats looks at
+RECENT_WINDOW_SECONDS = 600
+
+
+class LoopMonitor:
+    """
+    Measures how late the event loop wakes up, and names the code that blocks it.
+
+    A heartbeat task sleeps for `interval` seconds and records how much later than asked it woke up.
+    A watchdog thread checks the heartbeat, if it stopped for longer than `threshold` the loop is stuck
+    in synchronous code, so the stack of the loop thread is logged while it is still blocked.
+    """
+
+    def __init__(self, lag_histogram, blocked_counter, interval=0.1, threshold=0.25):
+        self.lag_histogram = lag_histogram
+        self.blocked_counter = blocked_counter
+        self.interval = interval
+        self.threshold = threshold  # 0 keeps measuring the lag but never captures stacks
+        self.recent = collections.deque()  # (monotonic time, lag in seconds)
+        self.last_beat = time.monotonic()
+        self.reported_beat = None
+        self.loop_thread_id = None
+        self.task = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Call from the event loop that should be watched."""
+        self.loop_thread_id = threading.get_ident()
+        self.last_beat = time.monotonic()
+        self.stopped.clear()
+        self.task = asyncio.get_running_loop().create_task(self.heartbeat())
+        self.thread = threading.Thread(target=self.watch, name='loop-monitor', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.last_beat = now
+            self.lag_histogram.observe(lag)
+            self.recent.append((now, lag))
+            while self.recent and self.recent[0][0] < now - RECENT_WINDOW_SECONDS:
+                self.recent.popleft()
+
+    def watch(self):
+        while not self.stopped.wait(max(self.interval, self.threshold / 2)):
+            beat = self.last_beat
+            blocked = time.monotonic() - beat - self.interval
+            if self.threshold and blocked >= self.threshold and beat != self.reported_beat:
+                # Once per stall, the next heartbeat records how long it lasted in total
+                self.reported_beat = beat
+                self.report(blocked)
+
+    def report(self, blocked):
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        culprit = self.find_culprit(frame)
+        code = culprit.f_code
+        function = getattr(code, 'co_qualname', code.co_name)
+        location = f"{os.path.basename(code.co_filename)}:{culprit.f_lineno} {function}"
+        self.blocked_counter.inc(function)
+        logging.warning(f"Event loop blocked for more than {blocked * 1000:.0f} ms in {location}\n"
+                        f"{''.join(traceback.format_list(stack[-15:]))}")
+
+    @staticmethod
+    def find_culprit(frame):
+        # The innermost frame of the bot's own code, otherwise whatever library call is running
+        current = frame
+        while current is not None:
+            filename = os.path.abspath(current.f_code.co_filename)
+            if (filename.startswith(REPOSITORY + os.sep) and filename != os.path.abspath(__file__)
+                    and 'site-packages' not in filename):
+                return current
+            current = current.f_back
+        return frame
+
+    def recent_summary(self):
+        """Percentiles and a bucket count of the lag of the last RECENT_WINDOW_SECONDS, in milliseconds."""
+        lags = sorted(lag * 1000 for _, lag in self.recent)
+        if not lags:
+            return None
+        counts = [0] * (len(RECENT_BUCKETS) + 1)
+        for lag in lags:
+            counts[bisect.bisect_left(RECENT_BUCKETS, lag)] += 1
+        return {
+            'samples': len(lags),
+            'p50': lags[int(0.50 * (len(lags) - 1))],
+            'p95': lags[int(0.95 * (len(lags) - 1))],
+            'p99': lags[int(0.99 * (len(lags) - 1))],
+            'max': lags[-1],
+            'buckets': counts,
+        }
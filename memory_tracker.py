@@ -0,0 +1,117 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import asyncio
+import gc
+import os
+import tracemalloc
+
+import discord
+
+REPOSITORY = os.path.dirname(os.path.abspath(__file__))
+
+# Allocations of tracemalloc itself and of imports are not the bot's
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def short_path(filename):
+    """Paths of the bot's files relative to the repository, of libraries relative to site-packages."""
+    if filename.startswith(REPOSITORY + os.sep):
+        return os.path.relpath(filename, REPOSITORY)
+    if 'site-packages' + os.sep in filename:
+        return filename.split('site-packages' + os.sep, 1)[1]
+    return os.path.basename(filename)
+
+
+def resident_memory():
+    """Resident set size of the process in bytes, None where /proc is not available."""
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class MemoryTracker:
+    """
+    Compares tracemalloc snapshots of the running bot, to find what keeps growing.
+
+    Tracing starts with the first snapshot and costs memory and some speed while it runs, so it is only on
+    between the first snapshot and stop(). Every later snapshot is compared with the one before it.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.previous = None
+        self.previous_objects = None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.previous = None
+        self.previous_objects = None
+
+    async def snapshot(self, count):
+        """
+        Take a snapshot and return the `count` sites that allocated the most since the one before, as
+        (file:line, size difference, block difference), with the object counts of the bot's caches and views.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        objects = self.count_objects()
+
+        growth = []
+        if self.previous is not None:
+            # Comparing is pure Python over every trace, a thread keeps the event loop going meanwhile
+            statistics = await asyncio.to_thread(snapshot.compare_to, self.previous, 'lineno')
+            for statistic in statistics[:count]:
+                frame = statistic.traceback[0]
+                growth.append((f"{short_path(frame.filename)}:{frame.lineno}", statistic.size_diff,
+                               statistic.count_diff))
+        previous_objects = self.previous_objects
+        self.previous, self.previous_objects = snapshot, objects
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'first': previous_objects is None,
+            'growth': growth,
+            'objects': [(name, number, 0 if previous_objects is None else number - previous_objects.get(name, 0))
+                        for name, number in objects.items()],
+            'traced': current,
+            'peak': peak,
+            'rss': resident_memory(),
+        }
+
+    def count_objects(self):
+        """Views alive by class, the records cached in pagination views, and the discord.py caches."""
+        counts = {}
+        records = 0
+        for obj in gc.get_objects():
+            if isinstance(obj, discord.ui.View):
+                name = type(obj).__name__
+                counts[name] = counts.get(name, 0) + 1
+                records += len(getattr(obj, 'records', None) or ())
+        counts = dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+        counts['cached records in views'] = records
+        views = self.bot.services.get('views')
+        counts['views in registry'] = len(views)
+        counts['views evicted'] = views.evicted
+        counts['persistent views'] = len(self.bot.persistent_views)
+        counts['cached users'] = len(self.bot.users)
+        counts['cached members'] = sum(len(guild.members) for guild in self.bot.guilds)
+        counts['cached messages'] = len(self.bot.cached_messages)
+        return counts
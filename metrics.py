@@ -0,0 +1,199 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import bisect
+import contextlib
+import math
+import re
+import time
+
+import aiohttp
+
+# Upper bounds in seconds, from a cache hit to a slow REST call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Ids and tokens in REST paths, replaced so every route is one series and no token ends up in the metrics
+ROUTE_PATTERNS = (
+    (re.compile(r'^/api/v\d+'), ''),
+    (re.compile(r'/(webhooks|interactions)/\d+/[^/]+'), r'/\1/{id}/{token}'),
+    (re.compile(r'/reactions/[^/]+'), '/reactions/{emoji}'),
+    (re.compile(r'/\d+'), '/{id}'),
+)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names, values, extra=()):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}  # label values -> count
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+
+
+class HistogramSeries:
+    __slots__ = ('buckets', 'sum', 'count')
+
+    def __init__(self, size):
+        self.buckets = [0] * size  # Not cumulative, rendering adds them up
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(buckets) + (math.inf,)
+        self.series = {}  # label values -> HistogramSeries
+
+    def observe(self, seconds, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = HistogramSeries(len(self.bounds))
+        series.buckets[bisect.bisect_left(self.bounds, seconds)] += 1
+        series.sum += seconds
+        series.count += 1
+
+    @contextlib.contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def quantile(self, fraction, *labels):
+        """Estimate from the buckets, interpolated the same way as Prometheus' histogram_quantile."""
+        series = self.series.get(labels)
+        if series is None or series.count == 0:
+            return 0.0
+        rank = fraction * series.count
+        seen = 0
+        for index, count in enumerate(series.buckets):
+            if seen + count >= rank and count:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                if upper == math.inf:
+                    return lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-2]
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds, series.buckets):
+                cumulative += count
+                bucket_labels = format_labels(self.labelnames, labels, [('le', format_value(bound))])
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(series.sum)}"
+            yield f"{self.name}_count{format_labels(self.labelnames, labels)} {series.count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.add(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def rest_route(url):
+    path = url.path
+    for pattern, replacement in ROUTE_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+class BotMetrics(MetricsRegistry):
+    """
+    The metrics of the bot, shared as the 'metrics' service.
+    bot.py creates it before the bot so the REST calls can be traced from the first request on,
+    Metrics_Cog times the listeners, app commands, database statements and the event loop lag.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.events = self.histogram('discord_event_seconds', "Time spent in event listeners.",
+                                     ('event', 'listener'))
+        self.event_errors = self.counter('discord_event_errors_total', "Event listeners that raised.",
+                                         ('event', 'listener'))
+        self.commands = self.histogram('discord_app_command_seconds', "Time spent in app commands.", ('command',))
+        self.command_errors = self.counter('discord_app_command_errors_total', "App commands that raised.",
+                                           ('command', 'error'))
+        self.statements = self.histogram('db_statement_seconds', "Time spent in database statements.",
+                                         ('operation', 'table'))
+        self.statement_errors = self.counter('db_statement_errors_total', "Database statements that raised.",
+                                             ('operation', 'table'))
+        self.rest = self.histogram('discord_rest_seconds', "Time spent in Discord REST calls.", ('method', 'route'))
+        self.rest_responses = self.counter('discord_rest_responses_total', "Discord REST responses by status.",
+                                           ('method', 'route', 'status'))
+        self.loop_lag = self.histogram('event_loop_lag_seconds', "How much later than asked the event loop woke up.")
+        self.loop_blocked = self.counter('event_loop_blocked_total', "Times the event loop was blocked, by function.",
+                                         ('function',))
+
+    def rest_trace(self):
+        """aiohttp TraceConfig for discord.py's HTTP session, every attempt of a retried call counts."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.started = time.perf_counter()
+
+        async def on_request_end(session, context, params):
+            route = rest_route(params.url)
+            self.rest.observe(time.perf_counter() - context.started, params.method, route)
+            self.rest_responses.inc(params.method, route, str(params.response.status))
+
+        async def on_request_exception(session, context, params):
+            route = rest_route(params.url)
+            self.rest.observe(time.perf_counter() - context.started, params.method, route)
+            self.rest_responses.inc(params.method, route, type(params.exception).__name__)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
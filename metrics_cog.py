@@ -0,0 +1,349 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import discord
+from discord.ext import commands
+from discord import app_commands
+from discord.utils import format_dt
+from aiohttp import web
+import asyncio
+import functools
+import io
+import logging
+import re
+import time
+
+from loop_monitor import LoopMonitor, RECENT_BUCKETS, RECENT_WINDOW_SECONDS
+from memory_tracker import MemoryTracker
+from sampling_profiler import SamplingProfiler
+from sql_profiler import SqlProfiler
+
+# The first table a statement touches, good enough to tell the queries of the Cogs apart
+STATEMENT_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE(?:\s+IF\s+NOT\s+EXISTS)?|ON)\s+(\w+)', re.IGNORECASE)
+
+# Rows per section of /bot_stats, the slowest by total time first
+STATS_ROWS = 8
+
+
+@functools.lru_cache(maxsize=512)
+def statement_labels(statement):
+    words = statement.split(None, 1)
+    operation = words[0].upper() if words else 'UNKNOWN'
+    match = STATEMENT_TABLE.search(statement)
+    return operation, match.group(1) if match else ''
+
+
+class MetricsCommandTree(app_commands.CommandTree):
+    """
+    Command tree that notes when an app command starts and times the ones that fail.
+    Successful commands are timed by Metrics_Cog when discord.py reports their completion.
+    """
+
+    async def interaction_check(self, interaction: discord.Interaction, /) -> bool:
+        interaction.extras['metrics_started'] = time.perf_counter()
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError, /) -> None:
+        command = interaction.command
+        started = interaction.extras.get('metrics_started')
+        if command is not None and started is not None:
+            metrics = self.client.services.get('metrics')
+            metrics.commands.observe(time.perf_counter() - started, command.qualified_name)
+            original = getattr(error, 'original', error)
+            metrics.command_errors.inc(command.qualified_name, type(original).__name__)
+        await super().on_error(interaction, error)
+
+
+class MetricsCog(commands.Cog):
+    """
+    Times the listeners of the other Cogs and the database, add it after all of them in bot.py.
+    Also runs the event loop monitor, which logs the stack of any code that blocks the loop,
+    and the SQL profiler behind /db_profile, the sampling profiler behind /profile and the tracemalloc
+    snapshots of /memory_snapshot.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.metrics = self.bot.services.get('metrics')
+        self.db = self.bot.services.get('db')
+        self.illegal_act_cog = self.bot.services.get('permissions')
+
+        self.config = self.bot.services.get('config')
+        self.started_at = discord.utils.utcnow()
+        self.wrapped_listeners = []  # (event, original, wrapped)
+        self.runner = None
+        self.loop_monitor = LoopMonitor(self.metrics.loop_lag, self.metrics.loop_blocked,
+                                        self.config.loop_lag_interval_ms / 1000,
+                                        self.config.loop_lag_threshold_ms / 1000)
+        self.sql_profiler = SqlProfiler(self.db)
+        self.profiler = SamplingProfiler()
+        self.memory_tracker = MemoryTracker(bot)
+
+    async def cog_load(self):
+        self.wrap_listeners()
+        self.db.add_observer(self.observe_statement)
+        self.sql_profiler.start()
+        self.loop_monitor.start()
+        if self.config.metrics_port:
+            await self.start_endpoint()
+
+    async def cog_unload(self):
+        for event, original, wrapped in self.wrapped_listeners:
+            self.bot.remove_listener(wrapped, event)
+            self.bot.add_listener(original, event)
+        self.wrapped_listeners = []
+        self.db.remove_observer(self.observe_statement)
+        self.sql_profiler.stop()
+        self.profiler.stop()
+        self.memory_tracker.stop()
+        self.loop_monitor.stop()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def apply_config(self, old, new, changed, prepared=None):
+        # Both are read on every beat / check, the monitor picks them up on its own
+        self.loop_monitor.interval = new.loop_lag_interval_ms / 1000
+        self.loop_monitor.threshold = new.loop_lag_threshold_ms / 1000
+
+    def wrap_listeners(self):
+        # Listeners are swapped through the public add / remove_listener, discord.py dispatches to them as before
+        for cog in list(self.bot.cogs.values()):
+            if cog is self:
+                continue
+            for event, listener in cog.get_listeners():
+                wrapped = self.timed_listener(event, listener)
+                self.bot.remove_listener(listener, event)
+                self.bot.add_listener(wrapped, event)
+                self.wrapped_listeners.append((event, listener, wrapped))
+
+    def timed_listener(self, event, listener):
+        name = listener.__qualname__
+        events, errors = self.metrics.events, self.metrics.event_errors
+
+        @functools.wraps(listener)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                await listener(*args, **kwargs)
+            except Exception:
+                errors.inc(event, name)
+                raise
+            finally:
+                events.observe(time.perf_counter() - started, event, name)
+
+        return timed
+
+    def observe_statement(self, statement, seconds, error):
+        labels = statement_labels(statement)
+        self.metrics.statements.observe(seconds, *labels)
+        if error is not None:
+            self.metrics.statement_errors.inc(*labels)
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction, command):
+        started = interaction.extras.get('metrics_started')
+        if started is not None:
+            self.metrics.commands.observe(time.perf_counter() - started, command.qualified_name)
+
+    async def start_endpoint(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self.serve_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.config.metrics_host, self.config.metrics_port).start()
+        except OSError as e:
+            # The bot keeps running without the endpoint, /bot_stats still works
+            logging.error(f"Could not serve metrics on {self.config.metrics_host}:{self.config.metrics_port}: {e}")
+            await runner.cleanup()
+            return
+        self.runner = runner
+        logging.info(f"Serving metrics on http://{self.config.metrics_host}:{self.config.metrics_port}/metrics")
+
+    async def serve_metrics(self, request):
+        return web.Response(body=self.metrics.render().encode('utf-8'),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    @staticmethod
+    def format_table(histogram, errors, name):
+        """The slowest series of a histogram by total time, as a code block for an embed field."""
+        rows = sorted(histogram.series.items(), key=lambda item: item[1].sum, reverse=True)[:STATS_ROWS]
+        if not rows:
+            return "No data yet."
+        lines = [f"{'':<30} {'count':>6} {'avg':>7} {'p95':>7} {'err':>4}"]
+        for labels, series in rows:
+            average = series.sum / series.count * 1000
+            p95 = histogram.quantile(0.95, *labels) * 1000
+            lines.append(f"{name(labels)[-30:]:<30} {series.count:>6} {average:>7.1f} {p95:>7.1f} "
+                         f"{errors.get(labels, 0):>4}")
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    def format_loop_lag(self):
+        """The rolling lag histogram of the loop monitor, as a code block for an embed field."""
+        summary = self.loop_monitor.recent_summary()
+        if summary is None:
+            return "No data yet."
+        lines = [f"p50 {summary['p50']:.1f}  p95 {summary['p95']:.1f}  p99 {summary['p99']:.1f}  "
+                 f"max {summary['max']:.1f}"]
+        bounds = [f"< {bound} ms" for bound in RECENT_BUCKETS] + [f">= {RECENT_BUCKETS[-1]} ms"]
+        for bound, count in zip(bounds, summary['buckets']):
+            bar = '#' * (round(20 * count / summary['samples']) if count else 0)
+            lines.append(f"{bound:>10} {count:>6} {bar}")
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    @staticmethod
+    def error_counts(counter, width, failed=lambda labels: True):
+        counts = {}
+        for labels, value in counter.values.items():
+            if failed(labels):
+                counts[labels[:width]] = counts.get(labels[:width], 0) + value
+        return counts
+
+    @app_commands.command(name="bot_stats")
+    async def show_bot_stats(self, interaction: discord.Interaction):
+        """Shows the slowest event listeners, app commands, database statements and REST calls."""
+        if not await self.illegal_act_cog.check_channel_validity(interaction):
+            return
+
+        metrics = self.metrics
+        embed = discord.Embed(title="Bot Stats", color=discord.Color.blue(),
+                              description=f"Since {format_dt(self.started_at, style='R')}, "
+                                          f"times in ms, slowest by total time first.")
+        embed.add_field(name="Event listeners", inline=False,
+                        value=self.format_table(metrics.events, metrics.event_errors.values,
+                                                lambda labels: labels[1]))
+        embed.add_field(name="App commands", inline=False,
+                        value=self.format_table(metrics.commands, self.error_counts(metrics.command_errors, 1),
+                                                lambda labels: labels[0]))
+        embed.add_field(name="Database statements", inline=False,
+                        value=self.format_table(metrics.statements, metrics.statement_errors.values,
+                                                lambda labels: ' '.join(labels)))
+        rest_errors = self.error_counts(metrics.rest_responses, 2, lambda labels: not labels[2].startswith('2'))
+        embed.add_field(name="Discord REST calls", inline=False,
+                        value=self.format_table(metrics.rest, rest_errors, lambda labels: ' '.join(labels)))
+        embed.add_field(name=f"Event loop lag, last {RECENT_WINDOW_SECONDS // 60} minutes", inline=False,
+                        value=self.format_loop_lag())
+        await interaction.response.send_message(embed=embed)
+
+    @staticmethod
+    def code_block(lines):
+        """As many of the lines as fit into an embed field."""
+        kept, length = [], 0
+        for line in lines:
+            length += len(line) + 1
+            if length > 1000:
+                break
+            kept.append(line)
+        return "```\n" + "\n".join(kept) + "\n```"
+
+    def format_statements(self):
+        rows = self.sql_profiler.top(STATS_ROWS)
+        if not rows:
+            return "No data yet."
+        lines = []
+        for template, stats in rows:
+            caller = max(stats.callers, key=stats.callers.get)
+            lines.append(template[:60])
+            lines.append(f"  {stats.count}x, {stats.total * 1000:.0f} total, {stats.mean * 1000:.1f} mean, "
+                         f"{stats.rows / stats.count:.1f} rows{', SCAN' if stats.scans else ''}")
+            lines.append(f"  {caller[-58:]}")
+        return self.code_block(lines)
+
+    def format_scans(self):
+        scans = self.sql_profiler.full_scans()
+        if not scans:
+            return "None found."
+        lines = []
+        for template, stats in scans:
+            lines.append(template[:60])
+            lines.append(f"  {', '.join(stats.scans)[:44]}, {stats.count}x")
+        return self.code_block(lines)
+
+    @staticmethod
+    def format_storage(storage):
+        lines = [f"{'':<34} {'pages':>6} {'KiB':>8}"]
+        for name, kind, table, pages, size in storage['objects']:
+            label = name if kind == 'table' else f"  {name}"
+            pages = '' if pages is None else pages
+            size = '' if size is None else f"{size / 1024:.0f}"
+            lines.append(f"{label[:34]:<34} {pages:>6} {size:>8}")
+        return MetricsCog.code_block(lines)
+
+    @app_commands.command(name="db_profile")
+    async def show_db_profile(self, interaction: discord.Interaction):
+        """Shows the slowest SQL statements, the ones that scan whole tables, and the size of every table."""
+        if not await self.illegal_act_cog.check_channel_validity(interaction):
+            return
+
+        storage = await self.sql_profiler.storage()
+        size = storage['page_size'] * storage['page_count']
+        embed = discord.Embed(title="Database Profile", color=discord.Color.blue(),
+                              description=f"Since {format_dt(self.started_at, style='R')}, times in ms. "
+                                          f"{size / 1024 / 1024:.1f} MiB in {storage['page_count']} pages of "
+                                          f"{storage['page_size']} bytes, {storage['free_pages']} free.")
+        embed.add_field(name="Statements by total time", inline=False, value=self.format_statements())
+        embed.add_field(name="Full scans", inline=False, value=self.format_scans())
+        embed.add_field(name="Tables and indexes", inline=False, value=self.format_storage(storage))
+        await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name="profile")
+    @app_commands.describe(seconds="How long to sample the running bot, 1 to 300 seconds")
+    async def profile(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 1, 300] = 30):
+        """Samples where the bot spends its time and sends the stacks as a flame graph file."""
+        if not await self.illegal_act_cog.check_channel_validity(interaction):
+            return
+        if self.profiler.running:
+            await interaction.response.send_message("A profile is already being recorded.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        self.profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self.profiler.stop()
+
+        loop_samples = sum(count for stack, count in self.profiler.samples.items() if stack[0] == 'loop')
+        lines = [f"{count / max(loop_samples, 1):>6.1%} {name[-50:]}"
+                 for name, count in self.profiler.top_functions(STATS_ROWS)]
+        embed = discord.Embed(title="Profile", color=discord.Color.blue(),
+                              description=f"{self.profiler.sample_count} samples over {seconds} s. "
+                                          f"The file is in the collapsed stack format, open it in "
+                                          f"https://www.speedscope.app or with flamegraph.pl. Stacks under "
+                                          f"`loop` ran on the event loop, stacks under `task` were waiting.")
+        embed.add_field(name="Busiest functions on the event loop", inline=False,
+                        value=self.code_block(lines) if lines else "No samples.")
+        filename = f"profile-{discord.utils.utcnow():%Y%m%d-%H%M%S}.txt"
+        await interaction.followup.send(embed=embed, file=discord.File(
+            io.BytesIO(self.profiler.collapsed().encode('utf-8')), filename=filename))
+
+    @app_commands.command(name="memory_snapshot")
+    @app_commands.describe(stop="Stop tracing allocations and forget the snapshots")
+    async def memory_snapshot(self, interaction: discord.Interaction, stop: bool = False):
+        """Shows what allocated the most memory since the last snapshot, and the views and caches alive."""
+        if not await self.illegal_act_cog.check_channel_validity(interaction):
+            return
+        if stop:
+            self.memory_tracker.stop()
+            await interaction.response.send_message("Stopped tracing memory allocations.")
+            return
+
+        await interaction.response.defer()
+        report = await self.memory_tracker.snapshot(STATS_ROWS + 2)
+        rss = f"{report['rss'] / 1024 / 1024:.1f} MiB resident, " if report['rss'] is not None else ""
+        embed = discord.Embed(title="Memory Snapshot", color=discord.Color.blue(),
+                              description=f"{rss}{report['traced'] / 1024 / 1024:.1f} MiB traced "
+                                          f"(peak {report['peak'] / 1024 / 1024:.1f} MiB).")
+        if report['first']:
+            embed.add_field(name="Growth since the last snapshot", inline=False,
+                            value="Tracing started with this snapshot, take another one later to see what grew. "
+                                  "Tracing slows the bot down a little until `stop` is used.")
+        else:
+            lines = [f"{size / 1024:>+9.1f} KiB {blocks:>+7} {site[-40:]}" for site, size, blocks in report['growth']]
+            embed.add_field(name="Growth since the last snapshot", inline=False,
+                            value=self.code_block(lines) if lines else "Nothing grew.")
+        lines = [f"{name[-34:]:<34} {number:>7} {change:>+7}" for name, number, change in report['objects']]
+        embed.add_field(name="Objects alive", inline=False, value=self.code_block(lines))
+        await interaction.followup.send(embed=embed)
@@ -3,12 +3,16 @@
 # Date: 2024-06-26
 # ========================================
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from discord.ui import Button, View
-import aiosqlite
 from datetime import datetime
-from illegal_team_act_cog import IllegalTeamActCog
+import logging
+import sqlite3
+
+from archive import archive_cutoff, archive_rows
+
+EVENT_COLUMNS = ('add_time', 'operator', 'event_member', 'event_description', 'count')
 
 
 class ConfirmationView(View):
@@ -64,6 +68,7 @@ class EventPaginationView(View):
         self.total_records = len(records)
         self.message = None
         self.format_page_method = format_page_method
+        self.bot.services.get('views').add(self)
 
         self.previous_button = Button(label="Previous", style=discord.ButtonStyle.blurple, disabled=True)
         self.next_button = Button(label="Next", style=discord.ButtonStyle.green, disabled=len(records) <= self.item_each_page)
@@ -146,10 +151,13 @@ class EventPaginationView(View):
 class NotebookCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.illegal_act_cog = IllegalTeamActCog(bot)
+        self.illegal_act_cog = self.bot.services.get('permissions')
+
+        self.config = self.bot.services.get('config')
+        self.db = self.bot.services.get('db')
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+    async def cog_unload(self):
+        self.archive_events.cancel()
 
     @app_commands.command(name="log_event")
     @app_commands.describe(event_object="The member to log",
@@ -170,12 +178,18 @@ class NotebookCog(commands.Cog):
         await interaction.edit_original_response(embed=embed, view=view)
 
     async def add_event_to_db(self, user_id, event_object, event_description):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             add_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')  # Using microseconds
 
-            # Fetch the maximum count for the given event_member
-            await cursor.execute('SELECT MAX(count) FROM event_logs WHERE event_member = ?', (event_object,))
+            # Fetch the maximum count for the given event_member, archived events keep their numbers
+            await cursor.execute('''
+                SELECT MAX(count) FROM (
+                    SELECT MAX(count) AS count FROM event_logs WHERE event_member = ?
+                    UNION ALL
+                    SELECT MAX(count) FROM event_logs_archive WHERE event_member = ?
+                )
+            ''', (event_object, event_object))
             max_count = await cursor.fetchone()
             if max_count[0] is None:
                 # If there are no records for the event_member, set the count to 1
@@ -199,8 +213,10 @@ class NotebookCog(commands.Cog):
             await cursor.close()
 
     @app_commands.command(name="check_member_event")
-    @app_commands.describe(member="The member to fetch event logs for")
-    async def check_member_event(self, interaction: discord.Interaction, member: discord.Member):
+    @app_commands.describe(member="The member to fetch event logs for",
+                           include_archive="Also list the archived events of previous months")
+    async def check_member_event(self, interaction: discord.Interaction, member: discord.Member,
+                                 include_archive: bool = False):
         """Lists all event logs for the specified member."""
         await interaction.response.defer()
         try:
@@ -209,7 +225,7 @@ class NotebookCog(commands.Cog):
                 await interaction.followup.send("Only Admin can use this command.", ephemeral=True)
                 return
 
-            records = await self.fetch_events_for_user(member.id)
+            records = await self.fetch_events_for_user(member.id, include_archive)
             if not records:
                 await interaction.followup.send("No logs found for this user.", ephemeral=True)
                 return
@@ -223,19 +239,29 @@ class NotebookCog(commands.Cog):
             await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
     async def is_user_admin(self, user_id):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute('SELECT * FROM admins WHERE user_id = ?', (user_id,))
             admin = await cursor.fetchone()
             await cursor.close()
             return admin is not None
 
-    async def fetch_events_for_user(self, event_member):
-        async with aiosqlite.connect(self.db_path) as db:
+    async def fetch_events_for_user(self, event_member, include_archive=False):
+        async with self.db.connect() as db:
             cursor = await db.cursor()
-            await cursor.execute(
-                'SELECT add_time, operator, event_member, event_description, count FROM event_logs WHERE event_member = ?',
-                (event_member,))
+            if include_archive:
+                await cursor.execute('''
+                    SELECT add_time, operator, event_member, event_description, count FROM event_logs_archive
+                    WHERE event_member = ?
+                    UNION ALL
+                    SELECT add_time, operator, event_member, event_description, count FROM event_logs
+                    WHERE event_member = ?
+                    ORDER BY count
+                ''', (event_member, event_member))
+            else:
+                await cursor.execute(
+                    'SELECT add_time, operator, event_member, event_description, count FROM event_logs WHERE event_member = ?',
+                    (event_member,))
             records = await cursor.fetchall()
             await cursor.close()
             return records
@@ -264,10 +290,18 @@ class NotebookCog(commands.Cog):
             await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
     async def fetch_all_events(self):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
-            await cursor.execute(
-                'SELECT MAX(add_time), event_member, COUNT(event_member) FROM event_logs GROUP BY event_member')
+            # Archived events are counted in event_logs_archive_summary, so the totals stay the same
+            await cursor.execute('''
+                SELECT MAX(last_add_time), event_member, SUM(count) FROM (
+                    SELECT MAX(add_time) AS last_add_time, event_member, COUNT(event_member) AS count FROM event_logs
+                    GROUP BY event_member
+                    UNION ALL
+                    SELECT last_add_time, event_member, count FROM event_logs_archive_summary
+                )
+                GROUP BY event_member
+            ''')
             records = await cursor.fetchall()
             await cursor.close()
             return records
@@ -305,28 +339,71 @@ class NotebookCog(commands.Cog):
             await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
 
     async def fetch_event_details(self, event_member, event_serial_number):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
                 'SELECT add_time, operator, event_member, event_description FROM event_logs WHERE event_member = ? AND count = ?',
                 (event_member, event_serial_number))
             record = await cursor.fetchone()
+            if record is None:
+                await cursor.execute('''
+                    SELECT add_time, operator, event_member, event_description FROM event_logs_archive
+                    WHERE event_member = ? AND count = ?
+                ''', (event_member, event_serial_number))
+                record = await cursor.fetchone()
             await cursor.close()
             return record
 
     async def delete_event_from_db(self, event_member, event_serial_number):
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.cursor()
             await cursor.execute(
                 'DELETE FROM event_logs WHERE event_member = ? AND count = ?',
                 (event_member, event_serial_number))
+            if cursor.rowcount == 0:
+                await cursor.execute('DELETE FROM event_logs_archive WHERE event_member = ? AND count = ?',
+                                     (event_member, event_serial_number))
+                if cursor.rowcount > 0:
+                    await self.unsummarize_events(db, event_member, cursor.rowcount)
             await db.commit()
             await cursor.close()
 
+    async def summarize_events(self, db, condition, parameters):
+        # Called by archive_rows before the archived batch is deleted from event_logs
+        await db.execute(f'''
+            INSERT INTO event_logs_archive_summary (event_member, count, last_add_time)
+            SELECT event_member, COUNT(*), MAX(add_time) FROM event_logs WHERE {condition}
+            GROUP BY event_member
+            ON CONFLICT(event_member) DO UPDATE
+            SET count = count + excluded.count, last_add_time = MAX(last_add_time, excluded.last_add_time)
+        ''', parameters)
+
+    async def unsummarize_events(self, db, event_member, removed):
+        await db.execute('''
+            UPDATE event_logs_archive_summary
+            SET count = count - ?,
+                last_add_time = (SELECT MAX(add_time) FROM event_logs_archive WHERE event_member = ?)
+            WHERE event_member = ?
+        ''', (removed, event_member, event_member))
+        await db.execute('DELETE FROM event_logs_archive_summary WHERE event_member = ? AND count <= 0',
+                         (event_member,))
+
+    @tasks.loop(hours=24)
+    async def archive_events(self):
+        # Events of earlier months move to event_logs_archive
+        if self.config.archive_after_months <= 0:
+            return
+        cutoff = archive_cutoff(self.config.archive_after_months).strftime('%Y-%m-%d %H:%M:%S')
+        try:
+            await archive_rows(self.db, 'event_logs', 'event_logs_archive', EVENT_COLUMNS, 'add_time', cutoff,
+                               self.config.archive_batch_size, self.summarize_events)
+        except sqlite3.Error as e:
+            logging.error(f"Archiving event logs failed: {e}")
+
     @commands.Cog.listener()
     async def on_ready(self):
         # Ensure the table exists
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS event_logs (
                     add_time TEXT NOT NULL,
@@ -336,9 +413,32 @@ class NotebookCog(commands.Cog):
                     count INTEGER DEFAULT 1
                 )
             ''')
+            await db.execute('CREATE INDEX IF NOT EXISTS event_logs_member ON event_logs (event_member, count)')
+            # Events of earlier months, only read with include_archive, and how many each member has there
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS event_logs_archive (
+                    add_time TEXT NOT NULL,
+                    operator TEXT NOT NULL,
+                    event_member TEXT NOT NULL,
+                    event_description TEXT NOT NULL,
+                    count INTEGER DEFAULT 1
+                )
+            ''')
+            await db.execute('CREATE INDEX IF NOT EXISTS event_logs_archive_member '
+                             'ON event_logs_archive (event_member, count)')
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS event_logs_archive_summary (
+                    event_member TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    last_add_time TEXT
+                )
+            ''')
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS admins (
                     user_id TEXT NOT NULL
                 )
             ''')
             await db.commit()
+
+        if not self.archive_events.is_running():
+            self.archive_events.start()
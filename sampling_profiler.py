@@ -0,0 +1,137 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+
+# Seconds between two samples of the loop stack
+SAMPLE_INTERVAL = 0.01
+# The await chains of all tasks are walked every this many samples, and counted that many times, since a few
+# hundred waiting tasks take milliseconds to walk and mostly wait on the same thing from one sample to the next
+TASK_SAMPLE_EVERY = 10
+
+
+@functools.lru_cache(maxsize=4096)
+def code_name(code):
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def frame_name(frame):
+    return code_name(frame.f_code)
+
+
+def thread_stack(frame):
+    """Frame names of a thread's stack, outermost first."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+def await_chain(coroutine):
+    """Frame names of a suspended coroutine and everything it awaits, outermost first."""
+    names = []
+    current = coroutine
+    while current is not None:
+        frame = getattr(current, 'cr_frame', None) or getattr(current, 'gi_frame', None) \
+            or getattr(current, 'ag_frame', None)
+        if frame is None:
+            break
+        names.append(frame_name(frame))
+        current = getattr(current, 'cr_await', None) or getattr(current, 'gi_yieldfrom', None) \
+            or getattr(current, 'ag_await', None)
+    if current is not None:
+        # What the innermost coroutine waits for, a future, a sleep or a lock
+        names.append(f"<{type(current).__name__}>")
+    return names
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for the event loop, without instrumenting any code.
+
+    A thread looks at the loop thread every `interval` seconds: the stack of whatever runs on the loop right now
+    is counted under 'loop', and the await chain of every suspended task under 'task'. So both the code that
+    keeps the loop busy and the coroutines that wait long on something show up. The result is in the collapsed
+    stack format (one 'frame;frame;frame count' per line) that flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = {}  # stack tuple -> count
+        self.sample_count = 0
+        self.loop = None
+        self.loop_thread_id = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Call from the event loop that should be profiled."""
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.samples = {}
+        self.sample_count = 0
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def run(self):
+        next_sample = time.monotonic()
+        while not self.stopped.is_set():
+            self.sample()
+            next_sample += self.interval
+            delay = next_sample - time.monotonic()
+            if delay < 0:
+                # Sampling fell behind, skip the missed ones instead of catching up in a burst
+                next_sample = time.monotonic()
+                delay = 0
+            self.stopped.wait(delay)
+
+    def sample(self):
+        self.sample_count += 1
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is not None:
+            self.count(('loop',) + tuple(thread_stack(frame)))
+        if self.sample_count % TASK_SAMPLE_EVERY:
+            return
+        for task in asyncio.all_tasks(self.loop):
+            coroutine = task.get_coro()
+            if getattr(coroutine, 'cr_running', False):
+                # Already in the loop stack
+                continue
+            chain = await_chain(coroutine)
+            if chain:
+                self.count(('task',) + tuple(chain), TASK_SAMPLE_EVERY)
+
+    def count(self, stack, weight=1):
+        self.samples[stack] = self.samples.get(stack, 0) + weight
+
+    def collapsed(self):
+        return ''.join(f"{';'.join(stack)} {count}\n"
+                       for stack, count in sorted(self.samples.items(), key=lambda item: item[1], reverse=True))
+
+    def top_functions(self, count):
+        """The innermost frames of the loop samples, the busiest first, selectors.py:select is idle time."""
+        functions = {}
+        for stack, samples in self.samples.items():
+            if stack[0] != 'loop':
+                continue
+            functions[stack[-1]] = functions.get(stack[-1], 0) + samples
+        return sorted(functions.items(), key=lambda item: item[1], reverse=True)[:count]
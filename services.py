@@ -0,0 +1,46 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+
+
+class ServiceError(Exception):
+    """A service was looked up before it was registered, or registered twice."""
+
+
+class ServiceRegistry:
+    """
+    Objects shared by all Cogs and views, available as bot.services.
+    bot.py registers config and db before any Cog is added, Cogs that provide a service
+    (permissions, scheduler, dm) register it in __init__. A Cog that asks for a service
+    whose provider was not added yet fails at startup instead of building its own copy.
+    """
+
+    def __init__(self):
+        self.services = {}
+
+    def register(self, name, service):
+        if name in self.services:
+            raise ServiceError(f"Service {name} is already registered by {type(self.services[name]).__name__}")
+        self.services[name] = service
+        return service
+
+    def replace(self, name, service):
+        """Swap a registered service, e.g. the config after a reload."""
+        if name not in self.services:
+            raise ServiceError(f"Service {name} is not registered")
+        self.services[name] = service
+        return service
+
+    def unregister(self, name):
+        self.services.pop(name, None)
+
+    def get(self, name):
+        try:
+            return self.services[name]
+        except KeyError:
+            raise ServiceError(f"Service {name} is not registered yet, registered: {', '.join(self.services) or 'none'}. "
+                               f"Add the Cog that provides it earlier in bot.py") from None
+
+    def __contains__(self, name):
+        return name in self.services
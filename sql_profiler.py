@@ -0,0 +1,154 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import asyncio
+import functools
+import logging
+import os
+import re
+import sqlite3
+import sys
+
+import aiosqlite
+
+# Frames from these files are the bot's own code, the innermost of them is the statement's caller
+REPOSITORY = os.path.dirname(os.path.abspath(__file__))
+SKIPPED_FILES = (os.path.join(REPOSITORY, 'database.py'), os.path.abspath(__file__))
+
+# Literals in statements built with f-strings, replaced so they count as one template
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+WHITESPACE = re.compile(r'\s+')
+
+# Statements whose plan can show a scan, EXPLAIN QUERY PLAN says nothing useful about the others
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE', 'WITH', 'INSERT')
+
+
+@functools.lru_cache(maxsize=512)
+def statement_template(statement):
+    return WHITESPACE.sub(' ', LITERALS.sub('?', statement)).strip()
+
+
+def find_caller():
+    """'file.py Class.function' of the innermost frame of the bot's own code that ran the statement."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(REPOSITORY + os.sep) and filename not in SKIPPED_FILES \
+                and 'site-packages' not in filename:
+            code = frame.f_code
+            return f"{os.path.basename(filename)} {getattr(code, 'co_qualname', code.co_name)}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+def is_full_scan(detail):
+    # "SCAN t" reads every row of t, "SCAN t USING INDEX" every entry of an index, only a SEARCH uses one well
+    return detail.startswith('SCAN ') and not detail.startswith(('SCAN CONSTANT ROW', 'SCAN (subquery'))
+
+
+class TemplateStats:
+    __slots__ = ('count', 'total', 'errors', 'rows', 'callers', 'plan', 'scans')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.rows = 0
+        self.callers = {}  # 'file.py Class.function' -> count
+        self.plan = None  # EXPLAIN QUERY PLAN details, None until explained
+        self.scans = []
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class SqlProfiler:
+    """
+    Database observer that keeps, per statement template, how often it ran, how long it took, how many rows
+    were fetched and which Cog functions ran it. The first time a template is seen its query plan is checked
+    in the background on a connection of its own, so full table scans can be found.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.templates = {}  # template -> TemplateStats
+        self.tasks = set()
+
+    def start(self):
+        self.database.add_observer(self.observe_statement)
+        self.database.add_row_observer(self.observe_rows)
+
+    def stop(self):
+        self.database.remove_observer(self.observe_statement)
+        self.database.remove_row_observer(self.observe_rows)
+        for task in self.tasks:
+            task.cancel()
+
+    def observe_statement(self, statement, seconds, error):
+        template = statement_template(statement)
+        stats = self.templates.get(template)
+        if stats is None:
+            stats = self.templates[template] = TemplateStats()
+            if statement.lstrip()[:6].upper().startswith(EXPLAINED):
+                task = asyncio.get_running_loop().create_task(self.explain(stats, statement))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        stats.count += 1
+        stats.total += seconds
+        if error is not None:
+            stats.errors += 1
+        caller = find_caller()
+        stats.callers[caller] = stats.callers.get(caller, 0) + 1
+
+    def observe_rows(self, statement, rows):
+        stats = self.templates.get(statement_template(statement))
+        if stats is not None:
+            stats.rows += rows
+
+    async def explain(self, stats, statement):
+        # The parameters don't change the plan, NULLs are enough to prepare the statement
+        parameters = (None,) * LITERALS.sub('', statement).count('?')
+        try:
+            async with aiosqlite.connect(self.database.path) as db:
+                cursor = await db.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+                rows = await cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.debug(f"Could not explain {statement_template(statement)}: {e}")
+            stats.plan = []
+            return
+        stats.plan = [row[3] for row in rows]
+        stats.scans = [detail for detail in stats.plan if is_full_scan(detail)]
+
+    def top(self, count):
+        """The templates with the most total time."""
+        return sorted(self.templates.items(), key=lambda item: item[1].total, reverse=True)[:count]
+
+    def full_scans(self):
+        return sorted(((template, stats) for template, stats in self.templates.items() if stats.scans),
+                      key=lambda item: item[1].total, reverse=True)
+
+    async def storage(self):
+        """Page size and counts of the file, and the pages and bytes of every table and index."""
+        async with aiosqlite.connect(self.database.path) as db:
+            page_size = (await (await db.execute('PRAGMA page_size')).fetchone())[0]
+            page_count = (await (await db.execute('PRAGMA page_count')).fetchone())[0]
+            free_pages = (await (await db.execute('PRAGMA freelist_count')).fetchone())[0]
+            cursor = await db.execute(
+                "SELECT name, type, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')")
+            objects = {name: (kind, table) for name, kind, table in await cursor.fetchall()}
+            try:
+                # dbstat is only there when SQLite was built with it
+                cursor = await db.execute('SELECT name, COUNT(*), SUM(pgsize) FROM dbstat GROUP BY name')
+                sizes = {name: (pages, size) for name, pages, size in await cursor.fetchall()}
+            except sqlite3.Error:
+                sizes = {}
+        rows = []
+        for name, (kind, table) in objects.items():
+            pages, size = sizes.get(name, (None, None))
+            rows.append((name, kind, table, pages, size))
+        # Largest table first, each followed by its indexes
+        table_sizes = {name: size or 0 for name, kind, table, pages, size in rows if kind == 'table'}
+        rows.sort(key=lambda row: (-table_sizes.get(row[2], 0), row[2], row[1] != 'table', row[0]))
+        return {'page_size': page_size, 'page_count': page_count, 'free_pages': free_pages, 'objects': rows}
@@ -0,0 +1,69 @@
+# Author: MrZoyo
+# Version: 0.7.5
+# Date: 2026-10-19
+# ========================================
+import collections
+import logging
+import weakref
+
+
+class ViewRegistry:
+    """
+    The views the Cogs keep in memory, shared through bot.services as 'views'.
+
+    At most `max_views` views are kept. When there are more, finished views (stopped or timed out) are dropped
+    first, then the least recently used views are stopped and dropped, which also removes them from discord.py's
+    view store. Views that can be built again from the database (giveaways) are rebuilt the next time they are
+    needed.
+
+    Views added without a key are only held weakly: discord.py keeps them until they stop or time out, and they
+    leave the registry as soon as nothing else refers to them. They do not count towards `max_views`.
+    """
+
+    def __init__(self, max_views):
+        self.max_views = max_views
+        self.views = collections.OrderedDict()  # key -> view
+        self.anonymous = weakref.WeakValueDictionary()  # id(view) -> view
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.views) + len(self.anonymous)
+
+    def get(self, key):
+        view = self.views.get(key)
+        if view is not None:
+            self.views.move_to_end(key)
+        return view
+
+    def add(self, view, key=None):
+        """Keep a view, views without a key are never looked up again and only tracked until they are freed."""
+        if key is None:
+            self.anonymous[id(view)] = view
+            return view
+        self.views[key] = view
+        self.views.move_to_end(key)
+        if len(self.views) > self.max_views:
+            self.drop_finished()
+        while len(self.views) > self.max_views:
+            oldest, _ = next(iter(self.views.items()))
+            self.evict(oldest)
+        return view
+
+    def evict(self, key):
+        view = self.views.pop(key, None)
+        if view is not None and not view.is_finished():
+            view.stop()
+            self.evicted += 1
+            logging.debug(f"Evicted {type(view).__name__} {key} from the view registry")
+
+    def drop_finished(self):
+        for key in [key for key, view in self.views.items() if view.is_finished()]:
+            del self.views[key]
+
+    def counts(self):
+        """Views kept by class name."""
+        counts = {}
+        for view in [*self.views.values(), *self.anonymous.values()]:
+            name = type(view).__name__
+            counts[name] = counts.get(name, 0) + 1
+        return counts
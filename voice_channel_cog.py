@@ -3,7 +3,9 @@
 # Date: 2024-06-17
 # ========================================
 
-import aiosqlite
+import math
+import time
+from collections import deque
 import asyncio
 import logging
 import discord
@@ -11,7 +13,7 @@ from discord.ui import Button, View
 from discord.ext import commands, tasks
 from discord import app_commands
 
-from illegal_team_act_cog import IllegalTeamActCog
+from action_scheduler_cog import PRIORITY_MOVE, PRIORITY_CHANNEL, PRIORITY_BACKGROUND
 
 
 class CheckTempChannelView(discord.ui.View):
@@ -23,8 +25,8 @@ class CheckTempChannelView(discord.ui.View):
         self.page = page
         self.message = None  # This will hold the reference to the message
 
-        config = self.bot.get_cog('ConfigCog').config
-        self.db_path = config['db_path']
+        self.config = self.bot.services.get('config')
+        self.bot.services.get('views').add(self)
 
         # Define the buttons
         self.previous_button = Button(label="Previous", style=discord.ButtonStyle.primary, disabled=True)
@@ -86,27 +88,141 @@ class CheckTempChannelView(discord.ui.View):
 class VoiceStateCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.illegal_act_cog = IllegalTeamActCog(bot)
-
-        config = self.bot.get_cog('ConfigCog').config
-        self.channel_configs = {int(channel_id): config for channel_id, config in config['channel_configs'].items()}
-        self.db_path = config['db_path']
+        self.illegal_act_cog = self.bot.services.get('permissions')
+        self.scheduler = self.bot.services.get('scheduler')
+
+        self.config = self.bot.services.get('config')
+
+        self.db = self.bot.services.get('db')
+        self.channel_configs = {int(channel_id): config for channel_id, config in self.config.channel_configs.items()}
+
+        # Warm pool of hidden spare channels, see pool_task
+        self.pool_min = self.config.temp_channel_pool_min
+        self.pool_max = self.config.temp_channel_pool_max
+        self.pool_history_days = self.config.temp_channel_pool_history_days
+        self.pool_refresh_minutes = self.config.temp_channel_pool_refresh_minutes
+        self.channel_pool = {}  # creator channel id -> list of spare channel ids
+        self.pooled_channel_ids = set()
+        self.pool_targets = {}  # creator channel id -> wanted number of spares
+        self.releasing_channel_ids = set()
+        self.pool_ready = asyncio.Event()
+
+        # Discord only allows 2 renames per channel every 10 minutes
+        self.rename_limit = 2
+        self.rename_window = 600
+        self.rename_history = {}  # channel id -> deque of rename times
+
+        # Joins to the same creator channel are handled one at a time, see join_worker
+        self.category_channel_limit = 50
+        self.join_queues = {}  # creator channel id -> asyncio.Queue of pending joins
+        self.join_workers = {}  # creator channel id -> worker task
+        self.creator_locks = {}  # creator channel id -> lock shared by join_worker and pool_task
+        self.burst_categories = {}  # creator channel id -> category used by the current burst of joins
+        self.join_queue_stats = {}  # creator channel id -> queue depth and wait statistics
 
         # Start the cleanup task
         self.cleanup_task.start()
+        self.pool_task.change_interval(minutes=self.pool_refresh_minutes)
+        self.pool_task.start()
+
+    def cog_unload(self):
+        for worker in self.join_workers.values():
+            worker.cancel()
+        self.pool_task.cancel()
+        self.cleanup_task.cancel()
+
+    def apply_config(self, old, new, changed, prepared=None):
+        """Called by ConfigCog after config.json changed, only rebuilds the creator channels and pools if needed."""
+        pool_keys = ('channel_configs', 'temp_channel_pool_min', 'temp_channel_pool_max',
+                     'temp_channel_pool_history_days', 'temp_channel_pool_refresh_minutes')
+        if not any(key in changed for key in pool_keys):
+            return
+
+        if 'channel_configs' in changed:
+            self.channel_configs = {int(channel_id): config for channel_id, config in new.channel_configs.items()}
+            # Spares of creator channels that were removed are released on the next pool run
+            for creator_channel_id in self.pool_targets:
+                if creator_channel_id not in self.channel_configs:
+                    self.pool_targets[creator_channel_id] = 0
+        self.pool_min = new.temp_channel_pool_min
+        self.pool_max = new.temp_channel_pool_max
+        self.pool_history_days = new.temp_channel_pool_history_days
+        # The pools are resized on the next run of pool_task, restarting it could cancel a channel creation
+        if self.pool_refresh_minutes != new.temp_channel_pool_refresh_minutes:
+            self.pool_refresh_minutes = new.temp_channel_pool_refresh_minutes
+            self.pool_task.change_interval(minutes=self.pool_refresh_minutes)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
         if after.channel and after.channel.id in self.channel_configs:
             config = self.channel_configs[after.channel.id]
             if config["type"] == "public" or config["type"] == "private":
-                await self.handle_channel(member, after, config, public=config["type"] == "public")
+                self.enqueue_join(member, after, config, public=config["type"] == "public")
 
         if before.channel:
             await self.cleanup_channel(before.channel.id)
 
+    def enqueue_join(self, member, after, config, public=True):
+        creator_channel_id = after.channel.id
+        queue = self.join_queues.get(creator_channel_id)
+        if queue is None:
+            queue = self.join_queues[creator_channel_id] = asyncio.Queue()
+        queue.put_nowait((member, after, config, public, time.monotonic()))
+
+        worker = self.join_workers.get(creator_channel_id)
+        if worker is None or worker.done():
+            self.join_workers[creator_channel_id] = asyncio.create_task(self.join_worker(creator_channel_id))
+
+    def get_creator_lock(self, creator_channel_id):
+        lock = self.creator_locks.get(creator_channel_id)
+        if lock is None:
+            lock = self.creator_locks[creator_channel_id] = asyncio.Lock()
+        return lock
+
+    async def join_worker(self, creator_channel_id):
+        """Handle the joins of one creator channel in order, so a join storm cannot race itself."""
+        queue = self.join_queues[creator_channel_id]
+        stats = self.join_queue_stats.setdefault(creator_channel_id, {
+            'processed': 0, 'skipped': 0, 'max_depth': 0, 'total_wait': 0.0, 'max_wait': 0.0
+        })
+        burst_size = burst_max_depth = 0
+        burst_max_wait = 0.0
+
+        while True:
+            member, after, config, public, enqueued_at = await queue.get()
+            depth = queue.qsize() + 1
+            wait = time.monotonic() - enqueued_at
+            burst_size += 1
+            burst_max_depth = max(burst_max_depth, depth)
+            burst_max_wait = max(burst_max_wait, wait)
+            stats['max_depth'] = max(stats['max_depth'], depth)
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+
+            try:
+                # The member may have left or been moved while waiting in the queue
+                if member.voice and member.voice.channel and member.voice.channel.id == creator_channel_id:
+                    async with self.get_creator_lock(creator_channel_id):
+                        await self.handle_channel(member, after, config, public=public)
+                    stats['processed'] += 1
+                else:
+                    stats['skipped'] += 1
+            except Exception as e:
+                logging.error(f"Failed to create a temporary channel for {member} from {creator_channel_id}: {e}")
+            finally:
+                queue.task_done()
+
+            if queue.empty():
+                # The burst is over, the next join decides on its category again
+                self.burst_categories.pop(creator_channel_id, None)
+                if burst_size > 1:
+                    logging.info(f"Handled a burst of {burst_size} joins on creator channel {creator_channel_id}, "
+                                 f"max queue depth {burst_max_depth}, max wait {burst_max_wait:.2f}s")
+                burst_size = burst_max_depth = 0
+                burst_max_wait = 0.0
+
     async def handle_channel(self, member, after, config, public=True):
-        guild = after.channel.guild
+        creator_channel = after.channel
         temp_channel_name = f"{config['name_prefix']}-{member.display_name}"
         overwrites = {
             member.guild.default_role: discord.PermissionOverwrite(view_channel=True, connect=public),
@@ -114,16 +230,58 @@ class VoiceStateCog(commands.Cog):
                                                 move_members=True)
         }
 
+        # Hand out a spare channel from the pool if there is one, otherwise create a new channel
+        temp_channel = await self.take_spare_channel(creator_channel.id, temp_channel_name, overwrites)
+        if temp_channel is None:
+            temp_channel = await self.create_temp_channel(creator_channel, temp_channel_name, overwrites)
+
+        # Move the member and handle exceptions if the member is no longer connected
+        try:
+            if member.voice:
+                await self.scheduler.run(lambda: member.move_to(temp_channel),
+                                         PRIORITY_MOVE, ('move', temp_channel.guild.id))
+            else:
+                raise RuntimeError("Member not connected to voice")
+        except (discord.HTTPException, discord.NotFound, RuntimeError) as e:
+            # Handle exceptions by recycling the newly created channel if the move fails
+            if isinstance(e, RuntimeError) or "Target user is not connected to voice" in str(e):
+                await self.release_channel(temp_channel, creator_channel.id)
+                # return
+
+        # Record the temporary channel in the database
+        # A recycled channel keeps its id, so the record of its previous use is replaced
+        async with self.db.connect() as db:
+            await db.execute('REPLACE INTO temp_channels (channel_id, creator_id, creator_channel_id, created_at) '
+                             'VALUES (?, ?, ?, CURRENT_TIMESTAMP)',
+                             (temp_channel.id, member.id, creator_channel.id))
+            # temp_channels only knows the channels alive right now, the pools are sized from every hand out
+            await db.execute('INSERT INTO temp_channel_demand (creator_channel_id) VALUES (?)', (creator_channel.id,))
+            await db.commit()
+
+    async def create_temp_channel(self, creator_channel, name, overwrites, priority=PRIORITY_CHANNEL):
+        guild = creator_channel.guild
+        route = ('channel', guild.id)
+
         # Get all categories with the same name as the current one
-        categories = [category for category in guild.categories if category.name == after.channel.category.name]
+        categories = [category for category in guild.categories if category.name == creator_channel.category.name]
 
         # Sort the categories by position
         categories.sort(key=lambda category: category.position)
 
+        # Joins of the same burst start with the category the previous join ended up in
+        burst_category = self.burst_categories.get(creator_channel.id)
+        if burst_category in categories:
+            categories.remove(burst_category)
+            categories.insert(0, burst_category)
+
         for category in categories:
+            if len(category.channels) >= self.category_channel_limit:
+                continue  # Known to be full, don't spend a request to find out
             try:
-                temp_channel = await guild.create_voice_channel(name=temp_channel_name, category=category,
-                                                                overwrites=overwrites)
+                temp_channel = await self.scheduler.run(
+                    lambda: guild.create_voice_channel(name=name, category=category, overwrites=overwrites),
+                    priority, route)
+                self.burst_categories[creator_channel.id] = category
                 break  # If the channel creation is successful, break the loop
             except discord.errors.HTTPException as e:
                 if e.code == 50035:  # Maximum number of channels in category reached
@@ -136,48 +294,211 @@ class VoiceStateCog(commands.Cog):
             new_category_position = categories[-1].position
             # print(f"Creating new category at position {new_category_position}")
 
-            new_category = await guild.create_category(name=after.channel.category.name,
-                                                       position=new_category_position)
-            temp_channel = await guild.create_voice_channel(name=temp_channel_name, category=new_category,
-                                                            overwrites=overwrites)
+            new_category = await self.scheduler.run(
+                lambda: guild.create_category(name=creator_channel.category.name, position=new_category_position),
+                priority, route)
+            self.burst_categories[creator_channel.id] = new_category
+            temp_channel = await self.scheduler.run(
+                lambda: guild.create_voice_channel(name=name, category=new_category, overwrites=overwrites),
+                priority, route)
+
+        return temp_channel
+
+    def can_rename(self, channel_id):
+        renames = self.rename_history.get(channel_id)
+        if renames is None:
+            return True
+        now = time.monotonic()
+        while renames and now - renames[0] > self.rename_window:
+            renames.popleft()
+        return len(renames) < self.rename_limit
+
+    async def take_spare_channel(self, creator_channel_id, name, overwrites):
+        spares = self.channel_pool.get(creator_channel_id)
+        if not spares:
+            return None
+
+        rename_limited = []
+        temp_channel = None
+        while spares:
+            channel_id = spares.pop()
+            self.pooled_channel_ids.discard(channel_id)
+            channel = self.bot.get_channel(channel_id)
+            if channel is None or channel.members:
+                # The spare was deleted or somebody got into it, it is no longer usable
+                await self.remove_from_pool(channel_id)
+                continue
+
+            rename = channel.name != name
+            if rename and not self.can_rename(channel_id):
+                # Renaming would block on Discord's rename limit, try the next spare instead
+                rename_limited.append(channel_id)
+                continue
 
-        # Move the member and handle exceptions if the member is no longer connected
+            try:
+                if rename:
+                    await self.scheduler.run(
+                        lambda: channel.edit(name=name, overwrites=overwrites, reason="Hand out pooled temporary channel"),
+                        PRIORITY_CHANNEL, ('channel', channel.guild.id))
+                    self.rename_history.setdefault(channel_id, deque()).append(time.monotonic())
+                else:
+                    await self.scheduler.run(
+                        lambda: channel.edit(overwrites=overwrites, reason="Hand out pooled temporary channel"),
+                        PRIORITY_CHANNEL, ('channel', channel.guild.id))
+            except discord.HTTPException as e:
+                logging.error(f"Failed to hand out pooled channel {channel_id}: {e}")
+                await self.remove_from_pool(channel_id)
+                continue
+
+            await self.remove_from_pool(channel_id)
+            temp_channel = channel
+            break
+
+        # Put the spares we skipped back into the pool
+        spares.extend(rename_limited)
+        self.pooled_channel_ids.update(rename_limited)
+        return temp_channel
+
+    async def release_channel(self, channel, creator_channel_id=None):
+        """Return an emptied temporary channel to the pool, or delete it if the pool is full."""
+        if channel.id in self.releasing_channel_ids:
+            return
+        self.releasing_channel_ids.add(channel.id)
         try:
-            if member.voice:
-                await member.move_to(temp_channel)
-            else:
-                raise RuntimeError("Member not connected to voice")
-        except (discord.HTTPException, discord.NotFound, RuntimeError) as e:
-            # Handle exceptions by cleaning up the newly created channel if the move fails
-            if isinstance(e, RuntimeError) or "Target user is not connected to voice" in str(e):
-                await temp_channel.delete(reason="Cleanup unused channel due to user disconnect")
-                if not temp_channel.category.channels:
-                    await temp_channel.category.delete(reason="Cleanup unused category")
-                # return
+            spares = self.channel_pool.get(creator_channel_id, [])
+            if creator_channel_id in self.channel_configs and len(spares) < self.pool_targets.get(creator_channel_id, 0):
+                try:
+                    await self.scheduler.run(
+                        lambda: channel.edit(overwrites=self.spare_overwrites(channel.guild),
+                                             reason="Return temporary channel to pool"),
+                        PRIORITY_CHANNEL, ('channel', channel.guild.id))
+                except discord.HTTPException as e:
+                    logging.error(f"Failed to return channel {channel.id} to the pool: {e}")
+                else:
+                    await self.add_to_pool(channel.id, creator_channel_id)
+                    return
+
+            route = ('channel', channel.guild.id)
+            await self.scheduler.run(lambda: channel.delete(reason="Temporary channel cleanup"),
+                                     PRIORITY_CHANNEL, route)
+            category = channel.category
+            if category and not category.channels:  # If the category is empty, delete it
+                await self.scheduler.run(lambda: category.delete(reason="Temporary category cleanup"),
+                                         PRIORITY_CHANNEL, route)
+        finally:
+            self.releasing_channel_ids.discard(channel.id)
+
+    @staticmethod
+    def spare_overwrites(guild):
+        return {guild.default_role: discord.PermissionOverwrite(view_channel=False, connect=False)}
+
+    async def add_to_pool(self, channel_id, creator_channel_id):
+        self.channel_pool.setdefault(creator_channel_id, []).append(channel_id)
+        self.pooled_channel_ids.add(channel_id)
+        async with self.db.connect() as db:
+            await db.execute('REPLACE INTO temp_channel_pool (channel_id, creator_channel_id) VALUES (?, ?)',
+                             (channel_id, creator_channel_id))
+            await db.commit()
 
-        # Record the temporary channel in the database
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('INSERT INTO temp_channels (channel_id, creator_id) VALUES (?, ?)',
-                             (temp_channel.id, member.id))
+    async def remove_from_pool(self, channel_id):
+        self.pooled_channel_ids.discard(channel_id)
+        async with self.db.connect() as db:
+            await db.execute('DELETE FROM temp_channel_pool WHERE channel_id = ?', (channel_id,))
             await db.commit()
 
     async def cleanup_channel(self, channel_id):
+        if channel_id in self.pooled_channel_ids:
+            return
         channel = self.bot.get_channel(channel_id)
         if channel and not channel.members:
-            async with aiosqlite.connect(self.db_path) as db:
-                cursor = await db.execute('SELECT channel_id FROM temp_channels WHERE channel_id = ?', (channel_id,))
+            async with self.db.connect() as db:
+                cursor = await db.execute('SELECT channel_id, creator_channel_id FROM temp_channels '
+                                          'WHERE channel_id = ?', (channel_id,))
                 result = await cursor.fetchone()
-                if result:
-                    # await db.execute('DELETE FROM temp_channels WHERE channel_id = ?', (channel_id,))
-                    # await db.commit()
-                    await channel.delete(reason="Temporary channel cleanup")
-                    if not channel.category.channels:  # If the category is empty, delete it
-                        await channel.category.delete(reason="Temporary category cleanup")
+            if result:
+                # await db.execute('DELETE FROM temp_channels WHERE channel_id = ?', (channel_id,))
+                # await db.commit()
+                await self.release_channel(channel, result[1])
+
+    async def update_pool_targets(self):
+        """Size each pool by the number of channels its creator handed out at this hour of the day."""
+        hour = discord.utils.utcnow().strftime('%H')
+        async with self.db.connect() as db:
+            cursor = await db.execute('''
+                SELECT creator_channel_id, COUNT(*) FROM temp_channel_demand
+                WHERE created_at >= datetime('now', ?)
+                  AND strftime('%H', created_at) = ?
+                GROUP BY creator_channel_id
+            ''', (f'-{self.pool_history_days} days', hour))
+            demand = dict(await cursor.fetchall())
+
+        for creator_channel_id, config in self.channel_configs.items():
+            pool_min = config.get('pool_min', self.pool_min)
+            pool_max = config.get('pool_max', self.pool_max)
+            # Channels expected to be requested before the next refresh of the pool
+            per_hour = demand.get(creator_channel_id, 0) / max(self.pool_history_days, 1)
+            expected = math.ceil(per_hour * self.pool_refresh_minutes / 60)
+            self.pool_targets[creator_channel_id] = max(pool_min, min(pool_max, expected))
+
+    @tasks.loop(minutes=10)
+    async def pool_task(self):
+        try:
+            await self.update_pool_targets()
+            for creator_channel_id, target in self.pool_targets.items():
+                creator_channel = self.bot.get_channel(creator_channel_id)
+                if creator_channel is None or creator_channel.category is None:
+                    continue
+
+                spares = self.channel_pool.setdefault(creator_channel_id, [])
+                # Forget spares that were deleted by hand
+                for channel_id in [c for c in spares if self.bot.get_channel(c) is None]:
+                    spares.remove(channel_id)
+                    await self.remove_from_pool(channel_id)
+
+                async with self.get_creator_lock(creator_channel_id):
+                    while len(spares) < target:
+                        name = f"{self.channel_configs[creator_channel_id]['name_prefix']}-spare"
+                        channel = await self.create_temp_channel(creator_channel, name,
+                                                                 self.spare_overwrites(creator_channel.guild),
+                                                                 priority=PRIORITY_BACKGROUND)
+                        await self.add_to_pool(channel.id, creator_channel_id)
+                    self.burst_categories.pop(creator_channel_id, None)
+
+                    while len(spares) > target:
+                        channel_id = spares.pop(0)
+                        await self.remove_from_pool(channel_id)
+                        channel = self.bot.get_channel(channel_id)
+                        if channel is not None:
+                            await self.release_channel(channel)
+        except Exception as e:
+            logging.error(f"An error occurred in pool_task: {e}")
+
+    @pool_task.before_loop
+    async def before_pool_task(self):
+        await self.pool_ready.wait()
+
+    async def load_channel_pool(self, db):
+        self.channel_pool = {}
+        self.pooled_channel_ids = set()
+        cursor = await db.execute('SELECT channel_id, creator_channel_id FROM temp_channel_pool')
+        for channel_id, creator_channel_id in await cursor.fetchall():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None or creator_channel_id not in self.channel_configs:
+                await db.execute('DELETE FROM temp_channel_pool WHERE channel_id = ?', (channel_id,))
+            elif channel.members:
+                # Somebody is using the spare, treat it as a normal temporary channel from now on
+                await db.execute('DELETE FROM temp_channel_pool WHERE channel_id = ?', (channel_id,))
+                await db.execute('REPLACE INTO temp_channels (channel_id, creator_id, creator_channel_id) '
+                                 'VALUES (?, ?, ?)', (channel_id, channel.members[0].id, creator_channel_id))
+            else:
+                self.channel_pool.setdefault(creator_channel_id, []).append(channel_id)
+                self.pooled_channel_ids.add(channel_id)
+        await db.commit()
 
     @tasks.loop(hours=1)
     async def cleanup_task(self):
         logging.info("Running cleanup task")
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             cursor = await db.execute('SELECT channel_id FROM temp_channels')
             channels = await cursor.fetchall()
             for (channel_id,) in channels:
@@ -186,6 +507,10 @@ class VoiceStateCog(commands.Cog):
                     # The channel no longer exists, so clean up the database entry
                     await db.execute('DELETE FROM temp_channels WHERE channel_id = ?', (channel_id,))
                     await db.commit()
+            # Hand outs older than the history the pools are sized from
+            await db.execute("DELETE FROM temp_channel_demand WHERE created_at < datetime('now', ?)",
+                             (f'-{self.pool_history_days} days',))
+            await db.commit()
 
     @cleanup_task.before_loop
     async def before_cleanup(self):
@@ -202,8 +527,9 @@ class VoiceStateCog(commands.Cog):
         await interaction.response.defer()
 
         # Fetch the records from the database
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute('SELECT * FROM temp_channels ORDER BY created_at DESC')
+        async with self.db.connect() as db:
+            cursor = await db.execute('SELECT channel_id, creator_id, created_at FROM temp_channels '
+                                      'ORDER BY created_at DESC')
             records = await cursor.fetchall()
 
         if not records:
@@ -215,19 +541,46 @@ class VoiceStateCog(commands.Cog):
         message = await interaction.edit_original_response(embeds=[embed], view=view)
         view.message = message
 
+    async def add_creator_channel_column(self, db):
+        cursor = await db.execute("PRAGMA table_info(temp_channels)")
+        columns = await cursor.fetchall()
+        if not any(column[1] == 'creator_channel_id' for column in columns):
+            await db.execute("ALTER TABLE temp_channels ADD COLUMN creator_channel_id INTEGER")
+
     @commands.Cog.listener()
     async def on_ready(self):
         # Ensure the table exists
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db.connect() as db:
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS temp_channels (
                     channel_id INTEGER PRIMARY KEY,
                     creator_id INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    creator_channel_id INTEGER
+                );
+            ''')
+            await self.add_creator_channel_column(db)
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS temp_channel_pool (
+                    channel_id INTEGER PRIMARY KEY,
+                    creator_channel_id INTEGER NOT NULL
+                );
+            ''')
+            # One row per channel handed out, kept for temp_channel_pool_history_days
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS temp_channel_demand (
+                    creator_channel_id INTEGER NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
             ''')
+            await db.execute('CREATE INDEX IF NOT EXISTS temp_channel_demand_created_at '
+                             'ON temp_channel_demand (created_at)')
             await db.commit()
 
+            # Pick the spare channels back up and size the pools before any channel gets recycled
+            await self.load_channel_pool(db)
+            await self.update_pool_targets()
+
             # Check for empty channels on startup
             cursor = await db.execute('SELECT channel_id FROM temp_channels')
             channels = await cursor.fetchall()
@@ -238,7 +591,7 @@ class VoiceStateCog(commands.Cog):
                     await db.execute('DELETE FROM temp_channels WHERE channel_id = ?', (channel_id,))
                     await db.commit()
                 elif not channel.members:
-                    # If the channel exists and is empty, delete it
+                    # If the channel exists and is empty, recycle or delete it
                     await self.cleanup_channel(channel_id)
 
             # Check for empty categories on startup
@@ -250,3 +603,5 @@ class VoiceStateCog(commands.Cog):
                 for category in guild.categories:
                     if not category.channels and category.name in category_names:
                         await category.delete(reason="Temporary category cleanup")
+
+        self.pool_ready.set()
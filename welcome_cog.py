@@ -10,6 +10,13 @@ from PIL import Image, ImageDraw, ImageFont
 import logging
 import aiohttp
 
+# Image assets built from the config, and the keys each of them depends on
+WELCOME_ASSETS = {
+    'background': ('background_image',),
+    'font': ('font_path', 'font_size'),
+    'mask': ('avatar_size',),
+}
+
 
 class WelcomeCog(commands.Cog):
     def __init__(self, bot):
@@ -17,71 +24,81 @@ class WelcomeCog(commands.Cog):
         self.session = aiohttp.ClientSession()
 
         # Get the config from the ConfigCog
-        config = self.bot.get_cog('ConfigCog').config
-
-        # Set the parameters from the config
-        self.welcome_channel_id = config['welcome_channel_id']
-        self.text_color = tuple(config['text_color'])
-        self.font_path = config['font_path']
-        self.font_size = config['font_size']
-        self.avatar_size = tuple(config['avatar_size'])
-        self.welcome_text_1_distance = config['welcome_text_1_distance']
-        self.welcome_text_2_distance = config['welcome_text_2_distance']
-        self.welcome_text_picture_1 = config['welcome_text_picture_1']
-        self.welcome_text_picture_2 = config['welcome_text_picture_2']
-        self.welcome_text = config['welcome_text']
-        self.background_image = config['background_image']
+        self.config = self.bot.services.get('config')
+        # Background, font and avatar mask are loaded on the first welcome and kept, see get_asset
+        self.assets = {}
 
     async def cog_unload(self):
         await self.session.close()
 
+    @staticmethod
+    def load_asset(name, config):
+        if name == 'background':
+            with Image.open(config.background_image) as background:
+                return background.convert("RGBA")
+        if name == 'font':
+            return ImageFont.truetype(config.font_path, config.font_size)
+        # Avatar mask for a circular avatar
+        mask = Image.new('L', config.avatar_size, 0)
+        ImageDraw.Draw(mask).ellipse((0, 0) + config.avatar_size, fill=255)
+        return mask
+
+    def get_asset(self, name):
+        asset = self.assets.get(name)
+        if asset is None:
+            asset = self.assets[name] = self.load_asset(name, self.config)
+        return asset
+
+    def prepare_config(self, old, new, changed):
+        """Load the assets whose files or sizes changed, an unreadable file rejects the new config."""
+        return {name: self.load_asset(name, new) for name, keys in WELCOME_ASSETS.items()
+                if any(key in changed for key in keys)}
+
+    def apply_config(self, old, new, changed, prepared=None):
+        self.assets.update(prepared or {})
+
     async def download_avatar(self, url):
         async with self.session.get(url) as response:
             avatar_bytes = await response.read()
         return avatar_bytes
 
     def create_welcome_image(self, user_name, member_number, avatar_bytes):
-        with Image.open(self.background_image) as background:
-            background = background.convert("RGBA")
-
+        config = self.config
+        with self.get_asset('background').copy() as background:
             # Convert byte data to image
             avatar_image = Image.open(io.BytesIO(avatar_bytes))
-            avatar_image = avatar_image.resize(self.avatar_size)
-
-            # Create avatar mask for circular avatar
-            mask = Image.new('L', self.avatar_size, 0)
-            draw = ImageDraw.Draw(mask)
-            draw.ellipse((0, 0) + self.avatar_size, fill=255)
+            avatar_image = avatar_image.resize(config.avatar_size)
+            mask = self.get_asset('mask')
 
             # Calculate position for the avatar (middle, a bit towards the top)
             bg_width, bg_height = background.size
-            avatar_position = ((bg_width - self.avatar_size[0]) // 2, (bg_height - self.avatar_size[1]) // 3)
+            avatar_position = ((bg_width - config.avatar_size[0]) // 2, (bg_height - config.avatar_size[1]) // 3)
             background.paste(avatar_image, avatar_position, mask)  # Use the mask here
 
             # Creating a draw object to draw text on a background image
             draw = ImageDraw.Draw(background)
-            font = ImageFont.truetype(self.font_path, self.font_size)
+            font = self.get_asset('font')
 
             # First line of text
-            text1 = self.welcome_text_picture_1.format(user_name=user_name)
+            text1 = config.welcome_text_picture_1.format(user_name=user_name)
             text1_width = draw.textlength(text1, font=font)
-            text1_height = self.font_size  # Assuming single line, this might need adjustment
+            text1_height = config.font_size  # Assuming single line, this might need adjustment
 
             # Second line of text
-            text2 = self.welcome_text_picture_2.format(member_number=member_number)
+            text2 = config.welcome_text_picture_2.format(member_number=member_number)
             text2_width = draw.textlength(text2, font=font)
 
             # Position for the first line of text, placed below the avatar with some space
             text1_x = (background.width - text1_width) // 2
-            text1_y = avatar_position[1] + self.avatar_size[1] + self.welcome_text_1_distance  # pixels below the avatar
+            text1_y = avatar_position[1] + config.avatar_size[1] + config.welcome_text_1_distance  # pixels below the avatar
 
             # Position for the second line of text, placed below the first line
             text2_x = (background.width - text2_width) // 2
-            text2_y = text1_y + text1_height + self.welcome_text_2_distance  # pixels space between lines
+            text2_y = text1_y + text1_height + config.welcome_text_2_distance  # pixels space between lines
 
             # Drawing the text
-            draw.text((text1_x, text1_y), text1, fill=self.text_color, font=font)
-            draw.text((text2_x, text2_y), text2, fill=self.text_color, font=font)
+            draw.text((text1_x, text1_y), text1, fill=config.text_color, font=font)
+            draw.text((text2_x, text2_y), text2, fill=config.text_color, font=font)
 
             # Convert to bytes
             final_buffer = io.BytesIO()
@@ -92,7 +109,7 @@ class WelcomeCog(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
-        channel = self.bot.get_channel(self.welcome_channel_id)
+        channel = self.bot.get_channel(self.config.welcome_channel_id)
         if channel:
             # Get the member count for the welcome message
             member_count = member.guild.member_count
@@ -100,13 +117,13 @@ class WelcomeCog(commands.Cog):
             welcome_image = self.create_welcome_image(member.name, member_count, avatar_bytes)
             discord_file = discord.File(fp=welcome_image, filename='welcome_image.png')
             # Send the welcome message with text and the welcome image
-            welcome_message = self.welcome_text.format(member=member)
+            welcome_message = self.config.welcome_text.format(member=member)
             await channel.send(content=welcome_message.format(member=member), file=discord_file)
 
     @commands.command(name='testwelcome')
     async def test_welcome_command(self, ctx):
         """Send a test welcome message using the command interface."""
-        if ctx.channel.id == self.welcome_channel_id:
+        if ctx.channel.id == self.config.welcome_channel_id:
             member_number = len(ctx.guild.members)  # Get the number of members in the guild
             await self.send_welcome(ctx.author, ctx.channel, member_number)
         else:
@@ -118,7 +135,7 @@ class WelcomeCog(commands.Cog):
     async def test_welcome(self, interaction: discord.Interaction, member: discord.Member = None,
                            member_number: int = None):
         """Send a test welcome message using the slash command interface."""
-        if interaction.channel_id != self.welcome_channel_id:
+        if interaction.channel_id != self.config.welcome_channel_id:
             await interaction.response.send_message("This command can only be used in the welcome channel.",
                                                     ephemeral=True)
             return
@@ -140,7 +157,7 @@ class WelcomeCog(commands.Cog):
         avatar_bytes = await self.download_avatar(member.display_avatar.url)
         welcome_image = self.create_welcome_image(member.display_name, member_number, avatar_bytes)
         discord_file = discord.File(fp=welcome_image, filename='welcome_image.png')
-        welcome_message = self.welcome_text.format(member=member)
+        welcome_message = self.config.welcome_text.format(member=member)
 
         if interaction:
             # First, defer the response without any content